@@ -0,0 +1,99 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+from rule_index import normalize_header, is_blank_header
+from run_metrics import count_cache
+
+
+def _tokens(text):
+    # acentos removidos antes do regex: "Endereço" → "endereco", não "endere" + "o"
+    folded = unicodedata.normalize("NFKD", normalize_header(text))
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return [t for t in re.split(r"[^0-9a-z]+", folded) if t]
+
+
+def _grams(text, n=3):
+    """Trigramas de caracteres (com bordas) + tokens inteiros, como conjunto."""
+    norm = " ".join(_tokens(text))
+    padded = f"  {norm} "
+    grams = {padded[i:i + n] for i in range(len(padded) - n + 1)}
+    grams.update(f"#{t}" for t in norm.split())
+    return grams
+
+
+# =============================================================================
+# Índice de n-gramas sobre cabeçalhos do template + aliases
+# =============================================================================
+class AliasMatcher:
+    """
+    Sugere a coluna do template mais provável para um cabeçalho de origem que não
+    bate com nenhum alias. O índice invertido (n-grama → entradas) é montado uma
+    vez; cada consulta soma as listas de postings com np.bincount e calcula o
+    coeficiente de Dice contra todas as entradas de uma só vez.
+    """
+
+    def __init__(self, targets):
+        """targets: {cabeçalho do template: [aliases]} (o próprio nome já conta como rótulo)."""
+        self._entries = []  # (target, rótulo)
+        sizes = []
+        postings = defaultdict(list)
+
+        for target, labels in targets.items():
+            if isinstance(labels, str):
+                labels = [labels]
+            for label in dict.fromkeys([target, *(labels or [])]):
+                if not label or is_blank_header(label):
+                    continue
+                entry_id = len(self._entries)
+                grams = _grams(label)
+                self._entries.append((target, label))
+                sizes.append(len(grams))
+                for g in grams:
+                    postings[g].append(entry_id)
+
+        self._sizes = np.asarray(sizes, dtype=np.float64)
+        self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    def suggest(self, header, top_k=3, min_score=0.45, candidates=None):
+        """
+        Retorna até top_k tuplas (target, alias casado, score) ordenadas por score.
+        candidates: restringe as sugestões a estes targets (ex.: colunas da aba).
+        """
+        if not self._entries:
+            return []
+        grams = _grams(header)
+        hits = [self._postings[g] for g in grams if g in self._postings]
+        if not hits:
+            return []
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self._entries))
+        scores = 2.0 * shared / (len(grams) + self._sizes)
+
+        suggestions, seen = [], set()
+        for entry_id in np.argsort(-scores, kind="stable"):
+            score = scores[entry_id]
+            if score < min_score:
+                break
+            target, label = self._entries[entry_id]
+            if target in seen or (candidates is not None and target not in candidates):
+                continue
+            seen.add(target)
+            suggestions.append((target, label, round(float(score), 3)))
+            if len(suggestions) == top_k:
+                break
+        return suggestions
+
+
+_CACHE = {}
+
+
+def get_alias_matcher(key, targets_factory):
+    """Um AliasMatcher por chave (ex.: template + mapping), construído sob demanda."""
+    matcher = _CACHE.get(key)
+    count_cache("alias_matcher", matcher is not None)
+    if matcher is None:
+        matcher = _CACHE[key] = AliasMatcher(targets_factory())
+    return matcher
@@ -0,0 +1,164 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from run_metrics import count_cache
+
+# acima disso o nº de distintos é estimado (HyperLogLog) e o top-N vem de uma subamostra
+EXACT_LIMIT = 200_000
+HLL_PRECISION = 12  # 2^12 registradores → erro padrão ~1,6%
+
+
+# =============================================================================
+# Cache por aba compartilhado entre regras e profiling
+# =============================================================================
+class ParsedColumns:
+    """
+    Conversões caras de uma aba feitas uma única vez e reaproveitadas por quem
+    precisar na mesma passada (sequência de eventos, profiling...):
+    - nulls(): máscara de nulos de todas as colunas (um único df.isna())
+    - dates(col): coluna convertida com pd.to_datetime
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._nulls = None
+        self._dates = {}
+
+    def nulls(self):
+        if self._nulls is None:
+            self._nulls = self.df.isna()
+        return self._nulls
+
+    def dates(self, col):
+        count_cache("parsed_dates", col in self._dates)
+        if col not in self._dates:
+            series = self.df[col]
+            if not pd.api.types.is_datetime64_any_dtype(series.dtype):
+                series = pd.to_datetime(series, errors="coerce")
+            self._dates[col] = series
+        return self._dates[col]
+
+
+# =============================================================================
+# Distintos aproximados (HyperLogLog)
+# =============================================================================
+def hll_distinct(values, p=HLL_PRECISION):
+    """Estimativa HyperLogLog do nº de valores distintos, vetorizada em NumPy."""
+    if not len(values):
+        return 0
+    hashes = pd.util.hash_pandas_object(pd.Series(values, dtype=object).astype(str), index=False).to_numpy()
+    m = 1 << p
+    buckets = (hashes >> np.uint64(64 - p)).astype(np.int64)
+    rest = hashes & np.uint64((1 << (64 - p)) - 1)
+
+    # posição do 1º bit 1 nos (64 - p) bits restantes
+    bits = np.zeros(len(rest), dtype=np.int64)
+    nonzero = rest > 0
+    bits[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+    rank = (64 - p) - bits + 1
+
+    registers = np.zeros(m, dtype=np.int64)
+    np.maximum.at(registers, buckets, rank)
+
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)  # correção para cardinalidades pequenas
+    return int(round(estimate))
+
+
+# =============================================================================
+# Profiling por aba
+# =============================================================================
+def _is_date_column(name, series):
+    return pd.api.types.is_datetime64_any_dtype(series.dtype) or "date" in str(name).lower()
+
+
+def _format(value):
+    if isinstance(value, datetime):
+        value = pd.Timestamp(value)
+        return value.strftime("%Y-%m-%d") if value == value.normalize() else value.isoformat()
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    return value
+
+
+def profile_frame(df, parsed=None, top_n=5):
+    """
+    Estatísticas por coluna da aba: nulos, distintos, min/max de datas e top-N valores.
+    parsed: ParsedColumns da aba (reaproveita nulos e datas já convertidas pelas regras).
+    Retorna uma lista de dicts, um por coluna, na ordem da aba.
+    """
+    parsed = parsed or ParsedColumns(df)
+    rows = len(df)
+    null_counts = parsed.nulls().sum().to_numpy()
+    profile = []
+
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        nulls = int(null_counts[i])
+        stats = {
+            "Column": str(col),
+            "Rows": rows,
+            "Nulls": nulls,
+            "Null %": round(nulls / rows * 100, 2) if rows else 0.0,
+            "Distinct": 0,
+            "Approx": False,
+            "Min": None,
+            "Max": None,
+            "Top Values": [],
+        }
+        if nulls == rows:
+            profile.append(stats)
+            continue
+
+        values = series[~parsed.nulls().iloc[:, i].to_numpy()]
+        if len(values) > EXACT_LIMIT:
+            stats["Distinct"] = hll_distinct(values.to_numpy())
+            stats["Approx"] = True
+            step = int(np.ceil(len(values) / EXACT_LIMIT))
+            sample = values.iloc[::step]
+        else:
+            sample = values
+
+        # uma única fatoração dá distintos e contagens para o top-N
+        codes, uniques = pd.factorize(sample)
+        counts = np.bincount(codes, minlength=len(uniques))
+        if stats["Approx"]:
+            counts = np.round(counts * (len(values) / len(sample))).astype(np.int64)  # projeção p/ a coluna
+        if not stats["Approx"]:
+            stats["Distinct"] = int(len(uniques))
+        top = np.argsort(-counts, kind="stable")[:top_n]
+        stats["Top Values"] = [[_format(uniques[j]), int(counts[j])] for j in top]
+
+        if _is_date_column(col, series):
+            dates = parsed.dates(col).dropna()
+            if len(dates) and len(dates) >= len(values) / 2:
+                stats["Min"], stats["Max"] = _format(dates.min()), _format(dates.max())
+
+        profile.append(stats)
+    return profile
+
+
+def profile_html(profile, top_n=5):
+    """Tabela do dashboard: só colunas com algum valor; as vazias viram uma contagem."""
+    filled = [p for p in profile if p["Nulls"] < p["Rows"]]
+    empty = len(profile) - len(filled)
+    if not filled:
+        return f"<p><i>All {empty} columns are empty.</i></p>" if empty else ""
+
+    table = pd.DataFrame([{
+        "Column": p["Column"],
+        "Null %": p["Null %"],
+        "Distinct": f"≈{p['Distinct']}" if p["Approx"] else p["Distinct"],
+        "Min": p["Min"] or "",
+        "Max": p["Max"] or "",
+        "Top Values": ", ".join(f"{v} ({c})" for v, c in p["Top Values"][:top_n]),
+    } for p in filled])
+    html = table.to_html(index=False, border=0)
+    if empty:
+        html += f"<p><i>{empty} empty column(s) not shown.</i></p>"
+    return html
@@ -1,12 +1,29 @@
 import pandas as pd
 import re
 
+from input_formats import open_source
+
+
+def read_sheet(file_path: str, sheet_name=0, **kwargs):
+    """
+    Lê a aba pelo cache de snapshots: chamadas repetidas no mesmo arquivo
+    (detecção do header + leitura) não reparseiam o .xlsx.
+    """
+    source = open_source(file_path, snapshots=True)
+    try:
+        if isinstance(sheet_name, int):
+            sheet_name = source.sheet_names[sheet_name]
+        return source.read_sheet(sheet_name, **kwargs)
+    finally:
+        source.close()
+
+
 def detect_dgw_header(file_path: str, sheet_name: str = 0, max_scan: int = 15):
     """
     Detecta automaticamente o header do DGW baseado na linha de 'Required'/'Optional'.
     Retorna o índice (base 0) da linha onde os nomes de colunas começam.
     """
-    df_preview = pd.read_excel(file_path, sheet_name=sheet_name, header=None, nrows=max_scan)
+    df_preview = read_sheet(file_path, sheet_name, header=None, nrows=max_scan)
 
     for i, row in df_preview.iterrows():
         row_str = " ".join(str(x).strip().lower() for x in row if pd.notna(x))
@@ -26,7 +43,7 @@ def detect_dgw_header(file_path: str, sheet_name: str = 0, max_scan: int = 15):
 
 def read_with_auto_header(file_path: str, sheet_name: str = 0):
     header_row = detect_dgw_header(file_path, sheet_name)
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=header_row)
+    df = read_sheet(file_path, sheet_name, header=header_row)
     df.columns = [str(c).strip() for c in df.columns]
     print(f"✅ Colunas detectadas: {list(df.columns)}")
     return df
@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+# =============================================================================
+# Cliente leve do servidor de validação (só biblioteca padrão: inicia na hora)
+# =============================================================================
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+
+USAGE = """Usage:
+  python scripts/dgw_client.py status
+  python scripts/dgw_client.py validate [file ...] [--fast] [--sample[=N]] [--workers=N] [--json]
+  python scripts/dgw_client.py transform [--validate] [--json]
+  python scripts/dgw_client.py stop
+Options: --port=N (default 8765)"""
+
+
+def request(path, payload=None, host=SERVER_HOST, port=SERVER_PORT):
+    """GET (payload None) ou POST JSON para o servidor; devolve o JSON da resposta."""
+    url = f"http://{host}:{port}{path}"
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read().decode("utf-8") or "{}")
+
+
+def local_path(name):
+    """
+    Arquivo que existe a partir do diretório atual vai como caminho absoluto (o
+    servidor roda em outro diretório); nomes soltos seguem como estão e o
+    servidor os procura em data/curated.
+    """
+    return os.path.abspath(name) if os.path.exists(name) else name
+
+
+def print_results(reply):
+    if reply.get("error"):
+        print(f"❌ {reply['error']}")
+        return
+    for res in reply.get("results", []):
+        status = f" [{res['Status']}]" if res.get("Status") else ""
+        error = f" — {res['Error']}" if res.get("Error") else ""
+        print(f"  {res['File']} › {res['Sheet']}: {res['Failed']}/{res['Total Checks']} failed "
+              f"({res['Success %']}%){status}{error}")
+    for path in reply.get("outputs", []):
+        print(f"  ✅ {path}")
+    if reply.get("dashboard"):
+        print(f"📊 Dashboard: {reply['dashboard']}")
+    print(f"⏱ {reply.get('elapsed', 0)}s on the server")
+
+
+def main(args):
+    if not args or args[0] in ("-h", "--help"):
+        print(USAGE)
+        return 0
+
+    command, options = args[0], args[1:]
+    flags = [a for a in options if a.startswith("--")]
+    as_json = "--json" in flags
+    port = next((int(a.split("=", 1)[1]) for a in flags if a.startswith("--port=")), SERVER_PORT)
+
+    def call(path, payload=None):
+        return request(path, payload, port=port)
+
+    try:
+        if command == "status":
+            reply = call("/status")
+        elif command == "validate":
+            sample = next((int(a.split("=", 1)[1]) if "=" in a else True
+                           for a in flags if a.startswith("--sample")), None)
+            reply = call("/validate", {
+                "files": [local_path(a) for a in options if not a.startswith("--")],
+                "fast": "--fast" in flags,
+                "sample": sample,
+                "workers": next((int(a.split("=", 1)[1]) for a in flags if a.startswith("--workers=")), None),
+            })
+        elif command == "transform":
+            reply = call("/transform", {"validate": "--validate" in flags})
+        elif command == "stop":
+            reply = call("/shutdown", {})
+        else:
+            print(USAGE)
+            return 2
+    except urllib.error.URLError:
+        print(f"❌ Validation server is not running on {SERVER_HOST}:{port}.")
+        print("   Start it with: python scripts/dgw_server.py")
+        return 1
+
+    if as_json or command in ("status", "stop"):
+        print(json.dumps(reply, indent=2, ensure_ascii=False))
+    else:
+        print_results(reply)
+    return 1 if reply.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
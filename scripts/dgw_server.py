@@ -0,0 +1,204 @@
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dgw_client import SERVER_HOST, SERVER_PORT
+
+# Importados uma única vez: great_expectations, pandas e as regras globais
+# (carregadas no import do validate_all) ficam quentes entre os jobs.
+import validate_all
+from io_executor import IOExecutor
+from transform_to_dgw import transform_to_dgw, TEMPLATES_DIR
+from rule_index import load_rule_index
+from rule_expressions import load_expression_rules
+from event_sequence import load_sequence_config
+from template_rules import load_template_metadata
+from reference_sets import load_reference_set
+
+# campos pesados (HTML, perfil) ficam só no dashboard / JSON de perfil
+RESULT_FIELDS = ["File", "Sheet", "Type", "Total Checks", "Failed", "Success %",
+                 "Error", "Status", "Sampled Rows", "Total Rows"]
+
+
+# =============================================================================
+# Aquecimento dos caches
+# =============================================================================
+def warm_up():
+    """
+    Carrega tudo o que os jobs reaproveitam. Cada loader mantém o próprio cache
+    em memória e só recarrega quando o arquivo muda (mtime), então editar um
+    YAML ou template não exige reiniciar o servidor.
+    """
+    start = time.time()
+    rules, _, _ = load_rule_index(validate_all.RULES_FILE, validate_all.ALIAS_FILE)
+    load_expression_rules(validate_all.EXPRESSIONS_FILE)
+    load_sequence_config(validate_all.SEQUENCES_FILE)
+
+    templates = 0
+    if os.path.isdir(TEMPLATES_DIR):
+        for name in sorted(os.listdir(TEMPLATES_DIR)):
+            if name.lower().endswith(".xlsx"):
+                try:
+                    load_template_metadata(os.path.join(TEMPLATES_DIR, name))
+                    templates += 1
+                except Exception as e:
+                    print(f"⚠️ Template {name} not cached: {e}")
+
+    references = 0
+    for rule_set in (rules or {}).values():
+        reference = rule_set.get("reference") if isinstance(rule_set, dict) else None
+        if reference:
+            try:
+                load_reference_set(reference["file"], reference.get("column"))
+                references += 1
+            except Exception as e:
+                print(f"⚠️ Reference set {reference.get('file')} not cached: {e}")
+
+    print(f"🔥 Warm: {len(rules or {})} global rules, {templates} templates, "
+          f"{references} reference sets ({time.time() - start:.1f}s)")
+
+
+# =============================================================================
+# Jobs
+# =============================================================================
+def _slim(results):
+    return [{k: res.get(k) for k in RESULT_FIELDS if k in res} for res in results or []]
+
+
+def _dashboard():
+    return os.path.join(validate_all.OUTPUT_DIR, "validation_dashboard.html")
+
+
+def missing_files(files):
+    """Arquivos pedidos que não existem (mesma resolução do validate_all: relativos a DATA_DIR)."""
+    paths = [f if os.path.isabs(f) else os.path.join(validate_all.DATA_DIR, f) for f in files]
+    return [f for f, p in zip(files, paths) if not os.path.exists(p)]
+
+
+def run_validate(params):
+    missing = missing_files(params.get("files") or [])
+    if missing:
+        # recusa antes de rodar: um pedido inválido não substitui o último dashboard
+        return {"error": f"File(s) not found: {', '.join(missing)} (relative names are looked up in "
+                         f"{validate_all.DATA_DIR})"}
+    sample = params.get("sample")
+    if sample is True:
+        sample = validate_all.SAMPLE_ROWS
+    results = validate_all.main(fast=bool(params.get("fast")), sample=sample or None,
+                                only=params.get("files") or None, workers=params.get("workers"))
+    return {"results": _slim(results), "dashboard": _dashboard() if results else None}
+
+
+def run_transform(params):
+    with IOExecutor() as io_exec:
+        frames = transform_to_dgw(io_exec=io_exec, return_frames=True)
+        reply = {"outputs": sorted(frames)}
+        if params.get("validate") and frames:
+            # mesmo fluxo do pipeline completo: valida as abas direto da memória
+            results = validate_all.main(frames=frames, io_exec=io_exec)
+            reply.update(results=_slim(results), dashboard=_dashboard())
+    return reply
+
+
+JOBS = {
+    "/validate": run_validate,
+    "/transform": run_transform,
+}
+
+
+# =============================================================================
+# Servidor HTTP local
+# =============================================================================
+class DGWServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, DGWRequestHandler)
+        # um job por vez: validate_all/transform usam estado de módulo e as mesmas saídas
+        self.job_lock = threading.Lock()
+        self.started = time.time()
+        self.jobs = 0
+        self.current = None
+
+
+class DGWRequestHandler(BaseHTTPRequestHandler):
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass  # o log útil é o do próprio job
+
+    def do_GET(self):
+        if self.path != "/status":
+            return self._reply(404, {"error": f"Unknown endpoint {self.path}"})
+        server = self.server
+        self._reply(200, {
+            "status": "busy" if server.current else "idle",
+            "current_job": server.current,
+            "jobs_completed": server.jobs,
+            "uptime_s": round(time.time() - server.started, 1),
+            "pid": os.getpid(),
+        })
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": "Request body must be JSON"})
+
+        if self.path == "/shutdown":
+            self._reply(200, {"status": "stopping"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        job = JOBS.get(self.path)
+        if job is None:
+            return self._reply(404, {"error": f"Unknown endpoint {self.path}"})
+
+        server = self.server
+        with server.job_lock:
+            server.current = self.path.strip("/")
+            start = time.time()
+            print(f"\n📥 Job {server.current}: {params}")
+            try:
+                reply = job(params)
+                status = 400 if reply.get("error") else 200
+            except Exception as e:
+                traceback.print_exc()
+                reply, status = {"error": str(e)}, 500
+            finally:
+                server.current = None
+                server.jobs += 1
+            reply["elapsed"] = round(time.time() - start, 2)
+            print(f"📤 Job done in {reply['elapsed']}s")
+        self._reply(status, reply)
+
+
+def serve(host=SERVER_HOST, port=SERVER_PORT):
+    warm_up()
+    server = DGWServer((host, port))
+    print(f"🌐 DGW validation server listening on http://{host}:{port}")
+    print("   Client: python scripts/dgw_client.py validate [file ...]  |  stop: dgw_client.py stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("👋 Server stopped.")
+
+
+if __name__ == "__main__":
+    port = next((int(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith("--port=")), SERVER_PORT)
+    serve(port=port)
@@ -0,0 +1,280 @@
+import multiprocessing
+import os
+import pickle
+import shutil
+import threading
+import time
+
+import validate_all as va
+from failure_diff import FailureHistory
+from input_formats import list_sources, open_source
+from io_executor import IOExecutor
+from rule_stats import RuleStats
+from run_metrics import RunMetrics
+from task_queue import TaskQueue, worker_name, PENDING, RUNNING, DONE, FAILED
+from work_scheduler import xlsx_costs
+from worker_index import WorkerIndex
+
+CLAIM_BATCH = 4        # abas do mesmo arquivo reservadas de uma vez (o workbook é aberto uma vez)
+POLL_S = 1.0           # intervalo de consulta da fila
+TASK_LEASE_S = 1800    # tarefa "running" sem heartbeat há mais tempo que isso volta para a fila
+HEARTBEAT_S = 60       # intervalo de renovação do lease pelo worker
+MAX_ATTEMPTS = 2       # tentativas por tarefa antes de marcar como falha
+
+RESULTS_DIR = "results"
+INDEX_FILE = "worker_index.pkl"
+
+
+# =============================================================================
+# Tarefas (arquivo, aba)
+# =============================================================================
+def build_tasks(paths):
+    """
+    Uma tarefa por aba válida. As abas do PersonalContactInfo ficam na fase 1:
+    só são liberadas depois que todos os HireStack (fase 0) alimentaram o índice
+    de trabalhadores.
+    """
+    tasks = []
+    for path in paths:
+        file = os.path.basename(os.path.normpath(path))
+        if path.lower().endswith(".xlsx"):
+            costs, _ = xlsx_costs(path)
+        else:
+            source = open_source(path)
+            costs = {sheet: 1 for sheet in source.sheet_names}
+            source.close()
+        sheets = [s for s in costs if not s.strip().startswith(">")]
+        phase = 1 if va.detect_type(file) == "PersonalContactInfo" else 0
+        for position, sheet in enumerate(sheets):
+            tasks.append({"file": file, "path": os.path.abspath(path), "sheet": sheet,
+                          "position": position, "phase": phase, "cost": costs[sheet]})
+    return tasks
+
+
+def _write_pickle(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _partials(queue_dir, queue):
+    """
+    Resultados parciais aceitos: só os do worker que concluiu cada tarefa, naquela
+    reserva. Lotes refeitos por outro worker (lease vencido) aparecem uma vez só.
+    """
+    owners = {t["id"]: (t["worker"], t["attempts"]) for t in queue.tasks() if t["status"] == DONE}
+    results_dir = os.path.join(queue_dir, RESULTS_DIR)
+    for name in sorted(os.listdir(results_dir)):
+        if name.endswith(".pkl"):
+            with open(os.path.join(results_dir, name), "rb") as f:
+                part = pickle.load(f)
+            if all(owners.get(i) == (part["worker"], n) for i, n in part["claims"].items()):
+                yield part
+
+
+class _Heartbeat:
+    """Renova o lease do lote em segundo plano enquanto o worker valida (conexão própria com a fila)."""
+
+    def __init__(self, queue_dir, worker, claims, interval=None):
+        self.queue_dir = queue_dir
+        self.worker = worker
+        self.claims = claims
+        self.interval = HEARTBEAT_S if interval is None else interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        queue = TaskQueue(self.queue_dir)
+        try:
+            while not self._stop.wait(self.interval):
+                queue.heartbeat(self.worker, self.claims)
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# =============================================================================
+# Worker
+# =============================================================================
+def work(queue_dir, batch=CLAIM_BATCH):
+    """
+    Reserva tarefas até o coordenador encerrar a fila. Cada lote (abas de um
+    mesmo arquivo) vira um resultado parcial em <fila>/results/. O lease do lote
+    é renovado a cada HEARTBEAT_S; se mesmo assim o lote tiver sido devolvido à
+    fila e pego por outro worker, o resultado deste é descartado.
+    """
+    queue = TaskQueue(queue_dir)
+    me = worker_name()
+    results_dir = os.path.join(queue_dir, RESULTS_DIR)
+    run_index, run_index_stamp = None, None
+    last_path, done = None, 0
+    print(f"👷 Worker {me} attached to {queue_dir}")
+
+    with IOExecutor() as io_exec:
+        while True:
+            tasks = queue.claim(me, batch, last_path)
+            if not tasks:
+                if queue.meta("state") == "done":
+                    break
+                time.sleep(POLL_S)
+                continue
+
+            path, claims = tasks[0]["path"], {t["id"]: t["attempts"] for t in tasks}
+            last_path = path
+            if tasks[0]["phase"] == 1:
+                # índice completo publicado pelo coordenador ao fim da fase 0
+                index_path = os.path.join(queue_dir, INDEX_FILE)
+                stamp = os.stat(index_path).st_mtime_ns
+                if stamp != run_index_stamp:
+                    with open(index_path, "rb") as f:
+                        run_index, run_index_stamp = pickle.load(f), stamp
+                worker_index = run_index
+                worker_index.results = []
+            else:
+                worker_index = WorkerIndex()
+
+            run = va.RunContext(io_exec, worker_index, history=FailureHistory(), rule_stats=RuleStats())
+            first = min(claims)
+            part_path = os.path.join(results_dir, f"{first:08d}_{claims[first]}_{me.replace(':', '_')}.pkl")
+            try:
+                with _Heartbeat(queue_dir, me, claims):
+                    results = va.validate_dgw(path, run, sheets=[t["sheet"] for t in tasks])
+                    # CSVs de falhas em disco antes de a tarefa constar como feita (senão, nova tentativa)
+                    failed = io_exec.flush()
+                    if failed:
+                        raise failed[0][1]
+                _write_pickle(part_path, {
+                    "claims": claims,
+                    "worker": me,
+                    "results": results,
+                    "worker_index": worker_index if tasks[0]["phase"] == 0 else None,
+                    "consistency": worker_index.results,
+                    "history": run.history,
+                    "rule_stats": run.rule_stats,
+                })
+                if queue.complete(me, claims):
+                    done += len(claims)
+                else:
+                    os.remove(part_path)
+                    print(f"⚠️ Worker {me} lost the lease on {os.path.basename(path)}; result discarded")
+            except Exception as e:
+                print(f"❌ Worker {me} failed on {os.path.basename(path)}: {e}")
+                queue.fail(me, claims, e, MAX_ATTEMPTS)
+
+    queue.close()
+    print(f"👷 Worker {me} finished: {done} sheet(s)")
+
+
+# =============================================================================
+# Coordenador
+# =============================================================================
+def coordinate(queue_dir, local_workers=0, only=None):
+    """
+    Cria a fila com as abas de data/curated (ou só de `only`), opcionalmente sobe
+    workers locais, libera a fase 1 quando a fase 0 termina e, no fim, junta os
+    resultados parciais num único dashboard.
+    Workers em outros hosts: python scripts/validate_all.py --worker=<mesma pasta>
+    """
+    if only:
+        paths = [p if os.path.isabs(p) else os.path.join(va.DATA_DIR, p) for p in only]
+    else:
+        paths = [os.path.join(va.DATA_DIR, f) for f in list_sources(va.DATA_DIR)]
+    files = sorted((os.path.basename(os.path.normpath(p)) for p in paths),
+                   key=lambda f: (va.detect_type(f) != "HireStack", f))
+
+    tasks = build_tasks(paths)
+    shutil.rmtree(os.path.join(queue_dir, RESULTS_DIR), ignore_errors=True)
+    os.makedirs(os.path.join(queue_dir, RESULTS_DIR))
+    if os.path.exists(os.path.join(queue_dir, INDEX_FILE)):
+        os.remove(os.path.join(queue_dir, INDEX_FILE))
+    queue = TaskQueue.create(queue_dir, tasks)
+    print(f"🗂 Queue {queue.path}: {len(tasks)} sheet task(s) from {len(files)} file(s)")
+
+    procs = [multiprocessing.Process(target=work, args=(queue_dir,), daemon=True) for _ in range(local_workers)]
+    for p in procs:
+        p.start()
+    if procs:
+        print(f"👷 Started {len(procs)} local worker process(es)")
+
+    metrics = RunMetrics("distributed")
+    start, last_log, phase_open = time.time(), 0.0, False
+    while True:
+        if queue.requeue_stale(TASK_LEASE_S, MAX_ATTEMPTS):
+            print("⚠️ Re-queued tasks whose worker stopped responding")
+
+        if not phase_open:
+            phase0 = queue.counts(phase=0)
+            if not phase0[PENDING] and not phase0[RUNNING]:
+                run_index = WorkerIndex()
+                for part in _partials(queue_dir, queue):
+                    if part["worker_index"] is not None:
+                        run_index.merge(part["worker_index"])
+                _write_pickle(os.path.join(queue_dir, INDEX_FILE), run_index)
+                queue.open_phase(1)
+                phase_open = True
+                print(f"🔓 Phase 0 done; worker index with {len(run_index)} IDs published")
+
+        counts = queue.counts()
+        if phase_open and not counts[PENDING] and not counts[RUNNING]:
+            break
+        if time.time() - last_log > 10:
+            print(f"⏳ {counts['done']}/{len(tasks)} done, {counts[RUNNING]} running, "
+                  f"{counts[PENDING]} pending, {counts[FAILED]} failed")
+            last_log = time.time()
+        if procs and not any(p.is_alive() for p in procs) and counts[RUNNING] == 0:
+            print("⚠️ All local workers exited; waiting for remote workers...")
+            procs = []
+        time.sleep(POLL_S)
+
+    queue.finish()
+    for p in procs:
+        p.join()
+
+    # ---------------------------------------------------------
+    # Junção dos resultados parciais
+    # ---------------------------------------------------------
+    positions = {(t["file"], t["sheet"]): t["position"] for t in tasks}
+    run_index = WorkerIndex()
+    history = FailureHistory(va.HISTORY_DIR)
+    rule_stats = RuleStats(va.HISTORY_DIR)
+    per_worker = {}
+    results = []
+    for part in _partials(queue_dir, queue):
+        results.extend(part["results"])
+        if part["worker_index"] is not None:
+            run_index.merge(part["worker_index"])
+        run_index.results.extend(part["consistency"])
+        history.merge(part["history"])
+        if part.get("rule_stats") is not None:
+            rule_stats.merge(part["rule_stats"])
+        per_worker[part["worker"]] = per_worker.get(part["worker"], 0) + len(part["claims"])
+
+    for task in queue.tasks():
+        if task["status"] == FAILED:
+            results.append({
+                "File": task["file"], "Sheet": task["sheet"], "Type": va.detect_type(task["file"]),
+                "Total Checks": 0, "Failed": 0, "Success %": 0,
+                "Error": f"❌ Worker task failed: {task['error']}", "Fail HTML": "",
+            })
+    queue.close()
+
+    order = {f: i for i, f in enumerate(files)}
+    results.sort(key=lambda r: (order.get(r["File"], len(order)), positions.get((r["File"], r["Sheet"]), 0)))
+
+    elapsed = time.time() - start
+    metrics.add("validate", elapsed)
+    print(f"\n🧮 Distributed run: {len(tasks)} sheets in {elapsed:.1f}s by {len(per_worker)} worker(s)")
+    for worker, n in sorted(per_worker.items()):
+        print(f"   • {worker}: {n} sheet(s)")
+
+    with IOExecutor() as io_exec:
+        run = va.RunContext(io_exec, run_index, history=history, metrics=metrics, rule_stats=rule_stats)
+        return va.write_dashboard(run, results)
@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from rule_expressions import find_column
+from rule_index import normalize_header
+from run_metrics import count_cache
+from sheet_schema import plain_values
+
+DUPLICATE = "Duplicate effective-dated event"
+SEQUENCE_GAP = "Effective Sequence gap"
+OUT_OF_ORDER = "Events out of chronological order"
+
+
+# =============================================================================
+# Configuração (config/event_sequences.yaml)
+# =============================================================================
+class SequenceConfig:
+    """Abas com eventos datados e a ordem esperada entre elas (estágios)."""
+
+    def __init__(self, config):
+        config = config or {}
+        default_key = config.get("key", "Employee ID")
+        self.sheets = {}
+        for sheet, spec in (config.get("sheets") or {}).items():
+            self.sheets[normalize_header(sheet)] = dict(spec, key=spec.get("key", default_key), name=sheet)
+
+        self.stage = {}
+        for i, entry in enumerate(config.get("order") or []):
+            for sheet in (entry if isinstance(entry, list) else [entry]):
+                self.stage[normalize_header(sheet)] = i
+
+    def spec(self, sheet_name):
+        return self.sheets.get(normalize_header(sheet_name))
+
+    def earlier_sheets(self, sheet_name):
+        """Abas configuradas em estágios anteriores ao desta aba."""
+        stage = self.stage.get(normalize_header(sheet_name))
+        if stage is None:
+            return []
+        return [spec["name"] for key, spec in self.sheets.items() if self.stage.get(key, stage) < stage]
+
+
+_CACHE = {}
+
+
+def load_sequence_config(path):
+    """SequenceConfig do YAML (em cache até o arquivo mudar); None se não existir."""
+    if not os.path.exists(path):
+        return None
+    stamp = os.stat(path).st_mtime_ns
+    cached = _CACHE.get(path)
+    count_cache("event_sequences", bool(cached and cached[0] == stamp))
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        config = SequenceConfig(yaml.safe_load(f))
+    _CACHE[path] = (stamp, config)
+    return config
+
+
+# =============================================================================
+# Eventos de uma aba
+# =============================================================================
+def event_frame(df, spec, parsed=None):
+    """
+    Extrai só o necessário da aba: trabalhador, data, sequência e posição da linha.
+    Linhas sem trabalhador ou sem data válida ficam de fora (not_null cobre isso).
+    parsed: ParsedColumns da aba — a data convertida fica disponível para o profiling.
+    Retorna None se a aba não tiver as colunas configuradas.
+    """
+    key_col, date_col = find_column(df, spec["key"]), find_column(df, spec["date"])
+    if key_col is None or date_col is None:
+        return None
+    seq_col = find_column(df, spec["sequence"]) if spec.get("sequence") else None
+
+    events = pd.DataFrame({
+        "key": df[key_col].astype(str).str.strip().where(df[key_col].notna()),
+        "date": parsed.dates(date_col) if parsed is not None else pd.to_datetime(df[date_col], errors="coerce"),
+        "seq": pd.to_numeric(plain_values(df[seq_col]), errors="coerce").fillna(0) if seq_col else 0.0,
+        "pos": np.arange(len(df)),
+    })
+    return events.dropna(subset=["key", "date"])
+
+
+def check_sequence(events, n_rows):
+    """
+    Ordena os eventos uma única vez por (trabalhador, data, sequência, linha) e
+    compara cada evento com o anterior (deslocamento de 1) do mesmo trabalhador:
+    - mesma data e mesma sequência → duplicado
+    - mesma data e sequência saltando mais de 1 → lacuna
+    - linha do arquivo anterior à do evento cronologicamente anterior → fora de ordem
+    Retorna {regra: máscara bool com n_rows posições}.
+    """
+    masks = {name: np.zeros(n_rows, dtype=bool) for name in (DUPLICATE, SEQUENCE_GAP, OUT_OF_ORDER)}
+    if len(events) < 2:
+        return masks
+
+    key_codes = pd.factorize(events["key"])[0]
+    dates = events["date"].to_numpy("datetime64[ns]").view("int64")
+    seqs = events["seq"].to_numpy(dtype=np.float64)
+    pos = events["pos"].to_numpy()
+
+    order = np.lexsort((pos, seqs, dates, key_codes))
+    k, d, s, p = key_codes[order], dates[order], seqs[order], pos[order]
+
+    same_worker = k[1:] == k[:-1]
+    same_day = same_worker & (d[1:] == d[:-1])
+    later = p[1:]
+
+    masks[DUPLICATE][later[same_day & (s[1:] == s[:-1])]] = True
+    masks[SEQUENCE_GAP][later[same_day & (s[1:] - s[:-1] > 1)]] = True
+    masks[OUT_OF_ORDER][later[same_worker & (p[1:] < p[:-1])]] = True
+    return masks
+
+
+def check_stage_order(events, earlier_events, n_rows):
+    """
+    Eventos desta aba com data anterior ao último evento do mesmo trabalhador nas
+    abas de estágios anteriores (ex.: Job Change antes da contratação, desligamento
+    antes da última mudança de cargo).
+    """
+    mask = np.zeros(n_rows, dtype=bool)
+    earlier = [e for e in earlier_events if e is not None and len(e)]
+    if not len(events) or not earlier:
+        return mask
+    latest = pd.concat([e[["key", "date"]] for e in earlier]).groupby("key")["date"].max()
+    bound = events["key"].map(latest)
+    bad = (events["date"] < bound).to_numpy()
+    mask[events["pos"].to_numpy()[bad]] = True
+    return mask
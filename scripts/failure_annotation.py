@@ -0,0 +1,206 @@
+import os
+import sys
+from copy import copy
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.comments import Comment
+from openpyxl.styles import PatternFill
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data", "curated")
+FAILS_DIR = os.path.join(BASE_DIR, "outputs", "failures")
+ANNOTATED_DIR = os.path.join(BASE_DIR, "outputs", "annotated")
+
+HEADER_ROW = 6                                    # cabeçalho fixo dos templates DGW
+FAIL_FILL = PatternFill("solid", fgColor="FFC7CE")  # vermelho claro ("ruim" do Excel)
+COMMENT_AUTHOR = "DGW Validation"
+MAX_RULES_PER_COMMENT = 5
+
+# chave única por célula: linha * COLUMN_STRIDE + coluna (o Excel tem até 16384 colunas)
+COLUMN_STRIDE = 1 << 14
+
+
+# =============================================================================
+# Falhas por aba → arrays ordenados de células
+# =============================================================================
+def pandas_headers(values):
+    """Nomes que pd.read_excel daria às colunas (vazios → "Unnamed: i", duplicados → ".1")."""
+    names, seen = [], {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None or value == "" else str(value)
+        base = name
+        while name in seen:
+            seen[base] += 1
+            name = f"{base}.{seen[base]}"
+        seen[name] = 0
+        names.append(name)
+    return names
+
+
+def failure_cells(fails, headers):
+    """
+    Converte as falhas de uma aba (Column, Row, Rule) em:
+    - rows, cols: arrays ordenados por (linha, coluna), uma entrada por célula
+    - texts: comentário de cada célula (regras distintas que falharam nela)
+    - unplaced: falhas sem célula (coluna fora do cabeçalho da aba ou linha "-"
+      das falhas de coluna inteira em CSVs antigos)
+    """
+    positions = {name: i for i, name in enumerate(headers)}
+    cols = fails["Column"].astype(str).map(positions)
+    rows = pd.to_numeric(fails["Row"], errors="coerce")
+    placed = (cols.notna() & rows.notna()).to_numpy()
+    keys = rows[placed].to_numpy(dtype=np.int64) * COLUMN_STRIDE + cols[placed].to_numpy(dtype=np.int64)
+
+    cells = (pd.DataFrame({"Key": keys, "Rule": fails["Rule"].astype(str).to_numpy()[placed]})
+             .drop_duplicates()
+             .groupby("Key", sort=True)["Rule"]
+             .agg(list))
+    keys = cells.index.to_numpy(dtype=np.int64)
+    texts = []
+    for rules in cells:
+        shown = rules[:MAX_RULES_PER_COMMENT]
+        more = f"\n(+{len(rules) - len(shown)} more)" if len(rules) > len(shown) else ""
+        texts.append("Failed: " + "\n".join(shown) + more)
+    return keys // COLUMN_STRIDE, keys % COLUMN_STRIDE, texts, int((~placed).sum())
+
+
+# =============================================================================
+# Cópia anotada em uma passada
+# =============================================================================
+class _StyleCopier:
+    """
+    Copia estilos do workbook de origem. Cada estilo distinto é registrado no
+    workbook de saída uma vez; as demais células recebem só o StyleArray pronto
+    (atribuir font/fill/... célula a célula domina o tempo em abas grandes).
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def apply(self, src, dst):
+        style = self._cache.get(src._style_id)
+        if style is None:
+            dst.font, dst.fill, dst.border = copy(src.font), copy(src.fill), copy(src.border)
+            dst.alignment, dst.protection = copy(src.alignment), copy(src.protection)
+            dst.number_format = src.number_format
+            self._cache[src._style_id] = copy(dst._style)
+        else:
+            dst._style = copy(style)
+
+
+def annotate_workbook(src_path, out_path, sheet_failures, header_row=HEADER_ROW):
+    """
+    Lê o DGW em streaming (read_only) e grava uma cópia (write_only) com as
+    células que falharam preenchidas e com um comentário listando as regras.
+    sheet_failures: {aba: DataFrame com Column, Row, Rule} — Row na numeração do Excel.
+    A passada é linear no tamanho da aba: as células com falha vêm ordenadas por
+    (linha, coluna) e são consumidas por um ponteiro enquanto as linhas passam.
+    A cópia leva valores e estilos das células; larguras de coluna, mesclagens e
+    validações de dados do template não são copiadas (o arquivo é para correção,
+    o DGW original continua sendo o entregável).
+    Retorna {aba: (células anotadas, falhas sem coluna correspondente)}.
+    """
+    src = load_workbook(src_path, read_only=True)
+    out = Workbook(write_only=True)
+    styles = _StyleCopier()
+    report = {}
+
+    for ws in src.worksheets:
+        out_ws = out.create_sheet(ws.title)
+        fails = sheet_failures.get(ws.title)
+        rows = cols = texts = None
+        ptr, annotated, unplaced = 0, 0, 0
+        ws.reset_dimensions()  # não confia na dimensão gravada: lê as linhas como estão no XML
+        if fails is not None and len(fails):
+            # write_only grava a visão da aba antes da 1ª linha: congelar depois não tem efeito
+            out_ws.freeze_panes = f"A{header_row + 1}"
+
+        for r, row in enumerate(ws.iter_rows(), start=1):
+            values = list(row)
+
+            if r == header_row and fails is not None and len(fails):
+                rows, cols, texts, unplaced = failure_cells(fails, pandas_headers([c.value for c in values]))
+
+            marked = {}
+            if rows is not None:
+                while ptr < len(rows) and rows[ptr] < r:
+                    ptr += 1  # linhas fora da aba (não deveria ocorrer)
+                while ptr < len(rows) and rows[ptr] == r:
+                    marked[int(cols[ptr])] = texts[ptr]
+                    ptr += 1
+                if marked:
+                    # campos obrigatórios vazios podem estar depois da última célula da linha
+                    values.extend([None] * (max(marked) + 1 - len(values)))
+
+            line = []
+            for c, cell in enumerate(values):
+                value = getattr(cell, "value", None)
+                text = marked.get(c)
+                if text is None and not getattr(cell, "has_style", False):
+                    line.append(value)
+                    continue
+                out_cell = WriteOnlyCell(out_ws, value=value)
+                if getattr(cell, "has_style", False):
+                    styles.apply(cell, out_cell)
+                if text is not None:
+                    out_cell.fill = FAIL_FILL
+                    out_cell.comment = Comment(text, COMMENT_AUTHOR)
+                    annotated += 1
+                line.append(out_cell)
+            out_ws.append(line)
+
+        if fails is not None:
+            report[ws.title] = (annotated, unplaced)
+
+    src.close()
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    out.save(out_path)
+    return report
+
+
+def annotated_path(file_name, directory=None):
+    return os.path.join(directory or ANNOTATED_DIR, f"{os.path.splitext(file_name)[0]}_annotated.xlsx")
+
+
+def print_report(out_path, report):
+    for sheet, (annotated, unplaced) in report.items():
+        extra = f" ({unplaced} failure(s) without a matching column)" if unplaced else ""
+        print(f"   🖍 {sheet}: {annotated} cell(s) highlighted{extra}")
+    print(f"🖍 Annotated workbook saved to: {out_path}")
+
+
+# =============================================================================
+# Uso avulso: anota a partir dos CSVs de falhas de uma validação anterior
+# =============================================================================
+def failures_from_csvs(file_name, fails_dir=None):
+    """{aba: falhas} lidas de <arquivo>_<aba>_failures.csv (só as colunas usadas)."""
+    fails_dir = fails_dir or FAILS_DIR
+    prefix, suffix = f"{file_name}_", "_failures.csv"
+    sheet_failures = {}
+    for name in sorted(os.listdir(fails_dir)) if os.path.isdir(fails_dir) else []:
+        if name.startswith(prefix) and name.endswith(suffix):
+            sheet = name[len(prefix):-len(suffix)]
+            sheet_failures[sheet] = pd.read_csv(os.path.join(fails_dir, name), usecols=["Column", "Row", "Rule"],
+                                                dtype=str, encoding="utf-8-sig")
+    return sheet_failures
+
+
+def main(files=None):
+    files = files or [f for f in sorted(os.listdir(DATA_DIR)) if f.lower().endswith(".xlsx")]
+    for file in files:
+        path = file if os.path.isabs(file) else os.path.join(DATA_DIR, file)
+        name = os.path.basename(path)
+        sheet_failures = failures_from_csvs(name)
+        if not sheet_failures:
+            print(f"⚠️ No failure CSVs for {name} — run the validation first.")
+            continue
+        out_path = annotated_path(name)
+        print(f"🖍 Annotating {name}...")
+        print_report(out_path, annotate_workbook(path, out_path, sheet_failures))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
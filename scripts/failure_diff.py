@@ -0,0 +1,167 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from failure_store import hash_strings
+from input_formats import source_stem
+from rule_expressions import find_column
+
+# colunas usadas como chave de negócio da linha (a 1ª encontrada na aba);
+# sem nenhuma delas, a falha é identificada pela linha do arquivo
+BUSINESS_KEYS = ["Employee ID", "Contingent Worker ID", "Worker ID", "Applicant ID", "Position ID"]
+
+KEYS_FILE = "failure_keys.npy"
+INDEX_FILE = "failure_keys.json"
+
+# 2: escopo com o arquivo (históricos no formato anterior são descartados)
+HISTORY_VERSION = 2
+
+
+def scope_name(dgw_type, sheet_name, file_name=None):
+    """
+    Escopo da falha: tipo de DGW + arquivo (nome base, sem extensão) + aba.
+    Arquivos do mesmo tipo (BR e US HireStack) ficam em escopos separados: uma
+    validação só de um deles não mexe nas chaves do outro.
+    Sem file_name: só tipo + aba (ex.: colunas sem regra por aba do template).
+    """
+    if file_name is None:
+        return f"{dgw_type}|{sheet_name.strip()}"
+    return f"{dgw_type}|{source_stem(file_name)}|{sheet_name.strip()}"
+
+
+def row_key_hashes(df, row_numbers):
+    """
+    Função rows → uint64 com o hash da chave de negócio de cada linha com falha.
+    row_numbers: linha do arquivo de cada linha do df (ordem crescente).
+    """
+    key_col = next((c for c in (find_column(df, k) for k in BUSINESS_KEYS) if c is not None), None)
+    if key_col is None:
+        keys = pd.Series([f"#{n}" for n in row_numbers], dtype=object)
+    else:
+        # linhas sem chave caem para a numeração do arquivo
+        keys = df[key_col].astype(str).str.strip().where(df[key_col].notna())
+        keys = keys.fillna(pd.Series([f"#{n}" for n in row_numbers], index=df.index))
+    hashes = hash_strings(keys.to_numpy())
+
+    def lookup(rows):
+        pos = np.searchsorted(row_numbers, np.asarray(rows, dtype=np.int64))
+        return hashes[np.minimum(pos, len(hashes) - 1)]
+
+    return lookup
+
+
+# =============================================================================
+# Histórico de falhas entre execuções
+# =============================================================================
+class FailureHistory:
+    """
+    Conjunto de chaves de falha (uint64) da execução anterior, comparado com o da
+    execução atual sem reler CSVs antigos.
+
+    Em disco: failure_keys.npy com as chaves ordenadas dentro de cada escopo
+    (tipo de DGW + arquivo + aba) e failure_keys.json com {escopo: [início, fim]}.
+    O .npy é aberto com mmap: só os segmentos dos escopos validados agora são lidos.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.previous_run = None
+        self._old_keys = np.empty(0, dtype=np.uint64)
+        self._old_index = {}
+        self._current = {}
+
+        if directory is None:
+            return  # só coleta as chaves (ex.: worker do modo distribuído)
+        keys_path = os.path.join(directory, KEYS_FILE)
+        index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(keys_path) and os.path.exists(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("version") != HISTORY_VERSION:
+                    print("⚠️ Failure history from an older format ignored — this run records a new baseline")
+                    return
+                self._old_keys = np.load(keys_path, mmap_mode="r")
+                self._old_index = meta.get("scopes", {})
+                self.previous_run = meta.get("generated_at")
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Failure history ignored ({e})")
+
+    def _old(self, scope):
+        start, end = self._old_index.get(scope, (0, 0))
+        return self._old_keys[start:end]
+
+    def add(self, scope, keys):
+        """Chaves de falha de uma aba validada nesta execução (abas sem falhas também entram)."""
+        keys = np.unique(np.asarray(keys, dtype=np.uint64))
+        if scope in self._current:
+            keys = np.union1d(self._current[scope], keys)
+        self._current[scope] = keys
+
+    def merge(self, other):
+        """Acrescenta as chaves coletadas por outro FailureHistory (resultados parciais)."""
+        for scope, keys in other._current.items():
+            self.add(scope, keys)
+
+    def __getstate__(self):
+        # só as chaves desta execução viajam entre processos (sem o mmap do histórico)
+        state = self.__dict__.copy()
+        state["_old_keys"] = np.empty(0, dtype=np.uint64)
+        state["_old_index"] = {}
+        return state
+
+    def diff(self):
+        """DataFrame por escopo: New / Resolved / Persisting (chaves distintas)."""
+        rows = []
+        for scope, new in self._current.items():
+            old = self._old(scope)
+            # junção pelas chaves: os dois lados já estão ordenados
+            pos = np.searchsorted(old, new)
+            hit = np.zeros(len(new), dtype=bool)
+            inside = pos < len(old)
+            hit[inside] = old[pos[inside]] == new[inside]
+            persisting = int(hit.sum())
+            dgw_type, file_stem, sheet = scope.split("|", 2)
+            rows.append({
+                "Type": dgw_type,
+                "File": file_stem,
+                "Sheet": sheet,
+                "New": len(new) - persisting,
+                "Resolved": len(old) - persisting,
+                "Persisting": persisting,
+                "First Run": scope not in self._old_index,
+            })
+        columns = ["Type", "File", "Sheet", "New", "Resolved", "Persisting", "First Run"]
+        return pd.DataFrame(rows, columns=columns)
+
+    def save(self, generated_at):
+        """
+        Grava o conjunto desta execução, arquivo a arquivo: escopos que não foram
+        validados agora (arquivo ausente hoje ou fora de uma validação parcial,
+        ex.: --only ou /validate com "files") mantêm as chaves da execução anterior.
+        """
+        scopes = dict(self._current)
+        for scope in self._old_index:
+            scopes.setdefault(scope, np.asarray(self._old(scope)))
+
+        index, parts, offset = {}, [], 0
+        for scope in sorted(scopes):
+            keys = scopes[scope]
+            index[scope] = [offset, offset + len(keys)]
+            parts.append(keys)
+            offset += len(keys)
+        keys = np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+
+        os.makedirs(self.directory, exist_ok=True)
+        keys_path = os.path.join(self.directory, KEYS_FILE)
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        with open(keys_path + ".tmp", "wb") as f:
+            np.save(f, keys)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": HISTORY_VERSION, "generated_at": generated_at, "scopes": index}, f,
+                      ensure_ascii=False)
+        self._old_keys = np.empty(0, dtype=np.uint64)  # libera o mmap antes de substituir
+        os.replace(keys_path + ".tmp", keys_path)
+        os.replace(index_path + ".tmp", index_path)
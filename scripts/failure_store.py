@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def combine_hashes(a, b):
+    """Combina dois arrays uint64 de hashes (mistura estilo boost::hash_combine)."""
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    return a ^ (b + _GOLDEN + (a << np.uint64(6)) + (a >> np.uint64(2)))
+
+
+def hash_strings(values):
+    """Hash uint64 estável (independe da execução) de uma sequência de textos."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+# =============================================================================
+# Armazenamento compacto de falhas
+# =============================================================================
+class FailureStore:
+    """
+    Guarda as falhas de uma aba em arrays colunares em vez de um dict por falha:
+    - Row: int32 (linha no Excel)
+    - Column / Rule: ids categóricos (int16) → cada nome é guardado uma única vez
+    - Value: ids (int32) para uma tabela de valores distintos
+
+    A lista completa só é materializada em disco (write_csv); o dashboard usa
+    summary(), que agrega por coluna/regra com contagens e top-N valores.
+    """
+
+    NULL_ID = 0
+
+    def __init__(self):
+        self._columns, self._column_ids = [], {}
+        self._rules, self._rule_ids = [], {}
+        self._values, self._value_ids = [None], {}
+        self._chunks = []  # (col_id, rule_id, rows int32, value codes int32)
+
+    def __len__(self):
+        return sum(len(c[2]) for c in self._chunks)
+
+    @staticmethod
+    def _intern(name, names, ids):
+        i = ids.get(name)
+        if i is None:
+            i = ids[name] = len(names)
+            names.append(name)
+        return i
+
+    def _encode_values(self, values):
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        table = np.empty(len(uniques) + 1, dtype=np.int32)
+        table[-1] = self.NULL_ID  # factorize marca nulos com -1
+        for i, v in enumerate(uniques):
+            key = (type(v), v)
+            vid = self._value_ids.get(key)
+            if vid is None:
+                vid = self._value_ids[key] = len(self._values)
+                self._values.append(v)
+            table[i] = vid
+        return table[codes]
+
+    def add(self, column, rule, rows, values):
+        """Registra as falhas de uma regra em uma coluna (rows já em numeração do Excel)."""
+        rows = np.asarray(rows, dtype=np.int32)
+        if not len(rows):
+            return
+        self._chunks.append((
+            np.int16(self._intern(column, self._columns, self._column_ids)),
+            np.int16(self._intern(rule, self._rules, self._rule_ids)),
+            rows,
+            self._encode_values(values),
+        ))
+
+    # ---------------------------------------------------------
+    # Saídas
+    # ---------------------------------------------------------
+    def _chunk_frame(self, chunk, value_table):
+        col_id, rule_id, rows, codes = chunk
+        values = value_table[codes]
+        return pd.DataFrame({
+            "Column": self._columns[col_id],
+            "Row": rows,
+            "Value": values,
+            "Rule": self._rules[rule_id],
+        })
+
+    def write_csv(self, path, encoding="utf-8-sig"):
+        """Grava a lista completa de falhas em streaming, um bloco por regra."""
+        value_table = np.empty(len(self._values), dtype=object)
+        value_table[:] = self._values
+        with open(path, "w", encoding=encoding, newline="") as f:
+            header = True
+            for chunk in self._chunks:
+                self._chunk_frame(chunk, value_table).to_csv(f, index=False, header=header)
+                header = False
+            if header:
+                f.write("Column,Row,Value,Rule\n")
+
+    def cells(self):
+        """Células com falha (Column, Row, Rule), sem os valores — para anotar o workbook."""
+        if not self._chunks:
+            return pd.DataFrame(columns=["Column", "Row", "Rule"])
+        return pd.DataFrame({
+            "Column": np.concatenate([np.repeat(self._columns[c], len(rows)) for c, _, rows, _ in self._chunks]),
+            "Row": np.concatenate([rows for _, _, rows, _ in self._chunks]),
+            "Rule": np.concatenate([np.repeat(self._rules[r], len(rows)) for _, r, rows, _ in self._chunks]),
+        })
+
+    def summary(self, top_n=5):
+        """Agregado por (coluna, regra): total de falhas, valores distintos e top-N valores."""
+        groups = {}
+        for col_id, rule_id, _, codes in self._chunks:
+            groups.setdefault((col_id, rule_id), []).append(codes)
+
+        rows = []
+        for (col_id, rule_id), parts in groups.items():
+            codes = np.concatenate(parts)
+            counts = np.bincount(codes)
+            present = np.flatnonzero(counts)
+            top = present[np.argsort(-counts[present], kind="stable")][:top_n]
+            rows.append({
+                "Column": self._columns[col_id],
+                "Rule": self._rules[rule_id],
+                "Failures": int(len(codes)),
+                "Distinct Values": int(len(present)),
+                "Top Values": ", ".join(
+                    f"{self._format_value(self._values[v])} ({counts[v]})" for v in top
+                ),
+            })
+        return pd.DataFrame(rows, columns=["Column", "Rule", "Failures", "Distinct Values", "Top Values"])
+
+    def hashed_keys(self, scope, row_keys):
+        """
+        Chave estável (uint64) de cada falha, para comparar execuções:
+        hash(scope, coluna, regra) ⊕ row_keys(rows) ⊕ hash(valor).
+        scope: identifica tipo de DGW, arquivo e aba (ex.: "HireStack|BR_HCM_03_HireStack_DGW_ready|Hire Employee")
+        row_keys: função rows (numeração do arquivo) → uint64, com a chave de
+            negócio da linha (ex.: Employee ID) ou a própria linha.
+        """
+        if not self._chunks:
+            return np.empty(0, dtype=np.uint64)
+        value_hashes = hash_strings([self._format_value(v) for v in self._values])
+        parts = []
+        for col_id, rule_id, rows, codes in self._chunks:
+            base = hash_strings([f"{scope}\x1f{self._columns[col_id]}\x1f{self._rules[rule_id]}"])
+            h = combine_hashes(np.repeat(base, len(rows)), row_keys(rows))
+            parts.append(combine_hashes(h, value_hashes[codes]))
+        return np.concatenate(parts)
+
+    @staticmethod
+    def _format_value(v):
+        if v is None or (isinstance(v, float) and np.isnan(v)):
+            return "<empty>"
+        return repr(v) if isinstance(v, str) else str(v)
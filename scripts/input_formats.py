@@ -0,0 +1,242 @@
+import io
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+from row_sampling import stratified_offsets, sample_worksheet, xlsx_sheet_parts, xlsx_last_data_row
+from sheet_snapshot import SnapshotReader, snapshots_available
+
+EXCEL_EXTENSIONS = (".xlsx",)
+BUNDLE_EXTENSIONS = (".csv", ".parquet")
+
+# linhas por bloco na contagem de registros de um CSV (só a primeira coluna é lida)
+CSV_COUNT_CHUNK = 200_000
+
+
+# =============================================================================
+# Fontes de dados: workbook Excel ou pacote (diretório/zip) com um arquivo por aba
+# =============================================================================
+class ExcelSource:
+    """
+    Workbook .xlsx aberto uma única vez; as abas são lidas sob demanda.
+    snapshots: abas lidas do cache de snapshots Arrow (sheet_snapshot.py) — o
+    workbook só é parseado quando falta o snapshot de alguma aba.
+    """
+
+    kind = "xlsx"
+
+    def __init__(self, path, data=None, snapshots=False):
+        self.path = path
+        self._data = data
+        self._xl = None
+        self._snapshots = None
+        if snapshots and data is None and snapshots_available():
+            self._snapshots = SnapshotReader(path)
+            self.sheet_names = list(self._snapshots.sheet_names)
+        else:
+            self.sheet_names = list(self._excel().sheet_names)
+
+    def _excel(self):
+        if self._xl is None:
+            self._xl = pd.ExcelFile(self._data if self._data is not None else self.path)
+        return self._xl
+
+    def find_sheet(self, name):
+        return name if name in self.sheet_names else None
+
+    def read_sheet(self, sheet, header=0, **kwargs):
+        if self._snapshots is not None:
+            return self._snapshots.read_sheet(sheet, header=header, **kwargs)
+        return pd.read_excel(self._excel(), sheet_name=sheet, header=header, **kwargs)
+
+    def columns(self, sheet, header=0):
+        """Cabeçalho da aba (nomes como o read_sheet daria), sem ler as linhas de dados."""
+        return list(self.read_sheet(sheet, header=header, nrows=0).columns)
+
+    def first_row(self, sheet, header):
+        """Número (1-based) da primeira linha de dados da aba no arquivo original."""
+        return header + 2
+
+    def sample_sheet(self, sheet, header, size, strata=10, seed=0):
+        """
+        Amostra estratificada de linhas da aba, lida por streaming (read_only).
+        Retorna (DataFrame, número das linhas no Excel, total estimado de linhas).
+        """
+        ws = self._excel().book[sheet]  # o pandas abre o workbook em modo read_only
+        last_row = None
+        try:
+            if self._data is not None:
+                self._data.seek(0)
+            with zipfile.ZipFile(self._data if self._data is not None else self.path) as zf:
+                part = xlsx_sheet_parts(zf).get(sheet)
+                last_row = xlsx_last_data_row(zf, part) if part else None
+        except (KeyError, zipfile.BadZipFile, ET.ParseError):
+            pass  # cai na dimensão declarada da aba
+        return sample_worksheet(ws, header + 1, size, strata, seed, last_row)
+
+    def close(self):
+        if self._xl is not None:
+            self._xl.close()
+        if self._snapshots is not None:
+            self._snapshots.close()
+
+
+class BundleSource:
+    """
+    Pacote de abas em formato nativo rápido: diretório ou .zip com um
+    <nome da aba>.csv ou <nome da aba>.parquet por aba.
+    O cabeçalho é sempre a primeira linha do arquivo (sem as linhas de banner do DGW),
+    por isso o parâmetro header de read_sheet é ignorado.
+    """
+
+    kind = "bundle"
+
+    def __init__(self, path, data=None):
+        self.path = path
+        self._zip = None
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+        else:
+            self._zip = zipfile.ZipFile(data if data is not None else path)
+            names = sorted(n for n in self._zip.namelist() if not n.endswith("/"))
+
+        self._members = {}
+        for member in names:
+            stem, ext = os.path.splitext(os.path.basename(member))
+            if ext.lower() in BUNDLE_EXTENSIONS and not stem.startswith("."):
+                self._members.setdefault(stem, (member, ext.lower()))
+        self.sheet_names = list(self._members)
+
+    def find_sheet(self, name):
+        # nomes de arquivo costumam perder espaços nas pontas ("Addl Job Compensation ")
+        if name in self._members:
+            return name
+        stripped = name.strip()
+        return next((s for s in self._members if s.strip() == stripped), None)
+
+    def _open(self, member):
+        if self._zip is not None:
+            return io.BytesIO(self._zip.read(member))
+        return open(os.path.join(self.path, member), "rb")
+
+    def read_sheet(self, sheet, header=0, **kwargs):
+        member, ext = self._members[sheet]
+        with self._open(member) as f:
+            if ext == ".csv":
+                kwargs.setdefault("encoding", "utf-8-sig")
+                return pd.read_csv(f, **kwargs)
+
+            df = pd.read_parquet(f)
+            if kwargs.get("nrows") is not None:
+                df = df.head(kwargs["nrows"])
+            if kwargs.get("dtype") is not None:
+                df = df.astype(kwargs["dtype"])
+            return df
+
+    def first_row(self, sheet, header):
+        # CSV: linha 1 é o cabeçalho; Parquet não tem linha de cabeçalho
+        return 2 if self._members[sheet][1] == ".csv" else 1
+
+    def sample_sheet(self, sheet, header, size, strata=10, seed=0):
+        """Mesmo contrato de ExcelSource.sample_sheet, para CSV/Parquet."""
+        member, ext = self._members[sheet]
+        first = self.first_row(sheet, header)
+        with self._open(member) as f:
+            if ext == ".parquet":
+                df, offsets, total = _sample_parquet(f, size, strata, seed)
+                return df, offsets + first, total
+
+            # CSV: uma passada contando registros (campos entre aspas podem ter
+            # quebras de linha), outra lendo apenas os sorteados
+            total = sum(len(chunk) for chunk in pd.read_csv(
+                f, encoding="utf-8-sig", usecols=[0], dtype=str, chunksize=CSV_COUNT_CHUNK))
+            f.seek(0)
+            offsets = stratified_offsets(total, size, strata, seed)
+            wanted = set((offsets + 1).tolist())
+            df = pd.read_csv(
+                f, encoding="utf-8-sig",
+                skiprows=lambda i: i > 0 and i not in wanted,
+                nrows=len(offsets),
+            )
+            return df, np.asarray(offsets, dtype=np.int64)[:len(df)] + first, total
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+
+def _sample_parquet(f, size, strata, seed):
+    """
+    Amostra estratificada de um Parquet lendo só os row groups que contêm
+    linhas sorteadas. Retorna (DataFrame, offsets, total de linhas).
+    """
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(f)
+    total = parquet.metadata.num_rows
+    offsets = stratified_offsets(total, size, strata, seed)
+    if not len(offsets):
+        return parquet.schema_arrow.empty_table().to_pandas(), offsets, total
+
+    # início de cada row group no arquivo e grupo de cada linha sorteada
+    starts = np.cumsum([0] + [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)])
+    group_of = np.searchsorted(starts, offsets, side="right") - 1
+    groups = np.unique(group_of)
+    table = parquet.read_row_groups(groups.tolist())
+
+    # posição de cada linha sorteada na tabela só com os grupos lidos
+    read_starts = np.cumsum(np.concatenate([[0], starts[groups + 1] - starts[groups]]))
+    local = offsets - starts[group_of] + read_starts[np.searchsorted(groups, group_of)]
+    return table.take(local).to_pandas(), offsets, total
+
+
+# =============================================================================
+# Descoberta e abertura
+# =============================================================================
+def _is_bundle_dir(path):
+    return os.path.isdir(path) and any(
+        os.path.splitext(n)[1].lower() in BUNDLE_EXTENSIONS for n in os.listdir(path)
+    )
+
+
+def _is_bundle_zip(path):
+    if not path.lower().endswith(".zip") or not zipfile.is_zipfile(path):
+        return False
+    with zipfile.ZipFile(path) as zf:
+        return any(os.path.splitext(n)[1].lower() in BUNDLE_EXTENSIONS for n in zf.namelist())
+
+
+def is_source(path):
+    if os.path.isfile(path) and path.lower().endswith(EXCEL_EXTENSIONS):
+        return True
+    return _is_bundle_dir(path) or (os.path.isfile(path) and _is_bundle_zip(path))
+
+
+def list_sources(directory):
+    """Entradas de um diretório que podem ser lidas como workbook (xlsx, zip ou pasta de abas)."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if not name.startswith((".", "~$")) and is_source(os.path.join(directory, name))
+    )
+
+
+def source_stem(name):
+    """Nome base usado nos arquivos de saída (sem .xlsx/.zip)."""
+    stem, ext = os.path.splitext(name)
+    return stem if ext.lower() in EXCEL_EXTENSIONS + (".zip",) else name
+
+
+def open_source(path, data=None, snapshots=False):
+    """
+    Abre um workbook de qualquer formato suportado.
+    data: bytes já carregados (BytesIO), ex.: vindos do prefetch do IOExecutor.
+    snapshots: .xlsx lidos pelo cache de snapshots (pacotes CSV/Parquet já são colunares).
+    """
+    if path.lower().endswith(EXCEL_EXTENSIONS):
+        return ExcelSource(path, data, snapshots)
+    return BundleSource(path, data)
@@ -0,0 +1,132 @@
+import io
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# =============================================================================
+# Executor de I/O em segundo plano
+# =============================================================================
+class IOExecutor:
+    """
+    Sobrepõe I/O de disco com o processamento:
+    - prefetch(path): lê os bytes do próximo workbook numa thread separada
+    - submit(fn, ..., label=...): enfileira uma escrita (CSV, HTML, XLSX) numa fila
+      limitada; se a fila estiver cheia, quem chama espera (backpressure)
+    - flush(): aguarda as escritas e devolve as que falharam como (label, erro),
+      sem interromper quem chama; o acumulado da execução fica em failed
+    - close(): drena a fila, aguarda todas as escritas e relança o primeiro erro
+      ainda não reportado por um flush()
+    """
+
+    _STOP = object()
+
+    def __init__(self, max_pending=32, writers=2):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+        self.failed = []
+        self._lock = threading.Lock()
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="io-prefetch")
+        self._writers = [
+            threading.Thread(target=self._write_loop, name=f"io-writer-{i}", daemon=True)
+            for i in range(writers)
+        ]
+        for t in self._writers:
+            t.start()
+        self._closed = False
+
+    # ---------------------------------------------------------
+    # Leitura antecipada
+    # ---------------------------------------------------------
+    def prefetch(self, path):
+        """Agenda a leitura completa do arquivo; retorna um Future com um BytesIO."""
+        return self._reader.submit(read_bytes, path)
+
+    # ---------------------------------------------------------
+    # Escritas assíncronas
+    # ---------------------------------------------------------
+    def submit(self, fn, *args, label=None, **kwargs):
+        """label identifica a saída (normalmente o caminho) quando a escrita falha."""
+        if self._closed:
+            raise RuntimeError("IOExecutor already closed")
+        self._queue.put((fn, args, kwargs, label or getattr(fn, "__name__", repr(fn))))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                fn, args, kwargs, label = item
+                try:
+                    fn(*args, **kwargs)
+                except Exception as e:
+                    with self._lock:
+                        self._errors.append((label, e))
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Bloqueia até que todas as escritas enfileiradas tenham terminado e devolve
+        as que falharam desde o último flush ([(label, erro)]). Cada falha é
+        registrada no log; quem chama decide o que marcar e a execução segue.
+        """
+        self._queue.join()
+        with self._lock:
+            failed, self._errors = self._errors, []
+        for label, e in failed:
+            print(f"❌ Background write failed ({label}): {e}")
+        self.failed.extend(failed)
+        return failed
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._writers:
+            self._queue.put(self._STOP)
+        for t in self._writers:
+            t.join()
+        self._reader.shutdown(wait=True)
+        self._raise_errors()
+
+    def _raise_errors(self):
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            for label, e in errors[1:]:
+                print(f"❌ Background write failed ({label}): {e}")
+            raise errors[0][1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # já existe uma exceção em curso: apenas garante o flush
+            try:
+                self.close()
+            except Exception as e:
+                print(f"❌ Background write failed: {e}")
+        return False
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return io.BytesIO(f.read())
+
+
+def submit_io(io_exec, fn, *args, label=None, **kwargs):
+    """Executa fn em segundo plano se houver executor; senão, de forma síncrona."""
+    if io_exec is None:
+        fn(*args, **kwargs)
+    else:
+        io_exec.submit(fn, *args, label=label, **kwargs)
+
+
+def write_text(path, text, encoding="utf-8"):
+    with open(path, "w", encoding=encoding) as f:
+        f.write(text)
@@ -0,0 +1,191 @@
+import os
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from xml.sax.saxutils import escape
+
+# O relatório é montado só a partir dos agregados (por aba e por regra), com
+# limites fixos: o tempo de geração não cresce com o número de falhas.
+PDF_RULES_PER_SHEET = 10      # regras listadas por aba (as demais ficam no CSV)
+PDF_TOP_RULES = 15            # regras com mais falhas na execução
+PDF_MAX_SHEET_SECTIONS = 100  # abas com falhas detalhadas (maiores primeiro)
+PDF_TEXT_CHARS = 120          # corte dos textos longos (top valores, erros)
+
+BRAND = colors.HexColor("#2A6592")
+
+_styles = getSampleStyleSheet()
+TITLE = ParagraphStyle("DGWTitle", parent=_styles["Title"], textColor=BRAND, alignment=0)
+H2 = ParagraphStyle("DGWH2", parent=_styles["Heading2"], textColor=BRAND)
+H3 = ParagraphStyle("DGWH3", parent=_styles["Heading3"], textColor=BRAND, spaceBefore=8)
+BODY = _styles["BodyText"]
+CELL = ParagraphStyle("DGWCell", parent=BODY, fontSize=7.5, leading=9)
+SMALL = ParagraphStyle("DGWSmall", parent=BODY, fontSize=8, textColor=colors.grey)
+
+
+def _text(value, limit=None):
+    limit = limit or PDF_TEXT_CHARS  # lido a cada chamada: o limite pode ser ajustado no módulo
+    text = "" if value is None else str(value)
+    return escape(text if len(text) <= limit else text[:limit - 1] + "…")
+
+
+def _table(header, rows, widths):
+    data = [[Paragraph(f"<b>{escape(h)}</b>", CELL) for h in header]]
+    data += [[Paragraph(_text(v), CELL) for v in row] for row in rows]
+    table = Table(data, colWidths=widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e6f0ff")),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cccccc")),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f5f7fa")]),
+    ]))
+    return table
+
+
+def _footer(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 7.5)
+    canvas.setFillColor(colors.grey)
+    canvas.drawString(doc.leftMargin, 8 * mm, "Workday DGW Validation")
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 8 * mm, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+# =============================================================================
+# Seções
+# =============================================================================
+def _overview(results, generated_at, notes):
+    checks = sum(int(r.get("Total Checks") or 0) for r in results)
+    failed = sum(int(r.get("Failed") or 0) for r in results)
+    files = sorted({r["File"] for r in results})
+    rate = (1 - failed / checks) * 100 if checks else 100
+
+    story = [
+        Paragraph("Workday DGW Validation Report", TITLE),
+        Paragraph(f"Generated at {escape(generated_at)}", SMALL),
+        Spacer(1, 6 * mm),
+        _table(["Files", "Sheets", "Checks", "Failed checks", "Success %"],
+               [[len(files), len(results), checks, failed, f"{rate:.2f}"]],
+               [40 * mm] * 5),
+    ]
+    for note in notes:
+        story += [Spacer(1, 2 * mm), Paragraph(escape(note), BODY)]
+
+    story += [Paragraph("Files", H2)]
+    rows = []
+    for file in files:
+        sheets = [r for r in results if r["File"] == file]
+        f_checks = sum(int(r.get("Total Checks") or 0) for r in sheets)
+        f_failed = sum(int(r.get("Failed") or 0) for r in sheets)
+        errors = sum(1 for r in sheets if r.get("Error"))
+        rows.append([file, sheets[0].get("Type", ""), len(sheets), f_checks, f_failed,
+                     f"{(1 - f_failed / f_checks) * 100:.2f}" if f_checks else "100.00", errors])
+    story.append(_table(["File", "Type", "Sheets", "Checks", "Failed", "Success %", "Errors"], rows,
+                        [85 * mm, 35 * mm, 20 * mm, 25 * mm, 25 * mm, 25 * mm, 20 * mm]))
+    return story
+
+
+def _top_rules(results):
+    totals = {}
+    for res in results:
+        for rule in res.get("Rule Summary") or []:
+            key = (rule["Rule"], rule["Column"])
+            count, sheets = totals.get(key, (0, 0))
+            totals[key] = (count + int(rule["Failures"]), sheets + 1)
+    if not totals:
+        return []
+    ranked = sorted(totals.items(), key=lambda kv: -kv[1][0])[:PDF_TOP_RULES]
+    rows = [[rule, column, sheets, count] for (rule, column), (count, sheets) in ranked]
+    more = len(totals) - len(ranked)
+    story = [Paragraph("Top failing rules", H2),
+             _table(["Rule", "Column", "Sheets", "Failures"], rows, [95 * mm, 95 * mm, 25 * mm, 30 * mm])]
+    if more > 0:
+        story.append(Paragraph(f"+{more} more rule/column pairs — see the dashboard.", SMALL))
+    return story
+
+
+def _run_diff(run_diff, previous_run):
+    if run_diff is None:
+        return []
+    changed = run_diff[(run_diff["New"] + run_diff["Resolved"] + run_diff["Persisting"]) > 0]
+    if not len(changed):
+        return []
+    since = f" since {previous_run}" if previous_run else " (first run: baseline recorded)"
+    changed = changed.sort_values(["New", "Resolved"], ascending=False, kind="stable")
+    rows = [[r["Type"], r["File"], r["Sheet"], r["New"], r["Resolved"], r["Persisting"]]
+            for r in changed.head(PDF_MAX_SHEET_SECTIONS).to_dict("records")]
+    story = [Paragraph(f"Changes{escape(since)}", H2),
+             _table(["Type", "File", "Sheet", "New", "Resolved", "Persisting"], rows,
+                    [35 * mm, 65 * mm, 75 * mm, 25 * mm, 25 * mm, 25 * mm])]
+    if len(changed) > len(rows):
+        story.append(Paragraph(f"+{len(changed) - len(rows)} more sheet(s) — see the Run Diff tab.", SMALL))
+    return story
+
+
+def _sheet_sections(results):
+    failing = sorted((r for r in results if int(r.get("Failed") or 0) or r.get("Error")),
+                     key=lambda r: -int(r.get("Failed") or 0))
+    if not failing:
+        return [Paragraph("No validation errors found.", BODY)]
+
+    story = [PageBreak(), Paragraph("Sheets with failures", H2)]
+    for res in failing[:PDF_MAX_SHEET_SECTIONS]:
+        story.append(Paragraph(f"{escape(res['File'])} › {escape(res['Sheet'])}", H3))
+        status = f" — {res['Status']}" if res.get("Status") else ""
+        story.append(Paragraph(
+            f"{res.get('Failed', 0)} of {res.get('Total Checks', 0)} checks failed "
+            f"({res.get('Success %', 0)}% success){escape(status)}", BODY))
+        if res.get("Error"):
+            story.append(Paragraph(_text(res["Error"]), BODY))
+
+        rules = sorted(res.get("Rule Summary") or [], key=lambda r: -int(r["Failures"]))
+        if rules:
+            estimated = "Est. Failure %" in rules[0]
+            header = ["Column", "Rule", "Failures", "Top Values"] + (["Est. Failure %"] if estimated else [])
+            widths = [55 * mm, 60 * mm, 20 * mm, 105 * mm] if not estimated else \
+                [50 * mm, 55 * mm, 20 * mm, 95 * mm, 25 * mm]
+            rows = [[r["Column"], r["Rule"], r["Failures"], r.get("Top Values", "")]
+                    + ([r.get("Est. Failure %")] if estimated else []) for r in rules[:PDF_RULES_PER_SHEET]]
+            story.append(_table(header, rows, widths))
+            if len(rules) > PDF_RULES_PER_SHEET:
+                story.append(Paragraph(f"+{len(rules) - PDF_RULES_PER_SHEET} more rule(s) in the CSV.", SMALL))
+
+        csv_path = res.get("Failures CSV")
+        if csv_path:
+            uri = "file:///" + os.path.abspath(csv_path).replace(os.sep, "/").lstrip("/")
+            story.append(Paragraph(
+                f"Full failure list: <link href='{escape(uri)}' color='blue'>{escape(os.path.basename(csv_path))}</link>",
+                SMALL))
+
+    if len(failing) > PDF_MAX_SHEET_SECTIONS:
+        story.append(Spacer(1, 4 * mm))
+        story.append(Paragraph(
+            f"+{len(failing) - PDF_MAX_SHEET_SECTIONS} more sheet(s) with failures — see the dashboard "
+            f"and the CSVs in outputs/failures/.", BODY))
+    return story
+
+
+# =============================================================================
+# Relatório
+# =============================================================================
+def build_pdf_report(path, results, run_diff=None, previous_run=None, notes=(), generated_at=None):
+    """
+    Relatório em PDF para impressão a partir dos resultados por aba do validador
+    (mesma lista que alimenta o dashboard). Usa só os agregados — "Rule Summary"
+    e "Failures CSV" de cada aba —, nunca a lista linha a linha de falhas.
+    """
+    generated_at = generated_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    doc = SimpleDocTemplate(
+        path, pagesize=landscape(A4),
+        leftMargin=12 * mm, rightMargin=12 * mm, topMargin=12 * mm, bottomMargin=15 * mm,
+        title="Workday DGW Validation Report", author="DGW Validation",
+    )
+    story = _overview(results, generated_at, notes)
+    story += _top_rules(results)
+    story += _run_diff(run_diff, previous_run)
+    story += _sheet_sections(results)
+    doc.build(story, onFirstPage=_footer, onLaterPages=_footer)
+    return path
@@ -0,0 +1,103 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from run_metrics import count_cache
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# =============================================================================
+# Conjunto de referência (IDs válidos extraídos do tenant)
+# =============================================================================
+class ReferenceSet:
+    """
+    Valores válidos de uma extração do tenant (Job Profile, Location, Cost Center...).
+    Os valores ficam num pd.Index único: a tabela hash do Index é construída uma
+    única vez e reaproveitada em todas as consultas de todas as abas.
+    """
+
+    def __init__(self, path, column, values):
+        self.path = path
+        self.column = column
+        self.index = pd.Index(values, dtype=object).unique()
+        self.index.get_indexer([])  # força a construção da tabela hash agora
+
+    def __len__(self):
+        return len(self.index)
+
+    def missing_mask(self, series):
+        """
+        Máscara booleana (vetorizada) dos valores não nulos ausentes da referência.
+        Nulos não são falha aqui — isso é papel do not_null, como no GE.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # só as categorias distintas são consultadas; o resultado volta pelos códigos
+            cat_missing = self.index.get_indexer(as_keys(pd.Series(series.cat.categories))) < 0
+            codes = series.cat.codes.to_numpy()
+            return np.where(codes >= 0, cat_missing[codes], False)
+
+        notna = series.notna().to_numpy()
+        missing = np.zeros(len(series), dtype=bool)
+        if notna.any():
+            keys = as_keys(series[notna])
+            missing[notna] = self.index.get_indexer(keys) < 0
+        return missing
+
+
+def as_keys(series):
+    """IDs são comparados como texto (1001, 1001.0 e '1001' são o mesmo ID)."""
+    if pd.api.types.is_float_dtype(series.dtype):
+        as_int = series.dropna()
+        if (as_int == as_int.round()).all():
+            series = series.astype("Int64")
+    return series.astype(str).str.strip().to_numpy(dtype=object)
+
+
+# =============================================================================
+# Cache por arquivo (recarrega só quando o arquivo muda)
+# =============================================================================
+_CACHE = {}
+_LOCK = threading.Lock()
+
+
+def resolve_reference_path(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def _read_reference(path, column):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        df = pd.read_parquet(path, columns=[column] if column else None)
+    elif ext in (".csv", ".txt"):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, usecols=[column] if column else None)
+    else:
+        raise ValueError(f"Unsupported reference file type: {path}")
+
+    column = column or df.columns[0]
+    values = as_keys(df[column].dropna())
+    return column, values[values != ""]
+
+
+def load_reference_set(path, column=None):
+    """
+    Retorna o ReferenceSet de um CSV/Parquet. Cada arquivo é lido uma única vez
+    por processo; só é relido se mtime ou tamanho mudarem.
+    """
+    path = resolve_reference_path(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = (path, column)
+
+    with _LOCK:
+        cached = _CACHE.get(key)
+        count_cache("reference_sets", bool(cached and cached[0] == stamp))
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        col, values = _read_reference(path, column)
+        ref = ReferenceSet(path, col, values)
+        _CACHE[key] = (stamp, ref)
+        return ref
@@ -0,0 +1,177 @@
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+# =============================================================================
+# Amostragem estratificada de linhas
+# =============================================================================
+def stratified_offsets(total, size, strata=10, seed=0):
+    """
+    Offsets (0-based, ordenados) de uma amostra de `size` linhas entre `total`:
+    o arquivo é dividido em `strata` faixas contíguas e cada faixa recebe a sua
+    parte da amostra, para que início, meio e fim do arquivo estejam representados
+    (cargas costumam vir agrupadas por país/empresa).
+    """
+    if total <= size:
+        return np.arange(total, dtype=np.int64)
+    strata = max(1, min(strata, size))
+    rng = np.random.default_rng(seed)
+    bounds = np.linspace(0, total, strata + 1).astype(np.int64)
+    quotas = np.diff(np.linspace(0, size, strata + 1).astype(np.int64))
+    parts = [
+        lo + rng.choice(hi - lo, size=min(k, hi - lo), replace=False)
+        for lo, hi, k in zip(bounds[:-1], bounds[1:], quotas)
+    ]
+    return np.sort(np.concatenate(parts)).astype(np.int64)
+
+
+def wilson_interval(failures, n, z=1.96):
+    """
+    Intervalo de confiança de Wilson para a taxa failures/n (z=1.96 → 95%).
+    Aceita escalares ou arrays (uma taxa por regra).
+    """
+    failures = np.asarray(failures, dtype=np.float64)
+    if n <= 0:
+        return np.zeros_like(failures), np.ones_like(failures)
+    p = failures / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    margin = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return np.clip(center - margin, 0, 1), np.clip(center + margin, 0, 1)
+
+
+def estimate_failures(summary, sample_rows, total_rows, z=1.96):
+    """
+    Acrescenta ao resumo de falhas (FailureStore.summary) a taxa estimada por regra,
+    o intervalo de confiança e a projeção de linhas com falha no arquivo inteiro.
+    """
+    summary = summary.copy()
+    rate = summary["Failures"].to_numpy(dtype=np.float64) / max(sample_rows, 1)
+    low, high = wilson_interval(summary["Failures"].to_numpy(), sample_rows, z)
+    summary["Est. Failure %"] = np.round(rate * 100, 2)
+    summary["CI"] = [f"{lo * 100:.2f}% – {hi * 100:.2f}%" for lo, hi in zip(low, high)]
+    summary["Est. Rows"] = np.round(rate * total_rows).astype(np.int64)
+    return summary
+
+
+# =============================================================================
+# Leitura de linhas amostradas (mesma conversão do pd.read_excel)
+# =============================================================================
+def _cell_value(value):
+    """Valor como o leitor openpyxl do pandas o entrega: vazio → "", inteiro → int."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def frame_from_rows(top_rows, rows, drop_empty=True):
+    """
+    DataFrame a partir das linhas do topo (a última é o cabeçalho) e das linhas
+    amostradas, com a mesma largura, inferência de tipos e nomes de coluna
+    ('Unnamed: i', 'X.1') do pd.read_excel.
+    drop_empty: descarta linhas totalmente vazias (formatação além da área
+    preenchida). Retorna (DataFrame, máscara das linhas mantidas).
+    """
+    grid = [[_cell_value(v) for v in row] for row in top_rows]
+    header = len(grid) - 1
+    keep = []
+    for row in rows:
+        cells = [_cell_value(v) for v in row]
+        keep.append(not drop_empty or any(v != "" for v in cells))
+        if keep[-1]:
+            grid.append(cells)
+
+    for r in grid:
+        while r and r[-1] == "":
+            r.pop()
+    width = max((len(r) for r in grid), default=0)
+    grid = [r + [""] * (width - len(r)) for r in grid]
+    if not width or header < 0:
+        return pd.DataFrame(), np.asarray(keep, dtype=bool)
+    return TextParser(grid, header=header).read(), np.asarray(keep, dtype=bool)
+
+
+# =============================================================================
+# Tamanho real da aba (sem parsear células)
+# =============================================================================
+def xlsx_sheet_parts(zf):
+    """{nome da aba: caminho do XML da aba dentro do .xlsx}."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {r.get("Id"): r.get("Target") for r in rels}
+    parts = {}
+    for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet"):
+        target = targets.get(sheet.get(f"{{{REL_NS}}}id"))
+        if target:
+            parts[sheet.get("name")] = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return parts
+
+
+_ROW_NUMBER = re.compile(rb'[^>]*?\br="(\d+)"')
+
+
+def xlsx_last_data_row(zf, part):
+    """
+    Última linha com algum valor da aba, varrendo o XML em blocos de bytes.
+    A dimensão declarada no arquivo (ws.max_row) conta também linhas só com
+    formatação — nos templates DGW ela vai muito além dos dados.
+    """
+    last, tail = 0, b""
+    with zf.open(part) as f:
+        while True:
+            chunk = f.read(1 << 20)
+            pieces = (tail + chunk).split(b"<row ")
+            tail = pieces.pop() if chunk else b""
+            for piece in pieces:
+                if b"<v>" in piece or b"<v " in piece or b"<is>" in piece:
+                    m = _ROW_NUMBER.match(piece)
+                    if m:
+                        last = int(m.group(1))
+            if not chunk:
+                return last
+
+
+def sample_worksheet(ws, header_row, size, strata=10, seed=0, last_row=None):
+    """
+    Lê por streaming (openpyxl read_only) só as linhas sorteadas de uma aba:
+    a leitura para na última linha da amostra e nenhuma linha fora dela vira
+    objeto pandas. Retorna (DataFrame, linhas do Excel, total estimado de linhas).
+    last_row: última linha com dados (xlsx_last_data_row); sem ela, usa a
+        dimensão da aba e descarta as linhas vazias sorteadas.
+    """
+    max_row = last_row
+    if max_row is None:
+        max_row = ws.max_row
+        if max_row is None:
+            ws.calculate_dimension(force=True)
+            max_row = ws.max_row or header_row
+    total = max(max_row - header_row, 0)
+    offsets = stratified_offsets(total, size, strata, seed)
+
+    wanted = set((offsets + header_row + 1).tolist())
+    last = int(offsets[-1]) + header_row + 1 if len(offsets) else header_row
+    top_rows, rows, numbers = [], [], []
+    for excel_row, row in enumerate(ws.iter_rows(min_row=1, max_row=last, values_only=True), start=1):
+        if excel_row <= header_row:
+            top_rows.append(row)
+        elif excel_row in wanted:
+            rows.append(row)
+            numbers.append(excel_row)
+
+    df, keep = frame_from_rows(top_rows, rows, drop_empty=last_row is None)
+    numbers = np.asarray(numbers, dtype=np.int64)[keep] if len(numbers) else numbers
+    # linhas vazias na amostra indicam área formatada além dos dados: o total é escalado
+    if total <= len(keep):
+        total = len(df)  # a aba inteira coube na amostra
+    elif last_row is None:
+        total = max(int(round(total * keep.mean())), len(df))
+    return df, np.asarray(numbers, dtype=np.int64), total
@@ -0,0 +1,283 @@
+import os
+import operator
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from rule_index import normalize_header
+from run_metrics import count_cache
+from sheet_schema import plain_values
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def find_column(df, name):
+    """Coluna real da aba para um nome do YAML (ignora caixa e espaços extras)."""
+    if name in df.columns:
+        return name
+    key = normalize_header(name)
+    return next((c for c in df.columns if normalize_header(c) == key), None)
+
+
+def _text(series):
+    """Valores como texto normalizado para comparar com listas do YAML."""
+    return series.astype(str).str.strip().str.casefold()
+
+
+def _as_type(series, kind):
+    series = plain_values(series)
+    if kind == "date":
+        return pd.to_datetime(series, errors="coerce")
+    if kind == "number":
+        return pd.to_numeric(series, errors="coerce")
+    if kind == "text":
+        return series.where(series.isna(), series.astype(str).str.strip())
+    # auto: numérico se já for numérico; senão tenta data
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series
+    return pd.to_datetime(series, errors="coerce")
+
+
+# =============================================================================
+# Compilação do "when"
+# =============================================================================
+def _compile_filter(spec):
+    """{column, equals|in|not_in|is_null|not_null} → função df → máscara booleana."""
+    column = spec["column"]
+
+    if "equals" in spec or "in" in spec or "not_in" in spec:
+        negate = "not_in" in spec
+        values = spec.get("in", spec.get("not_in", [spec.get("equals")]))
+        if not isinstance(values, list):
+            values = [values]
+        wanted = {str(v).strip().casefold() for v in values}
+
+        def mask(df, col):
+            hit = _text(df[col]).isin(wanted).to_numpy() & df[col].notna().to_numpy()
+            return ~hit & df[col].notna().to_numpy() if negate else hit
+
+    elif spec.get("is_null"):
+        def mask(df, col):
+            return df[col].isna().to_numpy()
+
+    elif spec.get("not_null"):
+        def mask(df, col):
+            return df[col].notna().to_numpy()
+
+    else:
+        raise ValueError(f"Unsupported 'when' filter: {spec}")
+
+    def run(df):
+        col = find_column(df, column)
+        if col is None:
+            return None
+        return mask(df, col)
+
+    return run, [column]
+
+
+def _compile_when(spec):
+    """
+    "when" pode ser:
+    - filtro simples: {column: X, in: [...]}
+    - lista de filtros (todos precisam valer)
+    - expressão do DataFrame.eval (nomes com espaço entre crases)
+    Retorna (função df → máscara | None se faltar coluna, colunas usadas).
+    """
+    if spec is None:
+        return (lambda df: np.ones(len(df), dtype=bool)), []
+
+    if isinstance(spec, str):
+        def run(df):
+            try:
+                result = df.eval(spec, engine="python")
+            except (KeyError, pd.errors.UndefinedVariableError):
+                return None
+            return pd.Series(result, index=df.index).fillna(False).astype(bool).to_numpy()
+        return run, []
+
+    filters = [_compile_filter(s) for s in (spec if isinstance(spec, list) else [spec])]
+    columns = [c for _, cols in filters for c in cols]
+
+    def run(df):
+        mask = np.ones(len(df), dtype=bool)
+        for f, _ in filters:
+            part = f(df)
+            if part is None:
+                return None
+            mask &= part
+        return mask
+
+    return run, columns
+
+
+# =============================================================================
+# Regras compiladas
+# =============================================================================
+class ExpressionRule:
+    """
+    Regra condicional/entre colunas já compilada. evaluate() devolve a máscara
+    de linhas com falha (np.ndarray bool) usando só operações vetorizadas.
+    """
+
+    def __init__(self, name, column, columns, check, row_wise=True):
+        self.name = name
+        self.column = column      # coluna onde a falha é reportada
+        self.columns = columns    # colunas necessárias na aba
+        self.row_wise = row_wise  # False: depende de outras linhas (não vale em amostras)
+        self._check = check
+
+    def evaluate(self, df, load_sheet=None):
+        """
+        Retorna (coluna real reportada, máscara) ou None se faltar alguma coluna.
+        load_sheet: função nome da aba → DataFrame, para regras que consultam outra aba.
+        """
+        real = find_column(df, self.column)
+        if real is None or any(find_column(df, c) is None for c in self.columns):
+            return None
+        mask = self._check(df, load_sheet)
+        if mask is None:
+            return None
+        return real, np.asarray(mask, dtype=bool)
+
+
+def _compile_require(name, spec, when):
+    columns = spec if isinstance(spec, list) else [spec]
+    cond, cond_cols = when
+
+    def check(df, load_sheet):
+        active = cond(df)
+        if active is None:
+            return None
+        missing = np.zeros(len(df), dtype=bool)
+        for c in columns:
+            missing |= df[find_column(df, c)].isna().to_numpy()
+        return active & missing
+
+    return ExpressionRule(name, columns[0], columns + cond_cols, check)
+
+
+def _lookup(df, load_sheet, spec):
+    """Coluna de outra aba trazida para as linhas desta via chave (ex.: Employee ID)."""
+    if load_sheet is None:
+        return None
+    other = load_sheet(spec["sheet"])
+    if other is None:
+        return None
+    key = spec["key"]
+    left_key, right_key = find_column(df, key), find_column(other, key)
+    right_col = find_column(other, spec["column"])
+    if left_key is None or right_key is None or right_col is None:
+        return None
+
+    right = other[[right_key, right_col]].dropna(subset=[right_key])
+    right_keys = right[right_key].astype(str).str.strip()
+    table = pd.Series(right[right_col].to_numpy(), index=right_keys.to_numpy())
+    table = table[~table.index.duplicated()]
+    return df[left_key].astype(str).str.strip().map(table).where(df[left_key].notna())
+
+
+def _compile_compare(name, spec, when):
+    op = OPERATORS.get(str(spec.get("op", "")).strip())
+    if op is None:
+        raise ValueError(f"Rule '{name}': unsupported compare op {spec.get('op')!r}")
+    left, right, kind = spec["left"], spec["right"], spec.get("type", "auto")
+    cond, cond_cols = when
+    columns = [left] + ([] if isinstance(right, dict) else [right]) + cond_cols
+
+    def check(df, load_sheet):
+        active = cond(df)
+        if active is None:
+            return None
+        if isinstance(right, dict):
+            rhs = _lookup(df, load_sheet, right)
+            if rhs is None:
+                return None
+        else:
+            rhs = df[find_column(df, right)]
+        a = _as_type(df[find_column(df, left)], kind)
+        b = _as_type(pd.Series(rhs.to_numpy(), index=df.index), kind)
+        both = a.notna().to_numpy() & b.notna().to_numpy()
+        ok = np.zeros(len(df), dtype=bool)
+        ok[both] = op(a[both], b[both]).to_numpy()
+        return active & both & ~ok
+
+    return ExpressionRule(name, left, columns, check)
+
+
+def _compile_group_sum(name, spec, when):
+    column, target = spec["column"], float(spec["equals"])
+    by = spec["by"] if isinstance(spec["by"], list) else [spec["by"]]
+    tolerance = float(spec.get("tolerance", 0.01))
+    cond, cond_cols = when
+
+    def check(df, load_sheet):
+        active = cond(df)
+        if active is None:
+            return None
+        values = pd.to_numeric(plain_values(df[find_column(df, column)]), errors="coerce").where(active)
+        keys = [df[find_column(df, c)] for c in by]
+        grouped = values.groupby(keys, dropna=True, sort=False, observed=True)
+        sums = grouped.transform("sum")
+        counts = grouped.transform("count")
+        # grupos sem nenhum valor preenchido não entram (ex.: distribuição por valor fixo)
+        bad = (counts > 0) & ((sums - target).abs() > tolerance)
+        return active & bad.fillna(False).to_numpy()
+
+    return ExpressionRule(name, column, [column] + by + cond_cols, check, row_wise=False)
+
+
+RULE_KINDS = {
+    "require": _compile_require,
+    "compare": _compile_compare,
+    "group_sum": _compile_group_sum,
+}
+
+
+def compile_rules(config):
+    """YAML {aba: [regras]} → {aba normalizada: [ExpressionRule]}."""
+    compiled = {}
+    for sheet, rules in (config or {}).items():
+        for i, spec in enumerate(rules or []):
+            kinds = [k for k in RULE_KINDS if k in spec]
+            if len(kinds) != 1:
+                raise ValueError(f"{sheet} rule #{i + 1}: expected one of {list(RULE_KINDS)}")
+            kind = kinds[0]
+            name = spec.get("name") or f"{kind}: {spec[kind]}"
+            rule = RULE_KINDS[kind](name, spec[kind], _compile_when(spec.get("when")))
+            compiled.setdefault(normalize_header(sheet), []).append(rule)
+    return compiled
+
+
+# =============================================================================
+# Carregamento com cache (recompila só se o YAML mudar)
+# =============================================================================
+_CACHE = {}
+
+
+def load_expression_rules(path):
+    """Regras compiladas de rules_expressions.yaml; {} se o arquivo não existir."""
+    if not os.path.exists(path):
+        return {}
+    stamp = os.stat(path).st_mtime_ns
+    cached = _CACHE.get(path)
+    count_cache("expression_rules", bool(cached and cached[0] == stamp))
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        compiled = compile_rules(yaml.safe_load(f))
+    _CACHE[path] = (stamp, compiled)
+    return compiled
+
+
+def rules_for_sheet(compiled, sheet_name):
+    return compiled.get(normalize_header(sheet_name), [])
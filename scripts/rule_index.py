@@ -0,0 +1,110 @@
+import os
+from collections import defaultdict
+
+import yaml
+
+from run_metrics import count_cache
+
+
+def normalize_header(name):
+    """Normaliza um cabeçalho para comparação: espaços colapsados, sem caixa."""
+    return " ".join(str(name).split()).casefold()
+
+
+def is_blank_header(name):
+    """Colunas sem cabeçalho no template viram 'Unnamed: N' no pandas."""
+    return str(name).startswith("Unnamed:")
+
+
+# =============================================================================
+# Índice cabeçalho → regras
+# =============================================================================
+class RuleIndex:
+    """
+    Índice pré-calculado de cabeçalho normalizado → regras do rules_global.yaml,
+    com os aliases de field_mappings.yaml já incorporados.
+
+    match() cruza o cabeçalho de uma aba com o índice numa única interseção de
+    conjuntos, em vez de procurar cada regra × alias nas colunas. Cabeçalhos são
+    comparados normalizados (sem caixa, espaços colapsados); a prioridade é o
+    nome da regra primeiro, depois os aliases na ordem do field_mappings.yaml.
+    """
+
+    def __init__(self, rules, aliases=None):
+        aliases = aliases or {}
+        self.rules = rules
+        self._order = {name: i for i, name in enumerate(rules)}
+        self._index = defaultdict(list)  # header normalizado → [(regra, prioridade)]
+
+        for rule in rules:
+            self._index[normalize_header(rule)].append((rule, 0))
+            alias_list = aliases.get(rule) or []
+            if isinstance(alias_list, str):
+                alias_list = [alias_list]
+            for priority, alias in enumerate(alias_list, start=1):
+                self._index[normalize_header(alias)].append((rule, priority))
+
+        self._keys = frozenset(self._index)
+
+    def match(self, columns):
+        """
+        Retorna (matches, unmapped):
+        - matches: [(regra, coluna real)] na ordem do YAML
+        - unmapped: cabeçalhos da aba sem nenhuma regra (metadado de cobertura)
+        """
+        by_key = {}
+        for col in columns:
+            by_key.setdefault(normalize_header(col), col)  # primeira ocorrência vence
+
+        best = {}
+        for key in self._keys & by_key.keys():
+            for rule, priority in self._index[key]:
+                if rule not in best or priority < best[rule][0]:
+                    best[rule] = (priority, by_key[key])
+
+        matches = sorted(
+            ((rule, col) for rule, (_, col) in best.items()),
+            key=lambda rc: self._order[rc[0]],
+        )
+        matched_cols = {col for _, col in matches}
+        unmapped = [
+            col for col in columns
+            if col not in matched_cols and not is_blank_header(col)
+        ]
+        return matches, unmapped
+
+
+# =============================================================================
+# Carregamento com cache (recarrega só se os YAMLs mudarem)
+# =============================================================================
+_CACHE = {}
+
+
+def _mtime(path):
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+
+def load_rule_index(rules_file, alias_file=None):
+    """
+    Carrega rules_global.yaml (+ aliases opcionais) e devolve (rules, aliases, RuleIndex).
+    O resultado fica em cache até algum dos arquivos ser alterado.
+    """
+    key = (rules_file, alias_file)
+    stamp = (_mtime(rules_file), _mtime(alias_file) if alias_file else None)
+
+    cached = _CACHE.get(key)
+    count_cache("rule_index", bool(cached and cached[0] == stamp))
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with open(rules_file, "r", encoding="utf-8") as f:
+        rules = yaml.safe_load(f) or {}
+
+    aliases = {}
+    if alias_file and os.path.exists(alias_file):
+        with open(alias_file, "r", encoding="utf-8") as f:
+            aliases = (yaml.safe_load(f) or {}).get("aliases", {}) or {}
+
+    result = (rules, aliases, RuleIndex(rules, aliases))
+    _CACHE[key] = (stamp, result)
+    return result
@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+
+from rule_index import load_rule_index
+from rule_expressions import load_expression_rules
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RULES_FILE = os.path.join(BASE_DIR, "config", "rules_global.yaml")
+ALIAS_FILE = os.path.join(BASE_DIR, "config", "field_mappings.yaml")
+EXPRESSIONS_FILE = os.path.join(BASE_DIR, "config", "rules_expressions.yaml")
+HISTORY_DIR = os.path.join(BASE_DIR, "outputs", "history")
+
+STATS_FILE = "rule_stats.json"
+REPORT_TOP = 15
+
+COUNTERS = ("sheets", "executions", "failures", "errors", "seconds")
+
+
+# =============================================================================
+# Contadores por regra
+# =============================================================================
+class RuleStats:
+    """
+    Contadores por regra de uma execução: abas em que a regra encontrou coluna,
+    checagens avaliadas, linhas com falha, avaliações que deram erro e tempo de
+    avaliação. save() soma tudo ao acumulado de <histórico>/rule_stats.json.
+
+    source: "global" (rules_global.yaml), "template" (Required/dropdown do
+    template), "expression" (rules_expressions.yaml) ou "sequence" (event_sequences.yaml).
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory  # None: só coleta (ex.: worker do modo distribuído)
+        self.rules = {}
+        self.unmapped = {}  # escopo (tipo|aba) → {coluna: abas em que apareceu sem regra}
+
+    def add(self, rule, source, executions, failures, seconds, errors=0):
+        stats = self.rules.get(rule)
+        if stats is None:
+            stats = self.rules[rule] = {"source": source, **{k: 0 for k in COUNTERS}, "seconds": 0.0}
+        stats["sheets"] += 1
+        stats["executions"] += executions
+        stats["failures"] += failures
+        stats["errors"] += errors
+        stats["seconds"] += seconds
+
+    def add_unmapped(self, scope, columns):
+        seen = self.unmapped.setdefault(scope, {})
+        for col in columns:
+            seen[col] = seen.get(col, 0) + 1
+
+    def merge(self, other):
+        """Acrescenta os contadores de outro RuleStats (resultados parciais)."""
+        for rule, stats in other.rules.items():
+            mine = self.rules.setdefault(rule, dict(stats, **{k: 0 for k in COUNTERS}))
+            for key in COUNTERS:
+                mine[key] += stats.get(key, 0)
+        for scope, columns in other.unmapped.items():
+            seen = self.unmapped.setdefault(scope, {})
+            for col, n in columns.items():
+                seen[col] = seen.get(col, 0) + n
+
+    def save(self, generated_at):
+        """Soma esta execução ao acumulado em disco (escrita atômica)."""
+        data = load_stats(self.directory)
+        data["runs"] += 1
+        data["first_run"] = data.get("first_run") or generated_at
+        data["last_run"] = generated_at
+
+        for rule, stats in self.rules.items():
+            total = data["rules"].setdefault(rule, {"source": stats["source"], "runs": 0,
+                                                    **{k: 0 for k in COUNTERS}})
+            total["source"] = stats["source"]
+            total["runs"] += 1
+            for key in COUNTERS:
+                total[key] = total.get(key, 0) + stats[key]  # acumulados antigos não têm "errors"
+            total["seconds"] = round(total["seconds"], 6)
+            total["last_matched"] = generated_at
+
+        for scope, columns in self.unmapped.items():
+            seen = data["unmapped"].setdefault(scope, {})
+            for col in columns:
+                entry = seen.setdefault(col, {"runs": 0})
+                entry["runs"] += 1
+                entry["last_seen"] = generated_at
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, STATS_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(path + ".tmp", path)
+
+
+def load_stats(directory=None):
+    path = os.path.join(directory or HISTORY_DIR, STATS_FILE)
+    data = {"runs": 0, "rules": {}, "unmapped": {}}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Rule stats ignored ({e})")
+    return data
+
+
+# =============================================================================
+# Relatório: regras mortas, regras mais caras e colunas sem regra
+# =============================================================================
+def rule_report(data, rules, aliases, index, expression_rules=(), top=REPORT_TOP):
+    """
+    Texto do relatório a partir do acumulado:
+    - regras do YAML (e regras de expressão) que nunca encontraram coluna
+    - regras que encontraram coluna mas nunca avaliaram nada (ex.: Optional no template)
+    - regras de expressão que deram erro ao avaliar
+    - regras com maior tempo acumulado
+    - colunas de template que seguem sem nenhuma regra (já descontadas as que
+      ganharam regra/alias depois de vistas)
+    """
+    stats = data["rules"]
+    lines = [f"📐 Rule stats: {data['runs']} full run(s)"
+             + (f" from {data['first_run']} to {data['last_run']}" if data["runs"] else "")]
+
+    dead = [r for r in rules if not stats.get(r, {}).get("sheets")]
+    lines.append(f"\n💀 Dead rules — never matched a column ({len(dead)} of {len(rules)} in rules_global.yaml):")
+    for rule in dead:
+        alias_list = aliases.get(rule) or []
+        n_aliases = 1 if isinstance(alias_list, str) else len(alias_list)
+        lines.append(f"   • {rule}" + (f" ({n_aliases} alias(es))" if n_aliases else ""))
+
+    dead_expr = [r for r in expression_rules if not stats.get(r, {}).get("sheets")]
+    if dead_expr:
+        lines.append(f"\n💀 Expression rules never evaluated ({len(dead_expr)}):")
+        lines += [f"   • {r}" for r in dead_expr]
+
+    broken = sorted((r for r, s in stats.items() if s.get("errors")), key=lambda r: -stats[r]["errors"])
+    if broken:
+        lines.append(f"\n⚠️ Rules that raised errors when evaluated ({len(broken)}):")
+        lines += [f"   • {r} ({stats[r]['source']}, {stats[r]['errors']} of {stats[r]['sheets']} sheet(s))"
+                  for r in broken]
+
+    idle = sorted(r for r, s in stats.items() if s["sheets"] and not s["executions"] and not s.get("errors"))
+    if idle:
+        lines.append(f"\n💤 Matched but never evaluated — no expectation left for the column ({len(idle)}):")
+        lines += [f"   • {r} ({stats[r]['source']}, {stats[r]['sheets']} sheet(s))" for r in idle]
+
+    costly = sorted((r for r, s in stats.items() if s["executions"]), key=lambda r: -stats[r]["seconds"])[:top]
+    if costly:
+        lines.append(f"\n🔥 Most expensive rules (top {len(costly)} by cumulative time):")
+        lines.append(f"   {'Rule':<45} {'Source':<10} {'Sheets':>7} {'Checks':>8} {'Failures':>10} {'Total s':>9} {'ms/check':>9}")
+        for rule in costly:
+            s = stats[rule]
+            lines.append(f"   {rule[:45]:<45} {s['source']:<10} {s['sheets']:>7} {s['executions']:>8} "
+                         f"{s['failures']:>10} {s['seconds']:>9.3f} {s['seconds'] / s['executions'] * 1000:>9.2f}")
+
+    unmapped = {}
+    for scope, columns in data["unmapped"].items():
+        still = index.match(list(columns))[1]  # colunas que seguem sem regra no YAML atual
+        if still:
+            unmapped[scope] = sorted(still, key=lambda c: -columns[c]["runs"])
+    total = sum(len(c) for c in unmapped.values())
+    lines.append(f"\n🧩 Template columns without any rule ({total}):")
+    for scope in sorted(unmapped):
+        dgw_type, sheet = scope.split("|", 1)
+        lines.append(f"   {dgw_type} › {sheet}: {', '.join(unmapped[scope])}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    top = REPORT_TOP
+    for arg in argv or []:
+        if arg.startswith("--top="):
+            top = int(arg.split("=", 1)[1])
+    data = load_stats()
+    if not data["runs"]:
+        print("⚠️ No rule stats yet — run a full validation first.")
+        return
+    rules, aliases, index = load_rule_index(RULES_FILE, ALIAS_FILE)
+    expression_rules = [r.name for rs in load_expression_rules(EXPRESSIONS_FILE).values() for r in rs]
+    print(rule_report(data, rules, aliases, index, expression_rules, top))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -61,21 +61,56 @@ def validate_dgws():
     print(colored("\n✅ Validation completed. HTML dashboard saved in /outputs/", "green"))
     input("\nPress Enter to return to the menu...")
 
+def quick_check_dgws():
+    print_header("Quick Check (fail-fast)")
+    from validate_all import main as validate_main
+
+    print(colored("⚡ Running fail-fast validation (row sample + failure caps)...\n", "cyan"))
+    validate_main(fast=True)
+    print(colored("\n✅ Quick check completed. HTML dashboard saved in /outputs/", "green"))
+    input("\nPress Enter to return to the menu...")
+
+def sample_check_dgws():
+    print_header("Sampled Validation (estimates)")
+    from validate_all import main as validate_main, SAMPLE_ROWS
+
+    size = input(colored(f"Rows per sheet [{SAMPLE_ROWS}]: ", "yellow")).strip()
+    size = int(size) if size.isdigit() else SAMPLE_ROWS
+
+    print(colored(f"🎲 Validating a stratified sample of {size} rows per sheet...\n", "cyan"))
+    validate_main(sample=size)
+    print(colored("\n✅ Sampled validation completed. HTML dashboard saved in /outputs/", "green"))
+    input("\nPress Enter to return to the menu...")
+
+def start_server():
+    print_header("Local Validation Server (warm mode)")
+    from dgw_server import serve
+
+    print(colored("🔥 Loading libraries, rules, templates and reference sets once...", "cyan"))
+    print(colored("   Send jobs from another terminal: python scripts/dgw_client.py validate [file ...]", "cyan"))
+    print(colored("   Ctrl+C (or dgw_client.py stop) returns to the menu.\n", "cyan"))
+    serve()
+    input("\nPress Enter to return to the menu...")
+
 def run_full_pipeline():
     print_header("Full Pipeline (Transform + Validate + Dashboard)")
     from transform_to_dgw import transform_to_dgw
     from validate_all import main as validate_main
+    from io_executor import IOExecutor
 
     print(colored("🧩 Running full pipeline...\n", "cyan"))
     time.sleep(1)
 
-    # 1️⃣ Transform
-    print(colored("➡️ Step 1/2: Transforming templates...", "yellow"))
-    transform_to_dgw()
+    # As abas transformadas seguem em memória direto para a validação;
+    # os .xlsx de entrega são gravados em segundo plano e drenados no fim do "with".
+    with IOExecutor() as io_exec:
+        # 1️⃣ Transform
+        print(colored("➡️ Step 1/2: Transforming templates...", "yellow"))
+        frames = transform_to_dgw(io_exec=io_exec, return_frames=True)
 
-    # 2️⃣ Validate
-    print(colored("➡️ Step 2/2: Validating generated DGWs...", "yellow"))
-    validate_main()
+        # 2️⃣ Validate
+        print(colored("➡️ Step 2/2: Validating generated DGWs...", "yellow"))
+        validate_main(frames=frames, io_exec=io_exec)
 
     print(colored("\n✅ Full pipeline completed successfully!", "green"))
     input("\nPress Enter to return to the menu...")
@@ -86,7 +121,7 @@ def clear_outputs():
         print(colored("No output folder found.", "yellow"))
         input("\nPress Enter to return...")
         return
-    for folder in ["failures", "previews"]:
+    for folder in ["failures", "previews", "annotated"]:
         path = os.path.join(OUTPUT_DIR, folder)
         if os.path.exists(path):
             for f in os.listdir(path):
@@ -109,6 +144,9 @@ def main_menu():
         print("3️⃣  Validate existing DGWs")
         print("4️⃣  Run Full Pipeline (SFTP + Transform + Validate + Dashboard)")
         print("5️⃣  Clear output folders")
+        print("6️⃣  Quick check existing DGWs (fail-fast)")
+        print("7️⃣  Sampled validation of existing DGWs (estimates)")
+        print("8️⃣  Start local validation server (warm mode)")
         print("0️⃣  Exit")
         print()
 
@@ -125,6 +163,12 @@ def main_menu():
             run_full_pipeline()  # may include the download
         elif choice == "5":
             clear_outputs()
+        elif choice == "6":
+            quick_check_dgws()
+        elif choice == "7":
+            sample_check_dgws()
+        elif choice == "8":
+            start_server()
         elif choice == "0":
             break
 
@@ -0,0 +1,174 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+try:
+    import resource  # só em Unix; no Windows o pico de memória fica de fora
+except ImportError:
+    resource = None
+
+METRIC_PREFIX = "dgw_validation"
+
+# =============================================================================
+# Contadores de cache (por processo, sem custo perceptível no caminho quente)
+# =============================================================================
+_CACHE_COUNTS = defaultdict(lambda: [0, 0])  # nome → [acertos, faltas]
+_LOCK = threading.Lock()
+
+
+def count_cache(name, hit):
+    """Registra uma consulta a um cache (chamado pelos próprios loaders)."""
+    with _LOCK:
+        _CACHE_COUNTS[name][0 if hit else 1] += 1
+
+
+def cache_counts():
+    with _LOCK:
+        return {name: tuple(c) for name, c in _CACHE_COUNTS.items()}
+
+
+def peak_memory_bytes():
+    """Pico de memória residente do processo e dos processos filhos já encerrados."""
+    if resource is None:
+        return {}
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit,
+    }
+
+
+# =============================================================================
+# Métricas de uma execução
+# =============================================================================
+class RunMetrics:
+    """
+    Acumula em memória as durações por etapa de uma execução; contagens por
+    arquivo/aba vêm da lista de resultados no fim. Tudo é gravado uma única vez
+    em flush(): arquivo texto do Prometheus (node_exporter textfile collector) + JSON.
+    """
+
+    def __init__(self, mode="full"):
+        self.mode = mode
+        self._start = time.perf_counter()
+        self.stages = defaultdict(float)
+        self._caches_at_start = cache_counts()
+
+    def add(self, stage, seconds):
+        self.stages[stage] += seconds
+
+    def caches(self):
+        """Consultas a cada cache desde o início desta execução (o servidor roda várias)."""
+        stats = {}
+        for name, (hits, misses) in cache_counts().items():
+            h0, m0 = self._caches_at_start.get(name, (0, 0))
+            hits, misses = hits - h0, misses - m0
+            if hits or misses:
+                stats[name] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4)}
+        return stats
+
+    # ---------------------------------------------------------
+    # Saída
+    # ---------------------------------------------------------
+    def snapshot(self, results):
+        duration = time.perf_counter() - self._start
+        sheets, files = [], {}
+        for res in results:
+            failures = sum(int(r["Failures"]) for r in res.get("Rule Summary") or [])
+            sheet = {
+                "file": res["File"],
+                "sheet": res["Sheet"],
+                "type": res.get("Type", ""),
+                "rows": int(res.get("Rows") or 0),
+                "checks": int(res.get("Total Checks") or 0),
+                "failed_checks": int(res.get("Failed") or 0),
+                "failures": failures,
+                "error": bool(res.get("Error")),
+            }
+            sheets.append(sheet)
+            f = files.setdefault(res["File"], {"type": sheet["type"], "sheets": 0, "rows": 0,
+                                               "checks": 0, "failed_checks": 0, "failures": 0})
+            f["sheets"] += 1
+            for key in ("rows", "checks", "failed_checks", "failures"):
+                f[key] += sheet[key]
+
+        rows = sum(s["rows"] for s in sheets)
+        validate_s = self.stages.get("validate", duration)
+        return {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "timestamp": round(time.time(), 3),
+            "mode": self.mode,
+            "duration_seconds": round(duration, 3),
+            "rows": rows,
+            "rows_per_second": round(rows / validate_s, 1) if validate_s else 0.0,
+            "stages": {k: round(v, 3) for k, v in sorted(self.stages.items())},
+            "caches": self.caches(),
+            "peak_memory_bytes": peak_memory_bytes(),
+            "files": files,
+            "sheets": sheets,
+        }
+
+    def flush(self, results, prom_path, json_path):
+        """Grava as métricas da execução (escrita atômica: o coletor nunca lê arquivo pela metade)."""
+        data = self.snapshot(results)
+        _write_atomic(json_path, json.dumps(data, ensure_ascii=False, indent=1))
+        _write_atomic(prom_path, prometheus_text(data))
+        return data
+
+
+# =============================================================================
+# Formato texto do Prometheus
+# =============================================================================
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_label(v)}"' for k, v in labels.items()) + "}" if labels else ""
+
+
+def prometheus_text(data):
+    lines = []
+
+    def metric(name, help_text, samples):
+        name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(**labels)} {value}")
+
+    metric("last_run_timestamp_seconds", "Unix time when the last validation run finished.",
+           [({"mode": data["mode"]}, data["timestamp"])])
+    metric("duration_seconds", "Wall time of the last validation run.", [({}, data["duration_seconds"])])
+    metric("rows", "Rows validated in the last run.", [({}, data["rows"])])
+    metric("rows_per_second", "Rows validated per second of validation time.", [({}, data["rows_per_second"])])
+    metric("stage_seconds", "Time spent per stage in the last run.",
+           [({"stage": k}, v) for k, v in data["stages"].items()])
+    metric("file_failed_checks", "Failed checks per file.",
+           [({"file": f, "type": v["type"]}, v["failed_checks"]) for f, v in data["files"].items()])
+    metric("file_failures", "Failing cells recorded per file.",
+           [({"file": f, "type": v["type"]}, v["failures"]) for f, v in data["files"].items()])
+    metric("sheet_failed_checks", "Failed checks per sheet.",
+           [({"file": s["file"], "sheet": s["sheet"]}, s["failed_checks"]) for s in data["sheets"]])
+    metric("sheet_failures", "Failing cells recorded per sheet.",
+           [({"file": s["file"], "sheet": s["sheet"]}, s["failures"]) for s in data["sheets"]])
+    metric("cache_hit_ratio", "Hit ratio per in-process cache during the last run.",
+           [({"cache": k}, v["hit_ratio"]) for k, v in data["caches"].items()])
+    metric("cache_lookups", "Lookups per in-process cache during the last run.",
+           [({"cache": k}, v["hits"] + v["misses"]) for k, v in data["caches"].items()])
+    if data["peak_memory_bytes"]:
+        metric("peak_memory_bytes", "Peak resident memory (main process and finished child processes).",
+               [({"process": k}, v) for k, v in data["peak_memory_bytes"].items()])
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
@@ -24,7 +24,7 @@ def download_from_sftp():
     files = sftp.listdir(remote_path)
 
     for file in files:
-        if file.lower().endswith(".xlsx"):
+        if file.lower().endswith((".xlsx", ".zip")):
             remote_file = os.path.join(remote_path, file)
             local_file = os.path.join(local_path, file)
             print(f"⬇️  Baixando {file} ...")
@@ -0,0 +1,189 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from rule_index import normalize_header
+
+ID, DATE, CATEGORY = "id", "date", "category"
+
+# categóricas só compensam em abas com volume e poucos valores distintos
+CATEGORY_MIN_ROWS = 1_000
+CATEGORY_MAX_RATIO = 0.1  # distintos / linhas preenchidas
+
+
+# =============================================================================
+# Tipo esperado de cada coluna (plano de regras + template)
+# =============================================================================
+def is_id_header(name):
+    """'Employee ID', 'Pay Group ID', 'Location Reference ID'... (última palavra 'ID')."""
+    words = normalize_header(name).split()
+    return bool(words) and words[-1] == "id"
+
+
+def is_date_header(name):
+    # mesma heurística do profiling (column_profile._is_date_column)
+    return "date" in str(name).lower()
+
+
+def id_dtypes(columns):
+    """dtype do read_excel/read_csv para ler as colunas de ID como texto (sem virar float)."""
+    return {col: str for col in columns if is_id_header(col)}
+
+
+def sheet_schema(columns, plan=(), sheet_meta=None, date_columns=()):
+    """
+    Tipos das colunas de uma aba, derivados do plano de regras e do template:
+    - id: cabeçalho terminado em "ID" ou coluna validada contra lista de referência
+    - date: cabeçalho com "Date" ou data configurada em event_sequences.yaml
+    - category: demais colunas com regra ou presentes no template; só viram
+      categóricas se tiverem poucos valores distintos (ver apply_schema)
+    Retorna {coluna: tipo} só para as colunas presentes na aba.
+    """
+    schema = {}
+    dates = {normalize_header(c) for c in date_columns if c}
+    for col in columns:
+        if is_id_header(col):
+            schema[col] = ID
+        elif is_date_header(col) or normalize_header(col) in dates:
+            schema[col] = DATE
+
+    for _, real_col, rule_set in plan:
+        if rule_set.get("reference"):
+            schema[real_col] = ID
+        else:
+            schema.setdefault(real_col, CATEGORY)
+
+    for col in sheet_meta or {}:
+        schema.setdefault(col, CATEGORY)
+
+    present = set(columns)
+    return {col: kind for col, kind in schema.items() if col in present}
+
+
+# =============================================================================
+# Conversões
+# =============================================================================
+def id_text(series):
+    """
+    IDs como texto: 1001.0 → '1001' (float vindo de células numéricas com vazios).
+    Colunas já lidas como texto (id_dtypes) passam direto.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    if pd.api.types.is_float_dtype(series.dtype):
+        filled = series.dropna()
+        if (filled == filled.round()).all():
+            series = series.astype("Int64")
+    elif series.dtype == object:
+        if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+            return series
+        numbers = series.map(lambda v: isinstance(v, (float, np.floating)) and float(v).is_integer())
+        if numbers.any():
+            series = series.copy()
+            series[numbers] = series[numbers].map(lambda v: str(int(v)))
+    elif not pd.api.types.is_numeric_dtype(series.dtype):
+        return series
+    return series.astype(str).where(series.notna())
+
+
+def as_dates(series):
+    """
+    datetime64 só quando a conversão não perde nada: todos os valores preenchidos
+    são datas ou textos de data (senão a coluna fica como está e as regras veem o
+    valor original).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype) or series.dtype != object:
+        return None
+    if pd.api.types.infer_dtype(series, skipna=True) not in ("string", "datetime", "date"):
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # formato inferido elemento a elemento
+        parsed = pd.to_datetime(series, errors="coerce")
+    return parsed if int(parsed.isna().sum()) == int(series.isna().sum()) else None
+
+
+def as_category(series, max_ratio=None):
+    """Categórica se a coluna tiver poucos distintos; confere antes numa amostra do início."""
+    max_ratio = CATEGORY_MAX_RATIO if max_ratio is None else max_ratio
+    if series.dtype != object:
+        return None
+    filled = int(series.notna().sum())
+    if not filled:
+        return None
+    probe = series.head(CATEGORY_MIN_ROWS)
+    if probe.nunique() > max(1, max_ratio * min(len(probe), filled)):
+        return None
+    category = series.astype("category")
+    return category if len(category.cat.categories) <= max_ratio * filled else None
+
+
+def apply_schema(df, schema, min_rows=None):
+    """
+    Aplica o schema a uma cópia rasa da aba (o DataFrame recebido não é alterado).
+    min_rows: abas menores não ganham categóricas (padrão CATEGORY_MIN_ROWS).
+    Retorna (df tipado, {tipo: nº de colunas convertidas}).
+    """
+    min_rows = CATEGORY_MIN_ROWS if min_rows is None else min_rows
+    typed = df.copy(deep=False)
+    counts = {ID: 0, DATE: 0, CATEGORY: 0}
+    for col, kind in schema.items():
+        if col not in typed.columns or isinstance(typed[col], pd.DataFrame):
+            continue  # cabeçalho duplicado
+        series = typed[col]
+        if kind == ID:
+            # IDs repetidos (Pay Group ID, Company ID...) também viram categóricas
+            converted = id_text(series)
+            category = as_category(converted) if len(typed) >= min_rows else None
+            if category is not None:
+                converted, kind = category, CATEGORY
+            elif converted is series:
+                counts[ID] += 1  # já lida como texto (id_dtypes)
+                continue
+        elif kind == DATE:
+            converted = as_dates(series)
+        else:
+            converted = as_category(series) if len(typed) >= min_rows else None
+        if converted is not None:
+            typed[col] = converted
+            counts[kind] += 1
+    return typed, counts
+
+
+# =============================================================================
+# Checagens sobre categóricas
+# =============================================================================
+def in_set_mask(series, allowed):
+    """
+    Máscara dos valores preenchidos fora da lista (mesma semântica do
+    expect_column_values_to_be_in_set: nulos não contam). Em colunas categóricas
+    só as categorias distintas são testadas; o resultado volta pelos códigos.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        outside = ~series.cat.categories.isin(allowed)
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, outside[codes], False)
+    return (series.notna() & ~series.isin(allowed)).to_numpy()
+
+
+def regex_mask(series, pattern):
+    """
+    Máscara dos valores preenchidos que não casam com o padrão (mesma semântica
+    do expect_column_values_to_match_regex: str.contains sobre o texto, nulos
+    não contam). Em colunas categóricas o padrão roda só nas categorias.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        outside = ~np.asarray(series.cat.categories.astype(str).str.contains(pattern), dtype=bool)
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, outside[codes], False)
+    filled = series.notna().to_numpy()
+    mask = np.zeros(len(series), dtype=bool)
+    mask[filled] = ~series[filled].astype(str).str.contains(pattern).to_numpy(dtype=bool)
+    return mask
+
+
+def plain_values(series):
+    """Categóricas de volta a valores comuns antes de conversões (to_numeric, where...)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object)
+    return series
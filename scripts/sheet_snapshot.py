@@ -0,0 +1,447 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+from run_metrics import count_cache
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "sheet_snapshots")
+
+# teto do diretório de snapshots; acima disso saem os usados há mais tempo (LRU)
+CACHE_MAX_MB = 1024
+
+# incrementar quando o formato dos arquivos .arrow mudar
+CACHE_VERSION = 1
+MANIFEST_FILE = "sheets.json"
+
+# tipos de célula como o leitor openpyxl do pandas os entrega → coluna Arrow
+_KINDS = {
+    str: "str",
+    int: "int",
+    float: "float",
+    bool: "bool",
+    datetime.datetime: "datetime",
+    datetime.time: "time",
+    datetime.timedelta: "timedelta",
+}
+
+
+def snapshots_available():
+    """Snapshots dependem do pyarrow (opcional, o mesmo dos pacotes Parquet)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# =============================================================================
+# Chave do cache: conteúdo do workbook + nome da aba
+# =============================================================================
+_FINGERPRINTS = {}
+
+
+def workbook_fingerprint(path):
+    """SHA-1 do conteúdo do .xlsx (calculado uma vez por versão do arquivo neste processo)."""
+    st = os.stat(path)
+    stamp = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if stamp not in _FINGERPRINTS:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _FINGERPRINTS[stamp] = h.hexdigest()
+    return _FINGERPRINTS[stamp]
+
+
+def _sheet_file(directory, sheet):
+    # nomes de aba podem ter caracteres inválidos em nomes de arquivo
+    return os.path.join(directory, hashlib.sha1(sheet.encode("utf-8")).hexdigest()[:16] + ".arrow")
+
+
+# =============================================================================
+# Grade de células (o que o pandas passa ao TextParser no read_excel)
+# =============================================================================
+def _cell_value(cell):
+    """Mesma conversão do leitor openpyxl do pandas (OpenpyxlReader._convert_cell)."""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float("nan")
+    if cell.data_type == TYPE_NUMERIC:
+        as_int = int(cell.value)
+        return as_int if as_int == cell.value else float(cell.value)
+    return cell.value
+
+
+def _trim(grid):
+    """Mesmo recorte do pandas: vazios à direita, linhas vazias no final e largura uniforme."""
+    for row in grid:
+        while row and row[-1] == "":
+            row.pop()
+    last = max((i for i, row in enumerate(grid) if row), default=-1)
+    grid = grid[:last + 1]
+    width = max((len(r) for r in grid), default=0)
+    return [r + [""] * (width - len(r)) for r in grid]
+
+
+def sheet_grid(ws):
+    """Grade completa de uma aba aberta em read_only, idêntica à do read_excel."""
+    ws.reset_dimensions()
+    return _trim([[_cell_value(cell) for cell in row] for row in ws.rows])
+
+
+def grid_frame(grid, header=0, nrows=None, **kwargs):
+    """DataFrame que pd.read_excel(header=..., nrows=..., **kwargs) daria para a grade."""
+    if not grid:
+        return pd.DataFrame()
+    try:
+        parser = TextParser(grid, header=header, nrows=nrows, skip_blank_lines=False, **kwargs)
+        return parser.read(nrows=nrows)
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+# =============================================================================
+# Grade ↔ Arrow IPC
+# =============================================================================
+def _grid_table(grid, sheet):
+    """
+    Uma coluna Arrow por (coluna da grade, tipo de célula): colunas homogêneas
+    ficam com uma só; colunas mistas (ex.: cabeçalho texto sobre números)
+    ganham uma por tipo, nula onde a célula é de outro tipo. Vazio → nulo.
+    """
+    import pyarrow as pa
+
+    arrow_types = {
+        "str": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(),
+        "datetime": pa.timestamp("us"), "time": pa.time64("us"), "timedelta": pa.duration("us"),
+    }
+    width = len(grid[0]) if grid else 0
+    names, arrays = [], []
+    for i in range(width):
+        values = [None if v == "" else v for v in (row[i] for row in grid)]
+        kinds = {}
+        for v in values:
+            if v is not None and type(v) not in kinds:
+                if type(v) not in _KINDS:
+                    raise TypeError(f"unsupported cell type {type(v).__name__}")
+                kinds[type(v)] = _KINDS[type(v)]
+        for cls, kind in kinds.items():
+            column = values if len(kinds) == 1 else [v if type(v) is cls else None for v in values]
+            names.append(f"{i}:{kind}")
+            arrays.append(pa.array(column, type=arrow_types[kind]))
+
+    metadata = {"version": str(CACHE_VERSION), "sheet": sheet, "rows": str(len(grid)), "width": str(width)}
+    schema = pa.schema([pa.field(n, a.type) for n, a in zip(names, arrays)], metadata=metadata)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _table_grid(table, limit=None):
+    meta = table.schema.metadata or {}
+    if meta.get(b"version") != str(CACHE_VERSION).encode():
+        raise ValueError("snapshot from another cache version")
+    rows, width = int(meta[b"rows"]), int(meta[b"width"])
+    if limit is not None and limit < rows:
+        table, rows = table.slice(0, limit), limit
+
+    columns = [None] * width
+    for name, array in zip(table.column_names, table.columns):
+        i = int(name.split(":", 1)[0])
+        values = array.to_pylist()
+        columns[i] = values if columns[i] is None else [a if b is None else b for a, b in zip(columns[i], values)]
+    empty = [None] * rows
+    grid = [["" if v is None else v for v in row]
+            for row in zip(*(c if c is not None else empty for c in columns))]
+    return grid if limit is None else _trim(grid)
+
+
+def _write_table(path, table):
+    import pyarrow as pa
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"  # processos de transformação podem gravar a mesma aba
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _read_table_grid(path, limit=None):
+    """Lê o snapshot mapeado em memória (sem cópia do arquivo) e devolve a grade."""
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        return _table_grid(pa.ipc.open_file(source).read_all(), limit)
+
+
+# =============================================================================
+# DataFrame já com o cabeçalho aplicado ↔ Arrow IPC
+# =============================================================================
+# A grade serve qualquer combinação de header/nrows, mas refazer o DataFrame a
+# partir dela passa por listas Python e pelo TextParser. Cada leitura completa
+# (header + opções do read_excel) guarda também o DataFrame final: colunas
+# tipadas vão direto para Arrow; colunas object são separadas por tipo de valor,
+# como na grade. A volta é to_pandas() sobre o arquivo mapeado em memória.
+def _option_text(value):
+    if isinstance(value, type):
+        return value.__name__
+    raise TypeError(f"option {value!r} has no stable key")
+
+
+def _frame_key(header, kwargs):
+    """Chave das opções de leitura; None se não der para serializá-las de forma estável."""
+    if header is not None and not isinstance(header, int):
+        return None
+    try:
+        text = json.dumps({"header": header, **kwargs}, sort_keys=True, default=_option_text)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _frame_file(directory, sheet, key):
+    return _sheet_file(directory, sheet)[:-len(".arrow")] + f".{key}.arrow"
+
+
+def _frame_table(df):
+    import pyarrow as pa
+
+    arrow_types = {
+        "str": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(),
+        "datetime": pa.timestamp("us"), "time": pa.time64("us"), "timedelta": pa.duration("us"),
+    }
+    columns = list(df.columns)
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        raise ValueError("frame without a default index")
+    if json.loads(json.dumps(columns)) != columns or any(type(c) not in (str, int) for c in columns):
+        raise ValueError("column names without a JSON form")
+
+    names, arrays = [], []
+    for i, (_, series) in enumerate(df.items()):
+        if series.dtype != object:
+            names.append(str(i))
+            arrays.append(pa.Array.from_pandas(series))
+            continue
+        values = series.to_numpy()
+        for cls in set(map(type, values)) - {type(None)}:
+            if cls not in _KINDS:
+                raise TypeError(f"unsupported value type {cls.__name__}")
+            names.append(f"{i}:{_KINDS[cls]}")
+            arrays.append(pa.array([v if type(v) is cls else None for v in values], type=arrow_types[_KINDS[cls]]))
+
+    metadata = {
+        "version": str(CACHE_VERSION),
+        "rows": str(len(df)),
+        "columns": json.dumps(columns, ensure_ascii=False),
+        "range_columns": str(int(isinstance(df.columns, pd.RangeIndex))),  # header=None, aba vazia
+        "dtypes": json.dumps([str(t) for t in df.dtypes]),
+    }
+    schema = pa.schema([pa.field(n, a.type) for n, a in zip(names, arrays)], metadata=metadata)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _table_frame(table):
+    meta = table.schema.metadata or {}
+    if meta.get(b"version") != str(CACHE_VERSION).encode():
+        raise ValueError("snapshot from another cache version")
+    rows = int(meta[b"rows"])
+    columns, dtypes = json.loads(meta[b"columns"]), json.loads(meta[b"dtypes"])
+
+    parts = {}
+    for name, array in zip(table.column_names, table.columns):
+        parts.setdefault(int(name.split(":", 1)[0]), []).append(array)
+
+    data = {}
+    for i, dtype in enumerate(dtypes):
+        if dtype != "object":
+            data[i] = parts[i][0].to_pandas().astype(dtype, copy=False)
+            continue
+        values = np.full(rows, None, dtype=object)
+        for array in parts.get(i, []):
+            valid = array.is_valid().to_numpy(zero_copy_only=False)
+            converted = array.to_pandas(integer_object_nulls=True, timestamp_as_object=True)
+            values[valid] = converted.to_numpy(dtype=object)[valid]
+        data[i] = values
+    df = pd.DataFrame(data, index=pd.RangeIndex(rows))
+    df.columns = pd.RangeIndex(len(columns)) if meta.get(b"range_columns") == b"1" else columns
+    return df
+
+
+def _same_frame(a, b):
+    """Mesmo conteúdo, dtypes e tipo de cada valor das colunas object."""
+    try:
+        pd.testing.assert_frame_equal(a, b, check_exact=True)
+    except AssertionError:
+        return False
+    return all(list(map(type, a.iloc[:, i])) == list(map(type, b.iloc[:, i]))
+               for i in range(a.shape[1]) if a.dtypes.iloc[i] == object)
+
+
+def _read_table_frame(path):
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        return _table_frame(pa.ipc.open_file(source).read_all())
+
+
+# =============================================================================
+# Workbook servido pelo cache
+# =============================================================================
+class SnapshotReader:
+    """
+    Abas de um .xlsx lidas dos snapshots em CACHE_DIR/<fingerprint>/. O workbook
+    só é aberto (openpyxl, read_only) quando falta o snapshot de alguma aba; a
+    aba parseada é gravada para as próximas leituras.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.directory = os.path.join(CACHE_DIR, workbook_fingerprint(path))
+        self._book = None
+        self.sheet_names = self._manifest()
+
+    def _workbook(self):
+        if self._book is None:
+            # mesmas opções do pd.ExcelFile (engine openpyxl)
+            self._book = load_workbook(self.path, read_only=True, data_only=True, keep_links=False)
+        return self._book
+
+    def _manifest(self):
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == CACHE_VERSION:
+                return cached["sheets"]
+        except (OSError, ValueError, KeyError):
+            pass
+        sheets = list(self._workbook().sheetnames)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "workbook": os.path.basename(self.path), "sheets": sheets},
+                          f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Could not write sheet snapshot manifest: {e}")
+        return sheets
+
+    def grid(self, sheet, limit=None):
+        """Grade da aba (limit: só as primeiras linhas, como o nrows do read_excel)."""
+        path = _sheet_file(self.directory, sheet)
+        if os.path.exists(path):
+            try:
+                grid = _read_table_grid(path, limit)
+                count_cache("sheet_snapshot", True)
+                os.utime(path)  # LRU: mtime = último uso
+                return grid
+            except Exception as e:  # arquivo truncado/de outra versão: parseia de novo
+                print(f"⚠️ Sheet snapshot ignored for '{sheet}' ({e})")
+        count_cache("sheet_snapshot", False)
+
+        grid = sheet_grid(self._workbook()[sheet])
+        try:
+            _write_table(path, _grid_table(grid, sheet))
+            evict()
+        except (OSError, TypeError, ValueError, OverflowError) as e:
+            print(f"⚠️ Sheet '{sheet}' not snapshotted: {e}")
+        return grid if limit is None else _trim([list(r) for r in grid[:limit]])
+
+    def read_sheet(self, sheet, header=0, nrows=None, **kwargs):
+        """
+        Mesmo resultado de pd.read_excel(path, sheet_name=sheet, header=..., nrows=..., **kwargs).
+        Leituras completas repetidas com as mesmas opções vêm do snapshot do DataFrame.
+        """
+        limit = None
+        if nrows is not None:
+            # mesmas linhas que o pandas leria do arquivo (BaseExcelReader._calc_rows)
+            limit = nrows + (0 if header is None else header + 1)
+            return grid_frame(self.grid(sheet, limit), header=header, nrows=nrows, **kwargs)
+
+        key = _frame_key(header, kwargs)
+        path = _frame_file(self.directory, sheet, key) if key else None
+        if path and os.path.exists(path):
+            try:
+                df = _read_table_frame(path)
+                count_cache("sheet_frame", True)
+                os.utime(path)
+                return df
+            except Exception as e:
+                print(f"⚠️ Sheet frame snapshot ignored for '{sheet}' ({e})")
+        if path:
+            count_cache("sheet_frame", False)
+
+        df = grid_frame(self.grid(sheet), header=header, **kwargs)
+        if path:
+            self._save_frame(path, sheet, df)
+        return df
+
+    def _save_frame(self, path, sheet, df):
+        try:
+            table = _frame_table(df)
+            # só guarda o que volta idêntico (ex.: valores de tipos sem coluna Arrow ficam de fora)
+            if not _same_frame(_table_frame(table), df):
+                return
+            _write_table(path, table)
+            evict()
+        except (TypeError, ValueError, OverflowError):
+            pass  # DataFrame sem forma Arrow estável: a grade continua servindo a aba
+        except OSError as e:
+            print(f"⚠️ Sheet frame for '{sheet}' not snapshotted: {e}")
+
+    def close(self):
+        if self._book is not None:
+            self._book.close()
+            self._book = None
+
+
+# =============================================================================
+# Limite de tamanho (LRU)
+# =============================================================================
+def evict(max_mb=None):
+    """Apaga os snapshots usados há mais tempo até o diretório caber em max_mb (padrão CACHE_MAX_MB)."""
+    max_mb = CACHE_MAX_MB if max_mb is None else max_mb
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    entries = []
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if name.endswith(".arrow"):
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_mb * 1024 * 1024:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue  # em uso por outro processo (Windows)
+        total -= size
+        removed += 1
+
+    if removed:
+        # workbooks sem nenhuma aba restante (só o manifesto) saem também
+        for name in os.listdir(CACHE_DIR):
+            directory = os.path.join(CACHE_DIR, name)
+            if os.path.isdir(directory) and not any(f.endswith(".arrow") for f in os.listdir(directory)):
+                shutil.rmtree(directory, ignore_errors=True)
+    return removed
@@ -0,0 +1,196 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+
+# =============================================================================
+# Fila de tarefas (arquivo, aba) em SQLite, compartilhada por vários processos/hosts
+# =============================================================================
+# O diretório da fila precisa estar num disco com lock de arquivo confiável
+# (disco local ou compartilhamento que suporte locks do SQLite).
+DB_FILE = "queue.db"
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          INTEGER PRIMARY KEY,
+    file        TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    sheet       TEXT NOT NULL,
+    position    INTEGER NOT NULL,   -- ordem da aba no arquivo (dashboard)
+    phase       INTEGER NOT NULL,   -- 0: livre; 1: só depois da fase 0 terminar
+    cost        INTEGER NOT NULL,   -- bytes do XML da aba: maiores primeiro
+    status      TEXT NOT NULL DEFAULT 'pending',
+    worker      TEXT,
+    claimed_at  REAL,
+    finished_at REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, phase, cost);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class TaskQueue:
+    """
+    Cada transação de claim/complete é curta e usa BEGIN IMMEDIATE, então vários
+    workers podem disputar a fila sem pegar a mesma tarefa duas vezes.
+    """
+
+    def __init__(self, directory, timeout=30):
+        self.directory = directory
+        self.path = os.path.join(directory, DB_FILE)
+        self.conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    # ---------------------------------------------------------
+    # Coordenador
+    # ---------------------------------------------------------
+    @classmethod
+    def create(cls, directory, tasks, settings=None):
+        """Nova fila (apaga a anterior). tasks: dicts file/path/sheet/position/phase/cost."""
+        os.makedirs(directory, exist_ok=True)
+        db = os.path.join(directory, DB_FILE)
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(db + suffix):
+                os.remove(db + suffix)
+
+        queue = cls(directory)
+        queue.conn.execute("PRAGMA journal_mode=WAL")
+        queue.conn.executescript(SCHEMA)
+        with queue.conn:
+            queue.conn.executemany(
+                "INSERT INTO tasks (file, path, sheet, position, phase, cost) "
+                "VALUES (:file, :path, :sheet, :position, :phase, :cost)", tasks)
+            queue.conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("open_phase", "0"),
+                ("state", "running"),
+                ("created_at", str(time.time())),
+                ("settings", json.dumps(settings or {})),
+            ])
+        return queue
+
+    def meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def open_phase(self, phase):
+        self.set_meta("open_phase", phase)
+
+    def finish(self):
+        """Sinaliza aos workers que não haverá mais tarefas."""
+        self.set_meta("state", "done")
+
+    def counts(self, phase=None):
+        sql = "SELECT status, COUNT(*) AS n FROM tasks"
+        rows = self.conn.execute(sql + (" WHERE phase = ?" if phase is not None else "") + " GROUP BY status",
+                                 (phase,) if phase is not None else ()).fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({r["status"]: r["n"] for r in rows})
+        return counts
+
+    def requeue_stale(self, lease_s, max_attempts):
+        """Tarefas de workers que sumiram (lease vencido) voltam para a fila ou falham."""
+        limit = time.time() - lease_s
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, error = 'lease expired' "
+                "WHERE status = ? AND claimed_at < ? AND attempts >= ?",
+                (FAILED, RUNNING, limit, max_attempts))
+            cur = self.conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL WHERE status = ? AND claimed_at < ?",
+                (PENDING, RUNNING, limit))
+        return cur.rowcount
+
+    def tasks(self):
+        return [dict(r) for r in self.conn.execute("SELECT * FROM tasks ORDER BY id")]
+
+    # ---------------------------------------------------------
+    # Worker
+    # ---------------------------------------------------------
+    def claim(self, worker, batch=1, prefer_path=None):
+        """
+        Reserva a maior tarefa disponível e, junto, até batch-1 outras abas do
+        mesmo arquivo (o workbook é aberto uma vez para todas). Prefere continuar
+        no arquivo que o worker já está processando.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            phase = int(self.meta("open_phase", 0))
+            first = self.conn.execute(
+                "SELECT * FROM tasks WHERE status = ? AND phase <= ? "
+                "ORDER BY (path = ?) DESC, cost DESC, id LIMIT 1",
+                (PENDING, phase, prefer_path or "")).fetchone()
+            if first is None:
+                self.conn.execute("COMMIT")
+                return []
+            rows = [first] + self.conn.execute(
+                "SELECT * FROM tasks WHERE status = ? AND phase <= ? AND path = ? AND id != ? "
+                "ORDER BY cost DESC, id LIMIT ?",
+                (PENDING, phase, first["path"], first["id"], max(batch - 1, 0))).fetchall()
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(RUNNING, worker, now, r["id"]) for r in rows])
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        # attempts desta reserva: identifica o dono em heartbeat/complete/fail
+        return [dict(r, status=RUNNING, worker=worker, claimed_at=now, attempts=r["attempts"] + 1) for r in rows]
+
+    def heartbeat(self, worker, claims):
+        """Renova o lease das tarefas ainda reservadas por este worker. claims: {id: attempts}."""
+        with self.conn:
+            cur = self.conn.executemany(
+                "UPDATE tasks SET claimed_at = ? WHERE id = ? AND worker = ? AND status = ? AND attempts = ?",
+                [(time.time(), i, worker, RUNNING, n) for i, n in claims.items()])
+        return cur.rowcount
+
+    def complete(self, worker, claims):
+        """
+        Marca o lote como feito só se todas as tarefas ainda são deste worker,
+        nesta mesma reserva (claims: {id: attempts}). Se alguma foi devolvida à
+        fila (lease vencido) e pega por outro worker, nada é marcado: as que
+        ainda são deste worker voltam para a fila e o resultado deve ser descartado.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            owned = [r["id"] for r in self.conn.execute(
+                f"SELECT id, attempts FROM tasks WHERE id IN ({','.join('?' * len(claims))}) "
+                "AND worker = ? AND status = ?", (*claims, worker, RUNNING))
+                if claims[r["id"]] == r["attempts"]]
+            if len(owned) == len(claims):
+                self.conn.executemany("UPDATE tasks SET status = ?, finished_at = ? WHERE id = ?",
+                                      [(DONE, time.time(), i) for i in owned])
+            else:
+                self.conn.executemany("UPDATE tasks SET status = ?, worker = NULL WHERE id = ?",
+                                      [(PENDING, i) for i in owned])
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(owned) == len(claims)
+
+    def fail(self, worker, claims, error, max_attempts):
+        """Falha de execução: volta para a fila até max_attempts tentativas (só tarefas ainda deste worker)."""
+        with self.conn:
+            for i, n in claims.items():
+                self.conn.execute(
+                    "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                    "error = ?, worker = NULL, finished_at = ? "
+                    "WHERE id = ? AND worker = ? AND status = ? AND attempts = ?",
+                    (max_attempts, FAILED, PENDING, str(error), time.time(), i, worker, RUNNING, n))
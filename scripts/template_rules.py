@@ -0,0 +1,226 @@
+import os
+import re
+import json
+import hashlib
+
+from openpyxl import load_workbook
+from openpyxl.utils.cell import range_boundaries
+
+from run_metrics import count_cache
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TEMPLATES_DIR = os.path.join(BASE_DIR, "data", "templates_dgw")
+CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "template_rules")
+
+REQUIRED_ROW = 5  # linha "Required"/"Optional" (ver detect_header.py)
+HEADER_ROW = 6
+
+NOT_NULL = "expect_column_values_to_not_be_null"
+IN_SET = "expect_column_values_to_be_in_set"
+
+# incrementar quando o formato do JSON em cache mudar
+CACHE_VERSION = 1
+
+
+def template_fingerprint(path):
+    """SHA-1 do conteúdo do template: muda a cada nova versão do DGW."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def mangle_headers(headers):
+    """Mesmos nomes que o pandas gera no read_excel: vazios → 'Unnamed: i', duplicados → 'X.1'."""
+    counts = {}
+    names = []
+    for i, h in enumerate(headers):
+        col = f"Unnamed: {i}" if h is None or h == "" else str(h)
+        cur = counts.get(col, 0)
+        while cur > 0:
+            counts[col] = cur + 1
+            col = f"{col}.{cur}"
+            cur = counts.get(col, 0)
+        counts[col] = cur + 1
+        names.append(col)
+    return names
+
+
+# =============================================================================
+# Introspecção do template
+# =============================================================================
+def _list_values(wb, ws, formula):
+    """Resolve a lista de um dropdown: literal "a,b,c", intervalo ou nome definido."""
+    if not formula:
+        return None
+    formula = formula.strip().lstrip("=")
+    if formula.startswith('"') and formula.endswith('"'):
+        return [v.strip() for v in formula[1:-1].split(",") if v.strip()]
+
+    if formula in wb.defined_names:
+        formula = wb.defined_names[formula].attr_text
+
+    m = re.fullmatch(r"(?:'?([^'!\[\]]+)'?!)?(\$?[A-Z]+\$?\d+(?::\$?[A-Z]+\$?\d+)?)", formula)
+    if not m:
+        return None  # fórmulas dinâmicas (OFFSET/INDEX) ou referências externas
+    sheet_name, ref = m.groups()
+    if sheet_name and sheet_name not in wb.sheetnames:
+        return None
+    src = wb[sheet_name] if sheet_name else ws
+
+    min_col, min_row, max_col, max_row = range_boundaries(ref.replace("$", ""))
+    values = []
+    for row in src.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col,
+                             max_col=max_col, values_only=True):
+        values.extend(str(v).strip() for v in row if v is not None and str(v).strip())
+    return list(dict.fromkeys(values))
+
+
+def extract_template_metadata(path):
+    """
+    Lê o template uma vez e devolve, por aba, as colunas com:
+    - required: True/False conforme a linha Required/Optional
+    - allowed_values: valores do dropdown (validação de dados tipo lista), se houver
+    Dropdowns que só cobrem as linhas de metadados (acima do cabeçalho) são ignorados.
+    """
+    wb = load_workbook(path)  # read_only não expõe data validations
+    meta = {}
+    try:
+        for ws in wb.worksheets:
+            if ws.title.strip().startswith(">"):
+                continue
+
+            top = list(ws.iter_rows(min_row=REQUIRED_ROW, max_row=HEADER_ROW, values_only=True))
+            if len(top) < 2:
+                continue
+            required_cells, header_cells = top[0], top[1]
+            names = mangle_headers(header_cells)
+
+            dropdowns = {}
+            for dv in ws.data_validations.dataValidation:
+                if dv.type != "list":
+                    continue
+                values = None
+                for rng in dv.sqref.ranges:
+                    min_col, min_row, max_col, max_row = rng.bounds
+                    if max_row <= HEADER_ROW:
+                        continue
+                    if values is None:
+                        values = _list_values(wb, ws, dv.formula1)
+                    if not values:
+                        break
+                    for col in range(min_col, max_col + 1):
+                        dropdowns[col - 1] = values
+
+            columns = {}
+            for i, header in enumerate(header_cells):
+                if header is None or str(header).strip() == "":
+                    continue
+                flag = str(required_cells[i]).strip().lower() if i < len(required_cells) and required_cells[i] else ""
+                columns[names[i]] = {
+                    "required": True if flag == "required" else False if flag == "optional" else None,
+                    "allowed_values": dropdowns.get(i),
+                }
+            meta[ws.title] = columns
+    finally:
+        wb.close()
+    return meta
+
+
+# =============================================================================
+# Cache por fingerprint (memória + disco)
+# =============================================================================
+_MEMORY = {}
+
+
+def load_template_metadata(path):
+    """Metadados do template, extraídos só uma vez por versão (fingerprint) do arquivo."""
+    st = os.stat(path)
+    stamp = (path, st.st_mtime_ns, st.st_size)
+    count_cache("template_metadata", stamp in _MEMORY)
+    if stamp in _MEMORY:
+        return _MEMORY[stamp]
+
+    fingerprint = template_fingerprint(path)
+    cache_file = os.path.join(CACHE_DIR, f"{fingerprint}.json")
+    meta = None
+    if os.path.exists(cache_file):
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == CACHE_VERSION:
+            meta = cached["sheets"]
+    count_cache("template_cache_file", meta is not None)
+
+    if meta is None:
+        print(f"📐 Extracting rules from template {os.path.basename(path)} (first use of this version)...")
+        meta = extract_template_metadata(path)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = cache_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "template": os.path.basename(path), "sheets": meta}, f)
+        os.replace(tmp, cache_file)
+
+    _MEMORY[stamp] = meta
+    return meta
+
+
+def find_template(file_name):
+    """Template DGW correspondente a um arquivo curado (mesma regra do transform)."""
+    from transform_to_dgw import detect_template_file
+
+    if not os.path.isdir(TEMPLATES_DIR):
+        return None
+    templates = [f for f in os.listdir(TEMPLATES_DIR) if f.lower().endswith(".xlsx")]
+    name = detect_template_file(file_name, templates)
+    return os.path.join(TEMPLATES_DIR, name) if name else None
+
+
+# =============================================================================
+# Compilação: template + rules_global.yaml
+# =============================================================================
+def merge_sheet_rules(matches, rules, sheet_meta, columns):
+    """
+    Combina as regras do YAML já casadas com a aba ([(regra, coluna real)])
+    com os metadados do template dessa aba:
+    - coluna Optional no template → o not_null do YAML não é aplicado
+    - coluna Required sem regra no YAML → ganha not_null
+    - dropdown do template → in_set com os valores da lista (se o YAML não definir um)
+    columns: cabeçalhos presentes no DataFrame da aba.
+    Retorna [(nome da regra, coluna real, rule_set)].
+    """
+    plan = []
+    covered = set()
+
+    for rule_name, real_col in matches:
+        rule_set = rules.get(rule_name) or {}
+        col_meta = sheet_meta.get(real_col)
+        if col_meta:
+            expectations = list(rule_set.get("expectations", []))
+            if col_meta["required"] is False and NOT_NULL in expectations:
+                expectations.remove(NOT_NULL)
+            if col_meta["required"] and NOT_NULL not in expectations:
+                expectations.append(NOT_NULL)
+            rule_set = dict(rule_set, expectations=expectations)
+            if col_meta["allowed_values"] and IN_SET not in expectations:
+                rule_set["expectations"].append(IN_SET)
+                rule_set["allowed_values"] = col_meta["allowed_values"]
+        covered.add(real_col)
+        plan.append((rule_name, real_col, rule_set))
+
+    present = set(columns)
+    for real_col, col_meta in sheet_meta.items():
+        if real_col in covered or real_col not in present:
+            continue
+        expectations = []
+        rule_set = {}
+        if col_meta["required"]:
+            expectations.append(NOT_NULL)
+        if col_meta["allowed_values"]:
+            expectations.append(IN_SET)
+            rule_set["allowed_values"] = col_meta["allowed_values"]
+        if expectations:
+            rule_set["expectations"] = expectations
+            plan.append((real_col, real_col, rule_set))
+
+    return plan
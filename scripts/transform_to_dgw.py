@@ -1,14 +1,31 @@
 import os
+import sys
+import numbers
 import pandas as pd
 import yaml
 from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from alias_suggest import get_alias_matcher
+from input_formats import list_sources, open_source, source_stem
+from rule_index import is_blank_header
+from work_scheduler import cached_source
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 CONFIG_DIR = os.path.join(BASE_DIR, "config", "mappings")
 INCOMING_DIR = os.path.join(BASE_DIR, "data", "incoming")
 TEMPLATES_DIR = os.path.join(BASE_DIR, "data", "templates_dgw")
 OUTPUT_DIR = os.path.join(BASE_DIR, "data", "curated")
+SUGGESTIONS_FILE = os.path.join(BASE_DIR, "outputs", "mapping_suggestions.csv")
+
+# processos para ler/mapear as abas de origem (1 → tudo no processo principal)
+TRANSFORM_WORKERS = 1
+
+# abas de origem .xlsx guardadas em Arrow (data/cache/sheet_snapshots) e lidas
+# mapeadas em memória nas execuções seguintes, sem reparsear o Excel
+SNAPSHOT_SOURCES = True
 
 
 def load_yaml(path):
@@ -72,140 +89,342 @@ def detect_template_file(filename: str, template_files: list[str]) -> str | None
 
 
 def get_valid_sheets(path):
-    xl = pd.ExcelFile(path)
-    sheets = [s for s in xl.sheet_names if not s.strip().startswith(">")]
-    xl.close()
+    source = open_source(path, snapshots=SNAPSHOT_SOURCES)
+    sheets = [s for s in source.sheet_names if not s.strip().startswith(">")]
+    source.close()
     return sheets
 
 
-def transform_to_dgw():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def template_alias_targets(wb, sheets, aliases, header_row=6):
+    """
+    Alvos do índice de sugestões: todos os cabeçalhos do template (linha 6)
+    mais os aliases do mapping YAML para cada um.
+    """
+    targets = {}
+    for sheet in sheets:
+        for cell in wb[sheet][header_row]:
+            if isinstance(cell.value, str) and cell.value.strip():
+                targets.setdefault(cell.value.strip(), [])
+    for tgt_col, alias_list in aliases.items():
+        targets.setdefault(tgt_col, []).extend([alias_list] if isinstance(alias_list, str) else alias_list or [])
+    return targets
 
-    incoming_files = [f for f in os.listdir(INCOMING_DIR)
-                      if f.lower().endswith(".xlsx")]
-    template_files = [f for f in os.listdir(TEMPLATES_DIR)
-                      if f.lower().endswith(".xlsx")]
 
-    if not incoming_files:
-        print("⚠️ No source files found in /data/incoming.")
-        return
-    if not template_files:
-        print("⚠️ No DGW templates were found in /data/templates_dgw.")
-        return
+def _read_back(value):
+    """
+    Valor como o leitor openpyxl do pandas o veria depois de salvo:
+    vazio → "", fórmulas (sem valor em cache) → "", números inteiros → int.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return "" if value.startswith("=") and len(value) > 1 else value
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, numbers.Number):
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+def sheet_frame(ws, data_rows, header_row=6):
+    """
+    Reconstrói em memória o DataFrame que pd.read_excel(header=header_row - 1)
+    leria desta aba do DGW salvo, sem serializar/parsear o xlsx:
+    - linhas 1..header_row vêm do template (definem cabeçalho e largura)
+    - data_rows: uma lista {índice da coluna: valor} por linha escrita
+    Como nos templates DGW, assume que não há valores abaixo do cabeçalho.
+    """
+    grid = [
+        [_read_back(v) for v in row]
+        for row in ws.iter_rows(min_row=1, max_row=header_row, values_only=True)
+    ]
+    for cells in data_rows:
+        row = [""] * (max(cells) + 1 if cells else 0)
+        for col_idx, value in cells.items():
+            row[col_idx] = _read_back(value)
+        grid.append(row)
+
+    # mesmo recorte do pandas: vazios à direita e linhas vazias no final
+    for row in grid:
+        while row and row[-1] == "":
+            row.pop()
+    while grid and not grid[-1]:
+        grid.pop()
+    width = max((len(r) for r in grid), default=0)
+    grid = [r + [""] * (width - len(r)) for r in grid]
+
+    if len(grid) < header_row:
+        return pd.DataFrame()
+    return TextParser(grid, header=header_row - 1).read()
+
+
+# =============================================================================
+# Mapeamento de uma aba (origem → blocos de linhas do template)
+# =============================================================================
+def read_source_sheet(source, sheet):
+    """Aba de origem com header na linha 2 do legado (pacotes CSV/Parquet: primeira linha)."""
+    src_df = source.read_sheet(
+        sheet,
+        header=1,
+        keep_default_na=False,
+        na_values=[]
+    )
+    src_df.columns = src_df.columns.astype(str).str.strip()
+    return src_df.fillna("")
+
+
+def header_positions_of(template_headers):
+    """header template -> lista de posições (para duplicados)"""
+    header_positions = defaultdict(list)
+    for col_index, header in enumerate(template_headers):
+        if header:
+            header_positions[header].append(col_index)
+    return header_positions
+
+
+def map_rows(src_df, header_positions, aliases):
+    """
+    Blocos de linhas prontos para escrita: uma lista {índice da coluna: valor}
+    por linha da origem, na ordem da origem.
+    """
+    written_rows = []
 
-    print("🧩 Starting legacy template transformation...\n")
+    # percorre cada linha da origem
+    for _, row in src_df.iterrows():
+        written = {}
+        written_rows.append(written)
+        if row.isna().all():
+            continue
 
-    for file in incoming_files:
-        print(f"➡️ Converting {file}...")
+        # para cada coluna do template (alias key)
+        for tgt_col, alias_list in aliases.items():
+            # alias_list sempre é lista
+            if isinstance(alias_list, str):
+                alias_list = [alias_list]
 
-        input_path = os.path.join(INCOMING_DIR, file)
+            # encontra primeiro header de origem que exista
+            src_col_name = None
+            for alias in alias_list:
+                if alias in src_df.columns:
+                    src_col_name = alias
+                    break
 
-        # 1) mapping YAML
-        mapping_file = detect_mapping_file(file)
-        mapping_path = os.path.join(CONFIG_DIR, mapping_file)
-        if not os.path.exists(mapping_path):
-            print(f"❌ Mapping not found: {mapping_file}")
-            continue
+            if not src_col_name:
+                continue  # nenhum alias presente na origem
 
-        yaml_data = load_yaml(mapping_path)
-        aliases = yaml_data.get("aliases", {})
+            if tgt_col not in header_positions:
+                continue  # template não tem esta coluna
 
-        # 2) template DGW específico para este arquivo
-        template_name = detect_template_file(file, template_files)
-        if not template_name:
-            print("❌ Could not find a matching DGW template for this file.")
-            continue
+            value = row[src_col_name]
 
-        template_path = os.path.join(TEMPLATES_DIR, template_name)
-        print(f"   📄 Template loaded: {template_name}")
-        print(f"   📑 Mapping YAML:   {mapping_file}")
+            # escreve em TODAS as colunas do template com esse header
+            for col_idx in header_positions[tgt_col]:
+                written[col_idx] = value
 
-        # copia workbook do template para saída
-        tmpl_wb = load_workbook(template_path)
-        output_path = os.path.join(
-            OUTPUT_DIR,
-            f"{file.replace('.xlsx', '')}_DGW_ready.xlsx"
-        )
-        tmpl_wb.save(output_path)
-        out_wb = load_workbook(output_path)
+    return written_rows
 
-        # abas origem x template
-        src_sheets = get_valid_sheets(input_path)
-        tmpl_sheets = get_valid_sheets(template_path)
 
-        for sheet in tmpl_sheets:
-            ws = out_wb[sheet]
+def map_sheet_task(input_path, src_sheet, template_headers, aliases, snapshots=False):
+    """
+    Executado nos processos de transformação: lê a aba de origem (arquivo aberto
+    uma vez por processo) e devolve (colunas da origem, blocos de linhas).
+    """
+    src_df = read_source_sheet(cached_source(input_path, snapshots), src_sheet)
+    return list(src_df.columns), map_rows(src_df, header_positions_of(template_headers), aliases)
 
-            if sheet not in src_sheets:
-                print(f"⚠️ Sheet '{sheet}' does not exist in the legacy file — it will be left empty.")
-                continue
 
-            print(f"   📝 Filling sheet: {sheet}")
+def transform_to_dgw(io_exec=None, return_frames=False, workers=None):
+    """
+    Converte cada arquivo legado de data/incoming no template DGW correspondente.
+
+    io_exec: IOExecutor opcional — o .xlsx final é salvo em segundo plano
+    return_frames: devolve {caminho do DGW: {aba: DataFrame}} com as abas já no
+        formato lido pelo validador, para validar em memória sem reler o xlsx
+    workers: processos para ler e mapear as abas (None → TRANSFORM_WORKERS).
+        O workbook de saída continua sendo montado por um único escritor, na
+        ordem das abas do template — o resultado é idêntico ao caminho serial.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    workers = workers or TRANSFORM_WORKERS
+
+    suggestions = []
+    frames = {}
 
-            # header na linha 2 do legado
-            src_df = pd.read_excel(
-                input_path,
-                sheet_name=sheet,
-                header=1,
-                keep_default_na=False,
-                na_values=[]
-            )
+    # .xlsx ou pacotes (pasta/.zip) com um CSV/Parquet por aba
+    incoming_files = list_sources(INCOMING_DIR)
+    template_files = [f for f in os.listdir(TEMPLATES_DIR)
+                      if f.lower().endswith(".xlsx")]
+
+    if not incoming_files:
+        print("⚠️ No source files found in /data/incoming.")
+        return frames if return_frames else None
+    if not template_files:
+        print("⚠️ No DGW templates were found in /data/templates_dgw.")
+        return frames if return_frames else None
 
-            src_df.columns = src_df.columns.astype(str).str.strip()
-            src_df = src_df.fillna("")
+    print("🧩 Starting legacy template transformation...\n")
 
-            # cabeçalhos do template (linha 6)
-            header_row = 6
-            template_headers = [
-                (cell.value.strip() if isinstance(cell.value, str) else cell.value)
-                for cell in ws[header_row]
-            ]
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for file in incoming_files:
+            _transform_file(file, template_files, pool, io_exec, return_frames, frames, suggestions)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if suggestions:
+        os.makedirs(os.path.dirname(SUGGESTIONS_FILE), exist_ok=True)
+        pd.DataFrame(suggestions).to_csv(SUGGESTIONS_FILE, index=False, encoding="utf-8-sig")
+        print(f"💡 Mapping suggestions saved to: {SUGGESTIONS_FILE}")
+    elif os.path.exists(SUGGESTIONS_FILE):
+        os.remove(SUGGESTIONS_FILE)  # evita sugestões antigas de outra execução
 
-            # header template -> lista de posições (para duplicados)
-            header_positions = defaultdict(list)
-            for col_index, header in enumerate(template_headers):
-                if header:
-                    header_positions[header].append(col_index)
+    print("✅ Transformation completed!")
+    return frames if return_frames else None
 
-            start_row = 7
 
-            # percorre cada linha da origem
-            for r_index, (_, row) in enumerate(src_df.iterrows()):
-                if row.isna().all():
-                    continue
+def _transform_file(file, template_files, pool, io_exec, return_frames, frames, suggestions):
+    """
+    Converte um arquivo legado. Com pool, as abas de origem são lidas e mapeadas
+    nos processos; aqui fica só o escritor, que aplica os blocos de linhas no
+    workbook de saída aba a aba, na ordem do template.
+    """
+    print(f"➡️ Converting {file}...")
 
-                excel_row = start_row + r_index
+    input_path = os.path.join(INCOMING_DIR, file)
 
-                # para cada coluna do template (alias key)
-                for tgt_col, alias_list in aliases.items():
-                    # alias_list sempre é lista
-                    if isinstance(alias_list, str):
-                        alias_list = [alias_list]
+    # 1) mapping YAML
+    mapping_file = detect_mapping_file(file)
+    mapping_path = os.path.join(CONFIG_DIR, mapping_file)
+    if not os.path.exists(mapping_path):
+        print(f"❌ Mapping not found: {mapping_file}")
+        return
 
-                    # encontra primeiro header de origem que exista
-                    src_col_name = None
-                    for alias in alias_list:
-                        if alias in src_df.columns:
-                            src_col_name = alias
-                            break
+    yaml_data = load_yaml(mapping_path)
+    aliases = yaml_data.get("aliases", {})
 
-                    if not src_col_name:
-                        continue  # nenhum alias presente na origem
+    # 2) template DGW específico para este arquivo
+    template_name = detect_template_file(file, template_files)
+    if not template_name:
+        print("❌ Could not find a matching DGW template for this file.")
+        return
 
-                    if tgt_col not in header_positions:
-                        continue  # template não tem esta coluna
+    template_path = os.path.join(TEMPLATES_DIR, template_name)
+    print(f"   📄 Template loaded: {template_name}")
+    print(f"   📑 Mapping YAML:   {mapping_file}")
+
+    # o workbook do template carregado em memória já é a cópia de saída
+    # (sem salvar e recarregar o xlsx só para duplicá-lo)
+    out_wb = load_workbook(template_path)
+    output_path = os.path.join(
+        OUTPUT_DIR,
+        f"{source_stem(file)}_DGW_ready.xlsx"
+    )
+
+    # abas origem x template
+    source = open_source(input_path, snapshots=SNAPSHOT_SOURCES)
+    print(f"   📥 Source format:  {source.kind}")
+    tmpl_sheets = [s for s in out_wb.sheetnames if not s.strip().startswith(">")]
+    file_frames = {}
+
+    # índice de similaridade (cabeçalhos do template + aliases), 1x por par template/mapping
+    known_aliases = {a for v in aliases.values() for a in ([v] if isinstance(v, str) else v or [])}
+    matcher = get_alias_matcher(
+        (template_path, os.path.getmtime(template_path), mapping_path, os.path.getmtime(mapping_path)),
+        lambda: template_alias_targets(out_wb, tmpl_sheets, aliases),
+    )
+
+    # cabeçalhos do template (linha 6) e aba de origem de cada aba do template
+    header_row = 6
+    plan = []
+    for sheet in tmpl_sheets:
+        ws = out_wb[sheet]
+        template_headers = [
+            (cell.value.strip() if isinstance(cell.value, str) else cell.value)
+            for cell in ws[header_row]
+        ]
+        src_sheet = source.find_sheet(sheet)
+        if src_sheet is not None and src_sheet.strip().startswith(">"):
+            src_sheet = None
+        plan.append((sheet, ws, template_headers, src_sheet))
+
+    # todas as abas do arquivo vão para os processos de uma vez
+    futures = {}
+    if pool is not None:
+        for sheet, _, template_headers, src_sheet in plan:
+            if src_sheet is not None:
+                futures[sheet] = pool.submit(map_sheet_task, input_path, src_sheet, template_headers, aliases,
+                                             SNAPSHOT_SOURCES)
+
+    # escritor único, na ordem das abas do template
+    for sheet, ws, template_headers, src_sheet in plan:
+        if src_sheet is None:
+            print(f"⚠️ Sheet '{sheet}' does not exist in the legacy file — it will be left empty.")
+            if return_frames:
+                file_frames[sheet] = sheet_frame(ws, [])
+            continue
 
-                    value = row[src_col_name]
+        print(f"   📝 Filling sheet: {sheet}")
 
-                    # escreve em TODAS as colunas do template com esse header
-                    for col_idx in header_positions[tgt_col]:
-                        ws.cell(row=excel_row, column=col_idx + 1, value=value)
+        header_positions = header_positions_of(template_headers)
+        if sheet in futures:
+            src_columns, written_rows = futures.pop(sheet).result()
+        else:
+            src_df = read_source_sheet(source, src_sheet)
+            src_columns, written_rows = list(src_df.columns), map_rows(src_df, header_positions, aliases)
 
+        # colunas da origem sem alias conhecido → sugestões por similaridade
+        for src_col in src_columns:
+            if src_col in known_aliases or is_blank_header(src_col):
+                continue
+            ranked = matcher.suggest(src_col, candidates=header_positions)
+            if ranked:
+                best = ranked[0]
+                print(f"   💡 Unmapped column '{src_col}' → maybe '{best[0]}' (score {best[2]})")
+            else:
+                print(f"   ⚠️ Unmapped column '{src_col}' (no similar template column)")
+            for rank, (target, alias, score) in enumerate(ranked, start=1):
+                suggestions.append({
+                    "File": file,
+                    "Sheet": sheet,
+                    "Source Column": src_col,
+                    "Rank": rank,
+                    "Suggested Column": target,
+                    "Matched Alias": alias,
+                    "Score": score,
+                })
+
+        start_row = 7
+        for r_index, written in enumerate(written_rows):
+            excel_row = start_row + r_index
+            for col_idx, value in written.items():
+                ws.cell(row=excel_row, column=col_idx + 1, value=value)
+
+        if return_frames:
+            file_frames[sheet] = sheet_frame(ws, written_rows, header_row)
+
+    source.close()
+
+    if io_exec is not None:
+        # o xlsx para entrega ao Workday é salvo em segundo plano
+        io_exec.submit(_save_workbook, out_wb, output_path, label=output_path)
+        print(f"✅ DGW file queued for writing: {output_path}\n")
+    else:
         out_wb.save(output_path)
         print(f"✅ DGW file ready: {output_path}\n")
 
-    print("✅ Transformation completed!")
+    if return_frames:
+        frames[output_path] = file_frames
+
+
+def _save_workbook(wb, path):
+    wb.save(path)
+    print(f"💾 DGW file written: {path}")
 
 
 if __name__ == "__main__":
-    transform_to_dgw()
+    workers = next((int(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith("--workers=")), None)
+    transform_to_dgw(workers=workers)
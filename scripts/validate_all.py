@@ -1,10 +1,29 @@
 import os
 import sys
-import yaml
+import json
+import time
+import numpy as np
 import pandas as pd
 import openpyxl
 from datetime import datetime
 from great_expectations.dataset import PandasDataset
+from io_executor import IOExecutor, submit_io, write_text
+from failure_store import FailureStore
+from rule_index import load_rule_index
+from reference_sets import load_reference_set
+from input_formats import list_sources, open_source
+from template_rules import find_template, load_template_metadata, merge_sheet_rules
+from rule_expressions import load_expression_rules, rules_for_sheet, find_column
+from event_sequence import load_sequence_config, event_frame, check_sequence, check_stage_order
+from worker_index import WorkerIndex, CONTACT_COLUMN, NOT_HIRED
+from row_sampling import stratified_offsets, estimate_failures
+from column_profile import ParsedColumns, profile_frame, profile_html
+from sheet_schema import id_dtypes, sheet_schema, apply_schema, in_set_mask, regex_mask
+from run_metrics import RunMetrics
+from failure_diff import FailureHistory, scope_name, row_key_hashes
+from rule_stats import RuleStats, STATS_FILE
+from work_scheduler import SheetScheduler
+from failure_annotation import annotate_workbook, annotated_path, print_report
 
 # =============================================================================
 # Caminhos base
@@ -12,9 +31,20 @@ from great_expectations.dataset import PandasDataset
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(BASE_DIR, "data/curated")
 RULES_FILE = os.path.join(BASE_DIR, "config", "rules_global.yaml")
+ALIAS_FILE = os.path.join(BASE_DIR, "config", "field_mappings.yaml")
+EXPRESSIONS_FILE = os.path.join(BASE_DIR, "config", "rules_expressions.yaml")
+SEQUENCES_FILE = os.path.join(BASE_DIR, "config", "event_sequences.yaml")
 OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
 PREVIEW_DIR = os.path.join(OUTPUT_DIR, "previews")
 FAILS_DIR = os.path.join(OUTPUT_DIR, "failures")
+PROFILE_FILE = os.path.join(OUTPUT_DIR, "column_profile.json")
+HISTORY_DIR = os.path.join(OUTPUT_DIR, "history")
+QUEUE_DIR = os.path.join(OUTPUT_DIR, "queue")  # fila do modo coordenador/worker
+ANNOTATED_DIR = os.path.join(OUTPUT_DIR, "annotated")  # cópias dos DGW com as falhas destacadas
+PDF_REPORT_FILE = os.path.join(OUTPUT_DIR, "validation_report.pdf")
+# métricas da última execução (aponte METRICS_FILE para a pasta do textfile collector do node_exporter)
+METRICS_FILE = os.path.join(OUTPUT_DIR, "metrics", "dgw_validation.prom")
+METRICS_JSON = os.path.join(OUTPUT_DIR, "metrics", "dgw_validation.json")
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(PREVIEW_DIR, exist_ok=True)
@@ -24,11 +54,45 @@ os.makedirs(FAILS_DIR, exist_ok=True)
 # =============================================================================
 # Load Global Rules
 # =============================================================================
-with open(RULES_FILE, "r", encoding="utf-8") as f:
-    GLOBAL_RULES = yaml.safe_load(f)
+# Carregado uma vez no import; load_rule_index() mantém o índice em cache
+GLOBAL_RULES, _, _ = load_rule_index(RULES_FILE, ALIAS_FILE)
 
 DEBUG_MODE = True
 
+# quantos valores mais frequentes aparecem por regra no dashboard
+FAIL_TOP_N = 5
+
+# estatísticas por coluna (nulos, distintos, datas, top valores) na mesma leitura da validação
+PROFILE_COLUMNS = True
+
+# relatório em PDF (agregados por aba e por regra) junto com o dashboard
+PDF_REPORT = True
+
+# cópia de cada DGW .xlsx com as células que falharam destacadas (--annotate)
+ANNOTATE_FAILURES = False
+
+# combina rules_global.yaml com Required/Optional e dropdowns do template DGW
+USE_TEMPLATE_RULES = True
+
+# carga tipada: IDs como texto, datas como datetime64 e colunas repetitivas como categóricas
+TYPED_LOADING = True
+
+# Modo rápido (fail-fast): resposta em segundos para arquivos grosseiramente quebrados
+FAST_SAMPLE_ROWS = 200    # linhas iniciais de cada aba validadas antes da leitura completa
+FAST_RULE_CAP = 50        # falhas registradas por regra
+FAST_ABORT_RATIO = 0.5    # fração de checagens com falha que aborta o arquivo
+FAST_MIN_CHECKS = 5       # mínimo de checagens antes de avaliar a fração
+
+# Modo amostragem: checagens intermediárias em cargas muito grandes
+SAMPLE_ROWS = 2000        # linhas sorteadas por aba
+SAMPLE_STRATA = 10        # faixas do arquivo com a mesma cota de linhas
+SAMPLE_SEED = 42          # semente fixa: a mesma amostra a cada execução
+SAMPLE_Z = 1.96           # intervalo de confiança de 95%
+
+# Leitura paralela das abas (validação completa): processos e orçamento de memória
+LOAD_WORKERS = 1          # 1 → leitura sequencial com prefetch; --workers=N na linha de comando
+MEMORY_BUDGET_MB = 2048   # soma estimada (XML das abas) das abas em memória ao mesmo tempo
+
 def debug(msg):
     if DEBUG_MODE:
         print(msg)
@@ -103,120 +167,417 @@ def apply_rule(ge_df, df, column_name, rule_obj):
 # =============================================================================
 # Validação Principal
 # =============================================================================
-def get_col(df, yaml_column, aliases):
+def fast_abort_reason(total_checks, failed):
+    """Motivo para abortar o arquivo no modo rápido, ou None se ele deve seguir."""
+    if total_checks >= FAST_MIN_CHECKS and failed / total_checks > FAST_ABORT_RATIO:
+        return f"{failed}/{total_checks} checks failed (> {FAST_ABORT_RATIO:.0%})"
+    return None
+
+
+def check_worker_consistency(worker_index, file_path, sheet_name, df, first_row, io_exec=None):
     """
-    Localiza uma coluna real no dataframe baseada no nome do YAML ou aliases.
-    - yaml_column: nome exato do arquivo global_rules.yaml
-    - aliases: dicionário de alias carregado em field_mappings.yaml
+    Confere o Worker ID de uma aba do PersonalContactInfo contra o índice de
+    trabalhadores contratados nos HireStack da execução (seção própria no dashboard).
     """
-    # 1) Nome exato
-    if yaml_column in df.columns:
-        return yaml_column
+    id_col = find_column(df, CONTACT_COLUMN)
+    if id_col is None:
+        return
+
+    file_name = os.path.basename(file_path)
+    result = {
+        "File": file_name,
+        "Sheet": sheet_name,
+        "Column": id_col,
+        "Checked": int(df[id_col].notna().sum()),
+        "Not Found": 0,
+        "Sample": "",
+        "Status": "✔ Consistent",
+    }
+
+    if worker_index.incomplete:
+        # IDs das abas que ficaram de fora apareceriam como "não contratados"
+        result["Status"] = f"⚠️ Skipped: worker index incomplete ({', '.join(worker_index.incomplete)})"
+        worker_index.results.append(result)
+        return
+    if not worker_index.sources:
+        result["Status"] = "⚠️ No HireStack hire tabs in this run"
+        worker_index.results.append(result)
+        return
 
-    # 2) Aliases possíveis
-    if yaml_column in aliases:
-        for alias in aliases[yaml_column]:
-            if alias in df.columns:
-                return alias
+    missing = np.flatnonzero(worker_index.missing_mask(df[id_col]))
+    if len(missing):
+        values = df[id_col].to_numpy()[missing]
+        store = FailureStore()
+        store.add(id_col, NOT_HIRED, missing + first_row, values)
+        fail_path = os.path.join(FAILS_DIR, f"{file_name}_{sheet_name}_worker_consistency.csv")
+        submit_io(io_exec, store.write_csv, fail_path, label=fail_path)
 
-    # 3) Não existe
-    return None
+        result["Failures CSV"] = fail_path
+        result["Not Found"] = len(missing)
+        result["Sample"] = ", ".join(map(str, list(dict.fromkeys(values))[:10]))
+        result["Status"] = f"❌ Details: {os.path.basename(fail_path)}"
+        debug(f"   ❌ {len(missing)} Worker ID(s) not found in HireStack → {fail_path}")
+
+    worker_index.results.append(result)
 
 
-def validate_dgw(file_path):
+# =============================================================================
+# Contexto da execução: colaboradores compartilhados por todos os arquivos
+# =============================================================================
+class RunContext:
+    """
+    Colaboradores de uma execução, repassados juntos a validate_dgw e
+    write_dashboard (execução local, worker distribuído ou coordenador).
+    Campos None desligam o recurso correspondente.
+
+    io_exec: IOExecutor; previews e CSVs de falhas são escritos em segundo plano
+    worker_index: WorkerIndex; HireStack alimenta, PersonalContactInfo consulta
+    fast: modo fail-fast — valida antes uma amostra inicial de cada aba, registra no
+        máximo FAST_RULE_CAP falhas por regra e aborta o arquivo acima de FAST_ABORT_RATIO
+    sample_size: modo amostragem — valida só uma amostra estratificada de linhas de
+        cada aba e reporta taxas de falha estimadas com intervalo de confiança
+    history: FailureHistory; recebe as chaves de falha de cada aba validada por
+        inteiro, para o comparativo com a execução anterior
+    annotations: {caminho: {aba: células com falha (Column, Row, Rule)}} das abas
+        validadas por inteiro, para as cópias anotadas dos workbooks
+    metrics: RunMetrics; tempo de cada etapa (abertura, leitura, regras, perfil)
+    rule_stats: RuleStats; checagens, falhas, erros e tempo por regra (só abas
+        validadas por inteiro)
+    """
+
+    def __init__(self, io_exec=None, worker_index=None, fast=False, sample_size=None,
+                 history=None, annotations=None, metrics=None, rule_stats=None):
+        self.io_exec = io_exec
+        self.worker_index = worker_index
+        self.fast = fast
+        self.sample_size = sample_size
+        self.history = history
+        self.annotations = annotations
+        self.metrics = metrics
+        self.rule_stats = rule_stats
+
+    @classmethod
+    def local(cls, io_exec, fast=False, sample_size=None, annotate=False):
+        """Execução local; histórico, estatísticas e anotações só na validação completa."""
+        full = not fast and not sample_size
+        return cls(
+            io_exec,
+            WorkerIndex(),
+            fast,
+            sample_size,
+            history=FailureHistory(HISTORY_DIR) if full else None,
+            # o modo rápido limita as falhas registradas por regra
+            annotations={} if annotate and full else None,
+            metrics=RunMetrics("fast" if fast else "sample" if sample_size else "full"),
+            rule_stats=RuleStats(HISTORY_DIR) if full else None,
+        )
+
+    def file_annotations(self, path):
+        return self.annotations.setdefault(path, {}) if self.annotations is not None else None
+
+
+def validate_dgw(file_path, run=None, source=None, frames=None, sheets=None):
     """
     Versão FINAL com logs detalhados:
     - Usa regras globais (rules_global.yaml)
-    - Usa get_col() para mapear alias → coluna real
+    - Usa o índice de regras (rule_index.py) para mapear alias → coluna real
     - Valida apenas colunas existentes
     - Logs aparecem apenas quando DEBUG_MODE = True
+
+    run: RunContext da execução (executor de I/O, índice de trabalhadores, modo,
+        histórico, anotações, métricas, estatísticas); ausente: arquivo avulso
+    source: bytes já carregados do arquivo (BytesIO), ex.: vindos do prefetch
+    frames: {aba: DataFrame} já em memória (ex.: vindos do transform_to_dgw);
+        quando informado, o xlsx não é lido
+    sheets: valida só estas abas (ex.: tarefas de um worker no modo distribuído);
+        as demais continuam disponíveis para regras entre abas
     """
+    run = run if run is not None else RunContext()
+    io_exec, worker_index, history, metrics, rule_stats = (
+        run.io_exec, run.worker_index, run.history, run.metrics, run.rule_stats)
+    fast, sample_size = run.fast, run.sample_size
+    annotations = run.file_annotations(file_path)
 
     def debug(msg):
         if DEBUG_MODE:
             print(msg)
 
+    def timed(stage, since):
+        if metrics is not None:
+            metrics.add(stage, time.perf_counter() - since)
+
     # ---------------------------------------------------------
-    # Load Global Rules
+    # Load Global Rules (+ aliases opcionais) e índice de aplicabilidade
     # ---------------------------------------------------------
     try:
-        with open(RULES_FILE, "r", encoding="utf-8") as f:
-            GLOBAL_RULES = yaml.safe_load(f)
+        GLOBAL_RULES, aliases, rule_index = load_rule_index(RULES_FILE, ALIAS_FILE)
         debug("\n📘 Global rules loaded successfully.")
     except Exception as e:
         print(f"❌ Error loading YAML rules: {e}")
         return []
 
-    # Load aliases (optional)
-    aliases = {}
-    alias_file = os.path.join(BASE_DIR, "config", "field_mappings.yaml")
-    if os.path.exists(alias_file):
-        with open(alias_file, "r", encoding="utf-8") as f:
-            alias_yaml = yaml.safe_load(f)
-            aliases = alias_yaml.get("aliases", {})
-
+    if aliases:
         debug(f"📘 Aliases loaded: {aliases}")
     else:
         debug("⚠️ No alias file found. Proceeding without aliases.")
 
     dgw_type = detect_type(file_path)
 
+    # Metadados do template (Required/Optional + dropdowns), em cache por versão
+    template_meta = {}
+    if USE_TEMPLATE_RULES:
+        template_path = find_template(os.path.basename(file_path))
+        if template_path:
+            try:
+                template_meta = load_template_metadata(template_path)
+                debug(f"📐 Template rules: {os.path.basename(template_path)}")
+            except Exception as e:
+                print(f"⚠️ Could not read template rules from {template_path}: {e}")
+
+    # Regras condicionais/entre colunas (compiladas uma vez, em cache até o YAML mudar)
+    try:
+        expression_rules = load_expression_rules(EXPRESSIONS_FILE)
+    except Exception as e:
+        print(f"❌ Error loading expression rules: {e}")
+        expression_rules = {}
+
+    # Abas com eventos efetivos por trabalhador (Hire → Job Change → Termination)
+    try:
+        sequence_config = load_sequence_config(SEQUENCES_FILE)
+    except Exception as e:
+        print(f"❌ Error loading event sequence config: {e}")
+        sequence_config = None
+
     # ---------------------------------------------------------
     # Load valid sheets
     # ---------------------------------------------------------
-    valid_sheets = get_valid_sheets(file_path)
+    # O workbook (xlsx ou pacote CSV/Parquet) é aberto uma única vez
+    # e reaproveitado por todas as abas
+    if frames is not None:
+        xl = None
+        valid_sheets = [s for s in frames if not s.strip().startswith(">")]
+    else:
+        started = time.perf_counter()
+        xl = open_source(file_path, data=source)
+        valid_sheets = [s for s in xl.sheet_names if not s.strip().startswith(">")]
+        timed("open", started)
+    if sheets is not None:
+        valid_sheets = [s for s in valid_sheets if s in sheets]
     if not valid_sheets:
         print(f"⚠️ No valid tabs found in {file_path}")
+        if xl is not None:
+            xl.close()
         return []
 
     debug(f"\n📄 Valid sheets detected: {valid_sheets}")
 
+    def read_sheet(name, **kwargs):
+        """
+        Lê a aba do workbook; na carga tipada de .xlsx, as colunas de ID já vêm como
+        texto (CSV/Parquet têm tipos próprios e passam pelo apply_schema depois).
+        """
+        if TYPED_LOADING and xl.kind == "xlsx":
+            kwargs["dtype"] = id_dtypes(xl.columns(name, 5))
+        return xl.read_sheet(name, header=5, **kwargs)
+
+    # abas consultadas por regras de outra aba (ex.: Hire Date para Terminate Employee)
+    other_sheets = {}
+
+    def load_sheet(name):
+        if name not in other_sheets:
+            if frames is not None:
+                real = next((s for s in frames if s.strip() == name.strip()), None)
+                other = frames[real] if real else None
+            else:
+                real = xl.find_sheet(name) or next(
+                    (s for s in xl.sheet_names if s.strip() == name.strip()), None)
+                other = read_sheet(real) if real else None
+            if other is not None and TYPED_LOADING:
+                # mesmos tipos de chave/data da aba validada (lookups por Employee ID)
+                other, _ = apply_schema(other, sheet_schema(other.columns))
+            other_sheets[name] = other
+        return other_sheets[name]
+
+    # eventos (trabalhador, data, sequência) já extraídos, por aba
+    sheet_events = {}
+
+    def events_for(name):
+        if name not in sheet_events:
+            other = load_sheet(name)
+            sheet_events[name] = event_frame(other, sequence_config.spec(name)) if other is not None else None
+        return sheet_events[name]
+
     all_results = []
 
+    # No modo rápido todas as abas passam primeiro por uma amostra das linhas
+    # iniciais; se a amostra já estourar FAST_ABORT_RATIO, o arquivo nem é lido inteiro.
+    schedule = [(sheet, False) for sheet in valid_sheets]
+    if fast:
+        schedule = [(sheet, True) for sheet in valid_sheets] + schedule
+    cap = FAST_RULE_CAP if fast else None
+    file_checks = file_failed = 0
+    full_pass = not fast
+    aborted = None
+    indexed = set()  # abas do HireStack já processadas para o índice de trabalhadores
+
     # ---------------------------------------------------------
     # Validate each sheet
     # ---------------------------------------------------------
-    for sheet_name in valid_sheets:
+    for sheet_name, sample in schedule:
+
+        if not sample and not full_pass:
+            # fim da amostra: decide se o arquivo segue para a validação completa
+            full_pass = True
+            reason = fast_abort_reason(file_checks, file_failed)
+            if reason:
+                print(f"⏹ {os.path.basename(file_path)} aborted early on a {FAST_SAMPLE_ROWS}-row sample: {reason}")
+                for res in all_results:
+                    res["Status"] = "Aborted early"
+                    res["Error"] = f"⏹ Aborted early ({FAST_SAMPLE_ROWS}-row sample): {reason}"
+                break
+            all_results, file_checks, file_failed = [], 0, 0
+
+        if aborted:
+            all_results.append({
+                "File": os.path.basename(file_path),
+                "Sheet": sheet_name,
+                "Type": dgw_type,
+                "Total Checks": 0,
+                "Failed": 0,
+                "Success %": 0,
+                "Error": "⏭ Skipped: file aborted early",
+                "Status": "Aborted early",
+                "Matched Columns": 0,
+                "Unmapped Columns": [],
+                "Fail HTML": ""
+            })
+            continue
 
         debug(f"\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-        debug(f"➡️ Validating sheet: {sheet_name}")
+        debug(f"➡️ Validating sheet: {sheet_name}" + (f" (first {FAST_SAMPLE_ROWS} rows)" if sample else ""))
         debug(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
 
+        # amostras (fail-fast ou amostragem) não valem para regras sobre o arquivo inteiro
+        partial = sample or bool(sample_size)
+        row_numbers = None  # linha do arquivo de cada linha do df (quando não é contígua)
+        # linha do Excel/arquivo da 1ª linha de dados (num pacote, depende do formato da aba)
+        first_row = 7 if xl is None else xl.first_row(sheet_name, 5)
+        total_rows = None
+
+        started = time.perf_counter()
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, header=5)
+            if frames is not None:
+                df = frames[sheet_name]
+                if sample:
+                    df = df.head(FAST_SAMPLE_ROWS)
+                elif sample_size:
+                    total_rows = len(df)
+                    offsets = stratified_offsets(total_rows, sample_size, SAMPLE_STRATA, SAMPLE_SEED)
+                    df = df.iloc[offsets].reset_index(drop=True)
+                    row_numbers = offsets + first_row
+            elif sample_size and not sample:
+                df, row_numbers, total_rows = xl.sample_sheet(
+                    sheet_name, 5, sample_size, SAMPLE_STRATA, SAMPLE_SEED)
+            else:
+                df = read_sheet(sheet_name, nrows=FAST_SAMPLE_ROWS if sample else None)
             debug(f"📊 Columns detected: {list(df.columns)}")
         except Exception as e:
             print(f"❌ Error reading sheet {sheet_name}: {e}")
             continue
 
-        if DEBUG_MODE:
+        if row_numbers is None:
+            row_numbers = np.arange(len(df), dtype=np.int64) + first_row
+        if total_rows is not None:
+            debug(f"🎲 Sampled {len(df)} of ~{total_rows} rows")
+
+        preview_path = None
+        if DEBUG_MODE and not sample:
             preview_path = os.path.join(
                 PREVIEW_DIR,
                 f"{os.path.basename(file_path)}_{sheet_name}_preview.csv"
             )
-            df.head(20).to_csv(preview_path, index=False)
+            submit_io(io_exec, df.head(20).to_csv, preview_path, index=False, label=preview_path)
             debug(f"🧩 Preview saved: {preview_path}")
 
+        # só as regras cujo cabeçalho (ou alias) existe nesta aba
+        matches, unmapped = rule_index.match(list(df.columns))
+        if sheet_name in template_meta:
+            plan = merge_sheet_rules(matches, GLOBAL_RULES, template_meta[sheet_name], df.columns)
+            planned = {real_col for _, real_col, _ in plan}
+            unmapped = [c for c in unmapped if c not in planned]
+        else:
+            plan = [(rule, real_col, GLOBAL_RULES[rule] or {}) for rule, real_col in matches]
+
+        # tipos da aba a partir do plano e do template (antes do GE: as regras já veem a aba tipada)
+        if TYPED_LOADING:
+            spec = sequence_config.spec(sheet_name) if sequence_config else None
+            schema = sheet_schema(df.columns, plan, template_meta.get(sheet_name),
+                                  [spec["date"]] if spec else ())
+            df, typed = apply_schema(df, schema)
+            debug(f"🧮 Typed columns: {typed['category']} categorical, {typed['date']} date, {typed['id']} ID")
+
+        timed("read", started)
+        started = time.perf_counter()
         ge_df = PandasDataset(df)
-        failure_details = []
+        parsed = ParsedColumns(df)  # nulos/datas convertidos uma vez por aba
+        failures = FailureStore()
         total_checks = 0
+        failed = 0
+
+        def record(res, real_col):
+            """Contabiliza o resultado de uma expectation e guarda as falhas no store."""
+            nonlocal total_checks, failed
+            total_checks += 1
+            if res.success:
+                return True
+            failed += 1
+            idx = res.result.get("unexpected_index_list") or []
+            vals = res.result.get("unexpected_list") or []
+            failures.add(
+                real_col,
+                res.expectation_config.expectation_type,
+                row_numbers[np.asarray(idx, dtype=np.int64)],
+                vals,
+            )
+            return False
+
+        def mark():
+            return total_checks, len(failures), time.perf_counter()
+
+        def note(rule_name, source, since, extra=0.0, error=False):
+            """
+            Contadores da regra desde mark(); extra: parte do tempo de um cálculo
+            compartilhado; error: a avaliação levantou exceção (conta a tentativa).
+            """
+            if rule_stats is not None and not partial:
+                checks, fails, t0 = since
+                rule_stats.add(rule_name, source, total_checks - checks, len(failures) - fails,
+                               time.perf_counter() - t0 + extra, errors=int(error))
+
+        def record_mask(mask, real_col, rule_name):
+            """
+            Mesma contabilização de record(), para checagens vetorizadas fora do GE.
+            No modo rápido as regras de coluna também passam por aqui: o GE monta a
+            lista COMPLETE de falhas inteira, aqui só as cap primeiras viram registro.
+            """
+            nonlocal total_checks, failed
+            total_checks += 1
+            idx = np.flatnonzero(mask)[:cap]
+            if not len(idx):
+                return True
+            failed += 1
+            failures.add(real_col, rule_name, row_numbers[idx], df[real_col].to_numpy()[idx])
+            return False
 
         # ---------------------------------------------------------
         # Apply global rules
         # ---------------------------------------------------------
         debug("\n📌 Starting column rule validation...")
+        debug(f"   ➤ Rules matched: {len(plan)} | Unmapped headers: {len(unmapped)}")
 
-        for yaml_column, rule_set in GLOBAL_RULES.items():
-
-            #debug(f"\n🔍 Checking YAML column: {yaml_column}")
-
-            # Encontrar coluna real usando get_col()
-            real_col = get_col(df, yaml_column, aliases)
-
-            if not real_col:
-                #debug(f"   ⚠️ Column not present in this sheet. Skipping.")
-                continue
+        for yaml_column, real_col, rule_set in plan:
 
+            since = mark()
             debug(f"   ✔ Column found in Excel as: {real_col}")
             expectations = rule_set.get("expectations", [])
             debug(f"   ➤ Expectations: {expectations}")
@@ -227,18 +588,14 @@ def validate_dgw(file_path):
             if "expect_column_values_to_not_be_null" in expectations:
                 debug(f"      • Applying NOT NULL")
 
-                res = ge_df.expect_column_values_to_not_be_null(real_col)
-                total_checks += 1
-
-                if not res.success:
+                if fast:
+                    ok = record_mask(df[real_col].isna().to_numpy(), real_col,
+                                     "expect_column_values_to_not_be_null")
+                else:
+                    res = ge_df.expect_column_values_to_not_be_null(real_col, result_format="COMPLETE")
+                    ok = record(res, real_col)
+                if not ok:
                     debug(f"        ❌ Not Null FAILED")
-                    for idx in res.result.get("unexpected_index_list", []):
-                        failure_details.append({
-                            "Column": real_col,
-                            "Row": idx + 7,
-                            "Value": df.loc[idx, real_col],
-                            "Rule": "not_null"
-                        })
                 else:
                     debug(f"        ✔ Not Null PASSED")
 
@@ -249,21 +606,14 @@ def validate_dgw(file_path):
                 pattern = rule_set.get("pattern")
                 debug(f"      • Applying REGEX → {pattern}")
 
-                res = ge_df.expect_column_values_to_match_regex(real_col, pattern)
-                total_checks += 1
-
-                if not res.success:
+                if fast:
+                    ok = record_mask(regex_mask(df[real_col], pattern), real_col,
+                                     "expect_column_values_to_match_regex")
+                else:
+                    res = ge_df.expect_column_values_to_match_regex(real_col, pattern, result_format="COMPLETE")
+                    ok = record(res, real_col)
+                if not ok:
                     debug(f"        ❌ Regex FAILED")
-                    for idx, val in zip(
-                        res.result.get("unexpected_index_list", []),
-                        res.result.get("unexpected_list", [])
-                    ):
-                        failure_details.append({
-                            "Column": real_col,
-                            "Row": idx + 7,
-                            "Value": val,
-                            "Rule": f"regex: {pattern}"
-                        })
                 else:
                     debug(f"        ✔ Regex PASSED")
 
@@ -271,64 +621,113 @@ def validate_dgw(file_path):
             # IN SET
             # -----------------------------
             if "expect_column_values_to_be_in_set" in expectations:
-                allowed = rule_set.get("allowed_values", [])
-                debug(f"      • Applying IN SET → {allowed}")
-
-                res = ge_df.expect_column_values_to_be_in_set(real_col, allowed)
-                total_checks += 1
-
-                if not res.success:
+                reference = rule_set.get("reference")
+
+                if reference:
+                    # lista grande externa: lookup hash vetorizado, sem passar pelo GE
+                    try:
+                        ref = load_reference_set(reference["file"], reference.get("column"))
+                    except Exception as e:
+                        print(f"❌ Error loading reference set for {yaml_column}: {e}")
+                        continue
+                    debug(f"      • Applying IN SET → reference {reference['file']} ({len(ref)} values)")
+                    ok = record_mask(ref.missing_mask(df[real_col]), real_col,
+                                     "expect_column_values_to_be_in_set")
+                else:
+                    allowed = rule_set.get("allowed_values", [])
+                    debug(f"      • Applying IN SET → {allowed}")
+                    if fast or isinstance(df[real_col].dtype, pd.CategoricalDtype):
+                        # categórica: só as categorias distintas são testadas, via códigos;
+                        # modo rápido: máscara em vez da lista COMPLETE do GE
+                        ok = record_mask(in_set_mask(df[real_col], allowed), real_col,
+                                         "expect_column_values_to_be_in_set")
+                    else:
+                        res = ge_df.expect_column_values_to_be_in_set(real_col, allowed, result_format="COMPLETE")
+                        ok = record(res, real_col)
+
+                if not ok:
                     debug(f"        ❌ In Set FAILED")
-                    for idx, val in zip(
-                        res.result.get("unexpected_index_list", []),
-                        res.result.get("unexpected_list", [])
-                    ):
-                        failure_details.append({
-                            "Column": real_col,
-                            "Row": idx + 7,
-                            "Value": val,
-                            "Rule": f"in_set: {allowed}"
-                        })
                 else:
                     debug(f"        ✔ In Set PASSED")
 
+            note(yaml_column, "global" if yaml_column in GLOBAL_RULES else "template", since)
+
         # ---------------------------------------------------------
-        # Finalização da aba
+        # Regras condicionais / entre colunas (rules_expressions.yaml)
         # ---------------------------------------------------------
-        # Agora executamos a validação REAL do GE
-        validation = ge_df.validate(result_format="COMPLETE")
+        for rule in rules_for_sheet(expression_rules, sheet_name):
+            if partial and not rule.row_wise:
+                debug(f"   ⏭ Skipping rule '{rule.name}' on a row sample")
+                continue
+            since = mark()
+            try:
+                outcome = rule.evaluate(df, load_sheet)
+            except Exception as e:
+                print(f"❌ Error evaluating rule '{rule.name}' on {sheet_name}: {e}")
+                note(rule.name, "expression", since, error=True)
+                continue
+            if outcome is None:
+                debug(f"   ⏭ Skipping rule '{rule.name}' (columns not found)")
+                continue
+            real_col, mask = outcome
+            debug(f"      • Applying RULE → {rule.name}")
+            if not record_mask(mask, real_col, rule.name):
+                debug(f"        ❌ {int(mask.sum())} row(s) FAILED")
+            else:
+                debug(f"        ✔ Rule PASSED")
+            note(rule.name, "expression", since)
 
-        failed = 0
-        failure_details = []
-
-        for r in validation["results"]:
-            if not r.get("success"):
-                failed += 1
-
-                rule_name = r["expectation_config"]["expectation_type"]
-                col = r["expectation_config"]["kwargs"].get("column")
-
-                unexpected_vals = (
-                        r["result"].get("unexpected_list")
-                        or r["result"].get("partial_unexpected_list")
-                        or []
-                )
-
-                unexpected_idx = (
-                        r["result"].get("unexpected_index_list")
-                        or r["result"].get("partial_unexpected_index_list")
-                        or []
-                )
-
-                for val, idx in zip(unexpected_vals, unexpected_idx):
-                    failure_details.append({
-                        "Column": col,
-                        "Row": idx + 7,
-                        "Value": val,
-                        "Rule": rule_name
-                    })
-
-        total_checks = len(validation["results"])
+        # ---------------------------------------------------------
+        # Sequência de eventos efetivos por trabalhador (event_sequences.yaml)
+        # ---------------------------------------------------------
+        # (regras sobre o arquivo inteiro: ficam fora da amostra do modo rápido)
+        seq_spec = sequence_config.spec(sheet_name) if sequence_config and not partial else None
+        if seq_spec:
+            events = event_frame(df, seq_spec, parsed)
+            if events is None:
+                debug(f"   ⏭ Skipping event sequence checks (columns not found)")
+            else:
+                sheet_events[seq_spec["name"]] = events
+                date_col = find_column(df, seq_spec["date"])
+                debug(f"      • Applying EVENT SEQUENCE → {len(events)} events")
+
+                started_seq = time.perf_counter()
+                masks = check_sequence(events, len(df))
+                shared = (time.perf_counter() - started_seq) / len(masks)  # uma ordenação para as três regras
+                for rule_name, mask in masks.items():
+                    since = mark()
+                    if not record_mask(mask, date_col, rule_name):
+                        debug(f"        ❌ {rule_name}: {int(mask.sum())} row(s)")
+                    note(rule_name, "sequence", since, shared)
+
+                earlier = sequence_config.earlier_sheets(sheet_name)
+                if earlier:
+                    since = mark()
+                    mask = check_stage_order(events, [events_for(s) for s in earlier], len(df))
+                    rule_name = f"Event dated before {' / '.join(earlier)}"
+                    if not record_mask(mask, date_col, rule_name):
+                        debug(f"        ❌ {rule_name}: {int(mask.sum())} row(s)")
+                    note(rule_name, "sequence", since)
+
+        # ---------------------------------------------------------
+        # Consistência entre arquivos (índice de trabalhadores da execução)
+        # ---------------------------------------------------------
+        if worker_index is not None and not partial:
+            if dgw_type == "HireStack":
+                indexed.add(sheet_name)
+                id_col = worker_index.hire_column(df, sheet_name)
+                if id_col is not None:
+                    worker_index.add(os.path.basename(file_path), sheet_name, df[id_col])
+                    debug(f"   🗂 Worker index: +{int(df[id_col].notna().sum())} IDs from {sheet_name}")
+            elif dgw_type == "PersonalContactInfo":
+                check_worker_consistency(worker_index, file_path, sheet_name, df, first_row, io_exec)
+
+        # ---------------------------------------------------------
+        # Finalização da aba
+        # ---------------------------------------------------------
+        # Cada expectation já foi avaliada uma vez acima (result_format COMPLETE);
+        # não há necessidade de reexecutar a suíte com ge_df.validate().
+        timed("rules", started)
         success_rate = (1 - failed / total_checks) * 100 if total_checks > 0 else 100
 
         debug(f"\n📘 Finished sheet: {sheet_name}")
@@ -336,19 +735,60 @@ def validate_dgw(file_path):
         debug(f"   ➤ Failures: {failed}")
         debug(f"   ➤ Success rate: {round(success_rate, 2)}%")
 
-        if failed:
-            df_fail = pd.DataFrame(failure_details)
+        fail_path = None
+        if failed and not sample:
             fail_path = os.path.join(
                 FAILS_DIR,
                 f"{os.path.basename(file_path)}_{sheet_name}_failures.csv"
             )
-            df_fail.to_csv(fail_path, index=False, encoding="utf-8-sig")
-            fail_html = df_fail.to_html(index=False, border=0)
+            # lista completa só em disco; o dashboard recebe o agregado por regra
+            submit_io(io_exec, failures.write_csv, fail_path, label=fail_path)
             debug(f"   ❌ Failures saved to: {fail_path}")
+
+        if annotations is not None and failed and not partial:
+            annotations[sheet_name] = failures.cells()
+
+        if history is not None and not partial:
+            scope = scope_name(dgw_type, sheet_name, os.path.basename(file_path))
+            history.add(scope, failures.hashed_keys(scope, row_key_hashes(df, row_numbers)))
+
+        if rule_stats is not None and not partial and unmapped:
+            rule_stats.add_unmapped(scope_name(dgw_type, sheet_name), unmapped)
+
+        rule_summary = []
+        if failed:
+            summary = failures.summary(top_n=FAIL_TOP_N)
+            if total_rows is not None:
+                summary = estimate_failures(summary, len(df), total_rows, SAMPLE_Z)
+            fail_html = summary.to_html(index=False, border=0)
+            rule_summary = summary.to_dict("records")
         else:
             fail_html = "<i>No validation errors found.</i>"
             debug("   ✔ No failures.")
 
+        if unmapped:
+            fail_html += (
+                f"<p><b>Columns without rules ({len(unmapped)}):</b> "
+                f"{', '.join(map(str, unmapped))}</p>"
+            )
+        if fast and failed:
+            fail_html += f"<p>⚡ Fast mode: at most {FAST_RULE_CAP} failures recorded per rule.</p>"
+        # profiling reaproveita o df e as conversões desta passada (não relê a aba)
+        started = time.perf_counter()
+        profile = profile_frame(df, parsed, FAIL_TOP_N) if PROFILE_COLUMNS and not sample else None
+        timed("profile", started)
+        if profile:
+            fail_html += (
+                f"<details><summary>📈 Column profile ({len(profile)} columns"
+                f"{', sampled rows' if total_rows is not None else ''})</summary>"
+                f"{profile_html(profile, FAIL_TOP_N)}</details>"
+            )
+        if total_rows is not None:
+            fail_html = (
+                f"<p>🎲 <b>Estimate</b> from a stratified sample of {len(df)} of ~{total_rows} rows "
+                f"(Wilson interval, z={SAMPLE_Z:g}); rows in the failure list are real file rows.</p>"
+            ) + fail_html
+
         all_results.append({
             "File": os.path.basename(file_path),
             "Sheet": sheet_name,
@@ -357,9 +797,36 @@ def validate_dgw(file_path):
             "Failed": failed,
             "Success %": round(success_rate, 2),
             "Error": "",
+            "Status": "Sampled" if total_rows is not None else "",
+            "Rows": len(df),
+            "Sampled Rows": len(df) if total_rows is not None else None,
+            "Total Rows": total_rows,
+            "Matched Columns": len(plan),
+            "Unmapped Columns": unmapped,
+            "Profile": profile,
+            "Rule Summary": rule_summary,
+            "Failures CSV": fail_path,
+            "Preview CSV": preview_path,
             "Fail HTML": fail_html
         })
 
+        file_checks += total_checks
+        file_failed += failed
+        if fast and not sample:
+            aborted = fast_abort_reason(file_checks, file_failed)
+            if aborted:
+                print(f"⏹ {os.path.basename(file_path)} aborted early after sheet {sheet_name}: {aborted}")
+                all_results[-1]["Status"] = "Aborted early"
+                all_results[-1]["Error"] = f"⏹ Aborted early: {aborted}"
+
+    if worker_index is not None and dgw_type == "HireStack":
+        # abas de contratação puladas (modo rápido) ou ilegíveis deixam o índice incompleto
+        for sheet_name in valid_sheets:
+            if sheet_name not in indexed and WorkerIndex.hire_tab(sheet_name):
+                worker_index.mark_incomplete(f"{os.path.basename(file_path)} › {sheet_name}")
+
+    if xl is not None:
+        xl.close()
     return all_results
 
 
@@ -387,35 +854,226 @@ def build_progress_bar(res):
 # =============================================================================
 # Execução principal
 # =============================================================================
-def main():
+def main(frames=None, io_exec=None, fast=False, sample=None, only=None, workers=None, annotate=None):
+    """
+    frames: {caminho do DGW: {aba: DataFrame}} vindos do transform_to_dgw
+        (pipeline completo) — esses arquivos são validados direto da memória
+    io_exec: executor de I/O compartilhado com quem chamou; se ausente, um
+        executor próprio é criado e drenado antes de main() retornar
+    fast: modo fail-fast (amostra inicial, limite de falhas por regra, aborto do arquivo)
+    sample: nº de linhas por aba no modo amostragem (None → todas as linhas)
+    only: valida só estes arquivos (nome em data/curated ou caminho) em vez da pasta toda
+    workers: processos de leitura paralela das abas (None → LOAD_WORKERS; 1 → sequencial)
+    annotate: grava em outputs/annotated uma cópia de cada DGW .xlsx com as células
+        que falharam destacadas (None → ANNOTATE_FAILURES; só na validação completa)
+    Retorna a lista de resultados por aba (a mesma que alimenta o dashboard).
+    """
+    workers = workers or LOAD_WORKERS
+    annotate = ANNOTATE_FAILURES if annotate is None else annotate
+    if io_exec is not None:
+        return run_validation(io_exec, frames, fast, sample, only, workers, annotate)
+
+    # Todas as escritas (previews, falhas, dashboard) passam pelo executor de I/O;
+    # o "with" garante o flush completo antes de main() retornar.
+    with IOExecutor() as io_exec:
+        return run_validation(io_exec, frames, fast, sample, only, workers, annotate)
+
+
+def run_validation(io_exec, frames=None, fast=False, sample=None, only=None, workers=1, annotate=False):
 
     all_results = []
+    frames = frames or {}
+    run = RunContext.local(io_exec, fast, sample, annotate)
 
     # ---------------------------------------------------------
     # Load all Excel files
     # ---------------------------------------------------------
-    for file in os.listdir(DATA_DIR):
-        if file.lower().endswith(".xlsx"):
-            path = os.path.join(DATA_DIR, file)
-            print(f"\n🔍 Validating: {file}")
-            try:
-                file_results = validate_dgw(path)
-                all_results.extend(file_results)
-            except Exception as e:
-                all_results.append({
-                    "File": file,
-                    "Sheet": "",
-                    "Type": "Error",
-                    "Total Checks": 0,
-                    "Failed": 0,
-                    "Success %": 0,
-                    "Error": str(e),
-                    "Fail HTML": ""
-                })
+    # arquivos recém-transformados podem ainda estar sendo gravados em segundo plano
+    in_memory = {os.path.basename(p): p for p in frames}
+    if only:
+        on_disk = {os.path.basename(os.path.normpath(p)): p if os.path.isabs(p) else os.path.join(DATA_DIR, p)
+                   for p in only}
+    else:
+        on_disk = {f: os.path.join(DATA_DIR, f) for f in list_sources(DATA_DIR)}
+    # HireStack primeiro: o índice de trabalhadores precisa estar completo
+    # antes das abas do PersonalContactInfo serem conferidas
+    files = sorted(set(on_disk) | set(in_memory), key=lambda f: (detect_type(f) != "HireStack", f))
+    paths = [in_memory.get(f, on_disk.get(f)) for f in files]
 
-    if not all_results:
-        print("⚠️ No .xlsx files were found in /data/")
+    results_by_file = {}
+
+    def run_file(file, path, source=None, file_frames=None):
+        print(f"\n🔍 Validating: {file}")
+        try:
+            results_by_file[file] = validate_dgw(path, run, source=source, frames=file_frames)
+        except Exception as e:
+            if run.worker_index is not None and detect_type(file) == "HireStack":
+                run.worker_index.mark_incomplete(file)
+            results_by_file[file] = [{
+                "File": file,
+                "Sheet": "",
+                "Type": "Error",
+                "Total Checks": 0,
+                "Failed": 0,
+                "Success %": 0,
+                "Error": str(e),
+                "Fail HTML": ""
+            }]
+
+    def run_sequential(group):
+        def fetch(i):
+            # lê o próximo workbook enquanto o atual é validado
+            if i >= len(group) or group[i] in in_memory or not os.path.isfile(path_of[group[i]]):
+                return None
+            return io_exec.prefetch(path_of[group[i]])
+
+        pending = fetch(0)
+        for i, file in enumerate(group):
+            source = None
+            if pending is not None:
+                try:
+                    source = pending.result()
+                except Exception as e:
+                    print(f"⚠️ Prefetch failed for {file}, reading directly: {e}")
+            pending = fetch(i + 1)
+            run_file(file, path_of[file], source=source, file_frames=frames.get(path_of[file]))
+
+    path_of = dict(zip(files, paths))
+
+    # Leitura paralela por tamanho (só validação completa de .xlsx em disco):
+    # as abas são lidas em processos e cada arquivo é validado assim que fica completo
+    scheduled = set()
+    if workers > 1 and not fast and not sample:
+        scheduled = {f for f in files if f not in in_memory and os.path.isfile(path_of[f])
+                     and f.lower().endswith(".xlsx")}
+    scheduler = SheetScheduler(workers, MEMORY_BUDGET_MB) if scheduled else None
+
+    started = time.perf_counter()
+    try:
+        # HireStack antes dos demais (índice de trabalhadores), em qualquer modo
+        for group in ([f for f in files if detect_type(f) == "HireStack"],
+                      [f for f in files if detect_type(f) != "HireStack"]):
+            if scheduler is not None:
+                batch = [path_of[f] for f in group if f in scheduled]
+                for path, file_frames, errors in scheduler.load(batch, lambda s: not s.strip().startswith(">")):
+                    for sheet, e in errors.items():
+                        print(f"❌ Error reading sheet {sheet}: {e}")
+                    run_file(os.path.basename(path), path, file_frames=file_frames)
+                    scheduler.release(path)
+            run_sequential([f for f in group if f not in scheduled])
+    finally:
+        if scheduler is not None:
+            scheduler.close()
+    run.metrics.add("validate", time.perf_counter() - started)
+
+    # ordem do dashboard independente da ordem de conclusão
+    for file in files:
+        all_results.extend(results_by_file.get(file, []))
+
+    if run.annotations:
+        started = time.perf_counter()
+        write_annotations(io_exec, run.annotations)
+        run.metrics.add("annotate", time.perf_counter() - started)
+
+    load_report = scheduler.report() if scheduler is not None else None
+    return write_dashboard(run, all_results, load_report)
+
+
+def write_annotations(io_exec, annotations):
+    """
+    Cópias anotadas dos DGW .xlsx validados: {caminho: {aba: células com falha}}.
+    Roda depois das escritas pendentes (DGWs recém-transformados são gravados em
+    segundo plano).
+    """
+    io_exec.flush()
+    for path, sheet_failures in annotations.items():
+        if not sheet_failures:
+            continue
+        file = os.path.basename(os.path.normpath(path))
+        if not (file.lower().endswith(".xlsx") and os.path.isfile(path)):
+            print(f"⚠️ {file}: annotated copies are only written for .xlsx files")
+            continue
+        out_path = annotated_path(file, ANNOTATED_DIR)
+        print(f"\n🖍 Annotating {file}...")
+        try:
+            print_report(out_path, annotate_workbook(path, out_path, sheet_failures))
+        except Exception as e:
+            print(f"❌ Could not write the annotated copy of {file}: {e}")
+
+
+def write_pdf_report(path, all_results, run_diff, previous_run, notes):
+    """PDF do relatório (reportlab importado só aqui: sem ele, só o PDF fica de fora)."""
+    try:
+        from pdf_report import build_pdf_report
+    except ImportError as e:
+        print(f"⚠️ PDF report skipped: {e} (pip install -r requirements.txt)")
         return
+    build_pdf_report(path, all_results, run_diff, previous_run, notes)
+
+
+def mark_write_failures(failed, all_results, consistency=()):
+    """
+    Escritas em segundo plano que falharam (CSV de falhas, preview) marcadas na
+    aba de origem: o dashboard mostra o problema e a execução segue.
+    """
+    errors = dict(failed)
+    for res in all_results:
+        notes = [f"💾 {os.path.basename(res[key])} not written: {errors[res[key]]}"
+                 for key in ("Failures CSV", "Preview CSV") if res.get(key) in errors]
+        if notes:
+            res["Error"] = " ".join([res["Error"]] + notes if res.get("Error") else notes)
+    for res in consistency:
+        if res.get("Failures CSV") in errors:
+            res["Status"] = f"💾 {os.path.basename(res['Failures CSV'])} not written: {errors[res['Failures CSV']]}"
+
+
+def write_dashboard(run, all_results, load_report=None):
+    """
+    Dashboard, perfil das colunas e histórico de falhas a partir dos resultados
+    por aba — de uma execução local ou dos resultados parciais dos workers.
+    run: RunContext da execução; as métricas são gravadas uma vez ao final
+    (Prometheus + JSON) e as estatísticas de regra somadas ao acumulado.
+    """
+    io_exec, worker_index, history, metrics, rule_stats = (
+        run.io_exec, run.worker_index, run.history, run.metrics, run.rule_stats)
+    sample = run.sample_size
+    started = time.perf_counter()
+    if not all_results:
+        print("⚠️ No .xlsx files or CSV/Parquet bundles were found in /data/")
+        return all_results
+
+    # CSVs por aba gravados antes do HTML, para marcar as abas cujo arquivo falhou
+    io_exec.flush()
+    mark_write_failures(io_exec.failed, all_results,
+                        worker_index.results if worker_index is not None else ())
+
+    # arquivos interrompidos pelo modo rápido (fail-fast)
+    aborted_files = sorted({r["File"] for r in all_results if r.get("Status") == "Aborted early"})
+    aborted_html = (
+        f"<p><b>⏹ Aborted early ({len(aborted_files)}):</b> {', '.join(aborted_files)}</p>"
+        if aborted_files else ""
+    )
+    if load_report:
+        aborted_html += (
+            f"<p><b>⚙️ Parallel loading:</b> {load_report['workers']} workers, "
+            f"{load_report['utilization_pct']}% utilization, {load_report['sheets']} sheets, "
+            f"{load_report['steals']} steals, peak {load_report['peak_mb']} of {load_report['budget_mb']} MB budget</p>"
+        )
+    if any(r.get("Status") == "Sampled" for r in all_results):
+        aborted_html += (
+            f"<p><b>🎲 Sampling mode:</b> up to {sample} stratified rows per sheet — "
+            f"failure counts are estimates (see Est. Failure % and CI in the details).</p>"
+        )
+
+    # novas / resolvidas / persistentes desde a execução anterior
+    run_diff = history.diff() if history is not None else None
+    if run_diff is not None and len(run_diff):
+        since = f" since {history.previous_run}" if history.previous_run else " (first run: baseline recorded)"
+        aborted_html += (
+            f"<p><b>🔁 Failures{since}:</b> "
+            f"{int(run_diff['New'].sum())} new, {int(run_diff['Resolved'].sum())} resolved, "
+            f"{int(run_diff['Persisting'].sum())} persisting</p>"
+        )
 
     # ---------------------------------------------------------
     # Detect which tabs must appear
@@ -425,6 +1083,10 @@ def main():
 
     hire_tab_html = "<div class='tab' id='hire-tab' onclick=\"showTab('hire')\">👷 HireStack</div>" if hire_exists else ""
     contact_tab_html = "<div class='tab' id='contact-tab' onclick=\"showTab('contact')\">📇 Contact Info</div>" if contact_exists else ""
+    consistency_exists = bool(worker_index.results)
+    consistency_tab_html = "<div class='tab' id='consistency-tab' onclick=\"showTab('consistency')\">🔗 Worker Consistency</div>" if consistency_exists else ""
+    diff_exists = run_diff is not None and len(run_diff) > 0
+    diff_tab_html = "<div class='tab' id='diff-tab' onclick=\"showTab('diff')\">🔁 Run Diff</div>" if diff_exists else ""
 
     # ---------------------------------------------------------
     # HTML Start
@@ -623,11 +1285,14 @@ def main():
 
         <h1>Workday DGW Validation Dashboard</h1>
         <p>Generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        {aborted_html}
 
         <div class="tabs">
             <div class="tab active" id="all-tab" onclick="showTab('all')">📊 All Files</div>
             {hire_tab_html}
             {contact_tab_html}
+            {consistency_tab_html}
+            {diff_tab_html}
         </div>
 
         <!-- ALL FILES TAB -->
@@ -785,15 +1450,168 @@ def main():
         </div>
         """
 
+    # -----------------------------
+    # Worker Consistency Tab
+    # -----------------------------
+    if consistency_exists:
+
+        consistency_rows = ""
+        for res in worker_index.results:
+            consistency_rows += f"""
+            <tr>
+                <td>{res['File']}</td>
+                <td>{res['Sheet']}</td>
+                <td>{res['Column']}</td>
+                <td>{res['Checked']}</td>
+                <td>{res['Not Found']}</td>
+                <td>{res['Sample']}</td>
+                <td>{res['Status']}</td>
+            </tr>"""
+
+        sources = ", ".join(worker_index.sources) or "—"
+        styled_html += f"""
+        <div id="consistency" class="tab-content">
+            <h3>🔗 Contact Info × HireStack</h3>
+            <p>Worker index: <b>{len(worker_index)}</b> IDs from {sources}</p>
+            <table>
+                <thead>
+                    <tr>
+                        <th>File</th><th>Sheet</th><th>Column</th><th>Worker IDs</th>
+                        <th>Not Found</th><th>Sample</th><th>Status</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {consistency_rows}
+                </tbody>
+            </table>
+        </div>
+        """
+
+    # -----------------------------
+    # Run Diff Tab
+    # -----------------------------
+    if diff_exists:
+
+        diff_rows = ""
+        for res in run_diff.to_dict("records"):
+            diff_rows += f"""
+            <tr>
+                <td>{res['Type']}</td>
+                <td>{res['File']}</td>
+                <td>{res['Sheet']}</td>
+                <td>{res['New']}</td>
+                <td>{res['Resolved']}</td>
+                <td>{res['Persisting']}</td>
+                <td>{"🆕 baseline" if res['First Run'] else ""}</td>
+            </tr>"""
+
+        previous = history.previous_run or "— (first run)"
+        styled_html += f"""
+        <div id="diff" class="tab-content">
+            <h3>🔁 Failures vs. previous run</h3>
+            <p>Previous run: <b>{previous}</b>. Failures are matched by DGW type, file, sheet, column,
+            business key (Employee ID, Worker ID… or row), rule and value.</p>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Type</th><th>File</th><th>Sheet</th><th>New</th>
+                        <th>Resolved</th><th>Persisting</th><th></th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {diff_rows}
+                </tbody>
+            </table>
+        </div>
+        """
+
     styled_html += "</body></html>"
 
+    # perfil completo das colunas (o preview guarda só 20 linhas)
+    profiles = {}
+    for res in all_results:
+        if res.get("Profile"):
+            profiles.setdefault(res["File"], {})[res["Sheet"]] = {
+                "rows": res.get("Total Rows") or res["Profile"][0]["Rows"],
+                "sampled": res.get("Status") == "Sampled",
+                "columns": res["Profile"],
+            }
+    if profiles:
+        io_exec.submit(write_text, PROFILE_FILE, json.dumps(profiles, ensure_ascii=False, indent=1, default=str),
+                       label=PROFILE_FILE)
+    if history is not None:
+        io_exec.submit(history.save, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), label="failure history")
+    if rule_stats is not None:
+        io_exec.submit(rule_stats.save, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), label="rule stats")
+
     # SAVE HTML
     html_path = os.path.join(OUTPUT_DIR, "validation_dashboard.html")
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(styled_html)
+    io_exec.submit(write_text, html_path, styled_html, label=html_path)
+    if PDF_REPORT:
+        notes = [n for n in (
+            f"Aborted early: {', '.join(aborted_files)}" if aborted_files else "",
+            f"Sampling mode: up to {sample} rows per sheet; failure counts are estimates." if sample else "",
+        ) if n]
+        io_exec.submit(write_pdf_report, PDF_REPORT_FILE, all_results, run_diff,
+                       history.previous_run if history is not None else None, notes, label=PDF_REPORT_FILE)
+    # uma saída que falhou fica de fora do resumo; métricas e o restante seguem
+    failed = {label for label, _ in io_exec.flush()}
+    if metrics is not None:
+        metrics.add("dashboard", time.perf_counter() - started)
+        try:
+            metrics.flush(all_results, METRICS_FILE, METRICS_JSON)
+        except OSError as e:
+            print(f"⚠️ Could not write run metrics: {e}")
+            metrics = None
+
+    if load_report:
+        print(f"\n⚙️ Parallel loading: {load_report['workers']} workers, {load_report['utilization_pct']}% utilization, "
+              f"{load_report['sheets']} sheets in {load_report['wall_s']}s, {load_report['steals']} steals, "
+              f"peak {load_report['peak_mb']}/{load_report['budget_mb']} MB, {load_report['budget_waits']} budget waits")
+        for w in load_report["per_worker"]:
+            print(f"   • worker {w['worker']}: {w['sheets']} sheets, busy {w['busy_s']}s, {w['steals']} stolen")
+
+    if diff_exists:
+        print(f"🔁 Since previous run: {int(run_diff['New'].sum())} new, "
+              f"{int(run_diff['Resolved'].sum())} resolved, {int(run_diff['Persisting'].sum())} persisting")
+
+    if aborted_files:
+        print(f"\n⏹ Aborted early ({len(aborted_files)}): {', '.join(aborted_files)}")
 
     print("\n✅ Validation completed!")
-    print(f"📊 Dashboard saved to: {html_path}")
+    if html_path not in failed:
+        print(f"📊 Dashboard saved to: {html_path}")
+    if PDF_REPORT and PDF_REPORT_FILE not in failed and os.path.exists(PDF_REPORT_FILE):
+        print(f"🧾 PDF report saved to: {PDF_REPORT_FILE}")
+    if profiles and PROFILE_FILE not in failed:
+        print(f"📈 Column profile saved to: {PROFILE_FILE}")
+    if metrics is not None:
+        print(f"📏 Metrics saved to: {METRICS_FILE}")
+    if rule_stats is not None and "rule stats" not in failed:
+        print(f"📐 Rule stats updated: {os.path.join(rule_stats.directory, STATS_FILE)} "
+              f"(report: python scripts/rule_stats.py)")
+    return all_results
 
 if __name__ == "__main__":
-    main()
+    args = sys.argv[1:]
+    # --sample usa SAMPLE_ROWS; --sample=5000 define o tamanho da amostra
+    sample = next((int(a.split("=", 1)[1]) if "=" in a else SAMPLE_ROWS
+                   for a in args if a.startswith("--sample")), None)
+    workers = next((int(a.split("=", 1)[1]) for a in args if a.startswith("--workers=")), None)
+
+    # modo distribuído: --coordinator[=pasta] [--local-workers=N] | --worker[=pasta]
+    def queue_dir(flag):
+        value = next((a for a in args if a == flag or a.startswith(flag + "=")), None)
+        if value is None:
+            return None
+        return value.split("=", 1)[1] if "=" in value else QUEUE_DIR
+
+    if queue_dir("--worker"):
+        from distributed_validation import work
+        work(queue_dir("--worker"))
+    elif queue_dir("--coordinator"):
+        from distributed_validation import coordinate
+        local = next((int(a.split("=", 1)[1]) for a in args if a.startswith("--local-workers=")), 0)
+        coordinate(queue_dir("--coordinator"), local_workers=local)
+    else:
+        main(fast="--fast" in args, sample=sample, workers=workers, annotate="--annotate" in args or None)
@@ -0,0 +1,261 @@
+import queue
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from input_formats import open_source
+from row_sampling import xlsx_sheet_parts
+
+# bytes de memória estimados por byte de XML descompactado da aba
+# (conservador: o DataFrame final é bem menor que o XML, mas o parse tem picos)
+MEMORY_FACTOR = 1.0
+
+# workbooks mantidos abertos por processo (abrir um .xlsx custa segundos:
+# estilos, sharedStrings e validações são lidos a cada abertura)
+OPEN_BOOKS_PER_WORKER = 2
+
+
+# =============================================================================
+# Estimativa de custo (sem parsear o workbook)
+# =============================================================================
+def xlsx_costs(path):
+    """
+    Custos de um .xlsx lidos só do índice do zip:
+    - {aba: bytes do XML descompactado da aba}
+    - custo de abertura: demais partes (estilos, sharedStrings, workbook...),
+      pago por todo processo que abrir o arquivo
+    """
+    with zipfile.ZipFile(path) as zf:
+        parts = xlsx_sheet_parts(zf)
+        sizes = {info.filename: info.file_size for info in zf.infolist()}
+    sheet_parts = set(parts.values())
+    sheets = {sheet: sizes.get(part, 0) for sheet, part in parts.items()}
+    open_cost = sum(size for name, size in sizes.items() if name not in sheet_parts)
+    return sheets, open_cost
+
+
+# =============================================================================
+# Tarefa executada nos processos de leitura
+# =============================================================================
+_BOOKS = {}
+
+
+def cached_source(path, snapshots=False):
+    """
+    Workbook/pacote aberto neste processo, reaproveitado entre tarefas do mesmo arquivo.
+    snapshots: ver open_source (usado pelo transform_to_dgw nos arquivos de data/incoming).
+    """
+    xl = _BOOKS.pop(path, None)
+    if xl is None:
+        xl = open_source(path, snapshots=snapshots)
+        while len(_BOOKS) >= OPEN_BOOKS_PER_WORKER:
+            _BOOKS.pop(next(iter(_BOOKS))).close()
+    _BOOKS[path] = xl  # reinsere no fim: os mais antigos saem primeiro
+    return xl
+
+
+def read_sheet_task(path, sheet, header, **kwargs):
+    """Lê uma aba reaproveitando o workbook já aberto neste processo."""
+    return cached_source(path).read_sheet(sheet, header=header, **kwargs)
+
+
+class SheetTask:
+    __slots__ = ("path", "sheet", "cost", "memory")
+
+    def __init__(self, path, sheet, cost):
+        self.path = path
+        self.sheet = sheet
+        self.cost = cost
+        self.memory = int(cost * MEMORY_FACTOR)
+
+
+class _Slot:
+    """Um processo de leitura com a sua fila própria de abas (afinidade de workbook)."""
+
+    def __init__(self, index):
+        self.index = index
+        self.tasks = deque()
+        self.executor = ProcessPoolExecutor(max_workers=1)
+        self.opened = set()
+        self.busy = 0.0
+        self.done = 0
+        self.steals = 0
+
+    def remaining(self):
+        return sum(t.cost for t in self.tasks)
+
+
+# =============================================================================
+# Escalonador por tamanho
+# =============================================================================
+class SheetScheduler:
+    """
+    Lê as abas de vários .xlsx em processos paralelos, guiado pelo tamanho do XML:
+    - arquivos distribuídos do maior para o menor, cada um para o processo com
+      menos trabalho atribuído (as abas de um arquivo ficam juntas: ele é aberto
+      uma vez só)
+    - processo ocioso rouba abas (do fim da fila) de quem tem mais trabalho
+      pendente, se o que resta compensa abrir o workbook de novo
+    - orçamento de memória: uma aba só começa se couber no orçamento; abas de
+      arquivos já iniciados sempre podem terminar (senão a fila poderia travar).
+      A memória de um arquivo só é liberada com release(), depois da validação.
+    """
+
+    def __init__(self, workers, memory_budget_mb, header=5):
+        self.header = header
+        self.budget = int(memory_budget_mb * 1024 * 1024)
+        self.slots = [_Slot(i) for i in range(max(1, workers))]
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._reserved = {}   # arquivo → memória reservada
+        self._started = set()
+        self.peak = 0
+        self.budget_waits = 0
+        self.wall = 0.0
+        self.sheets = 0
+
+    # ---------------------------------------------------------
+    # Memória
+    # ---------------------------------------------------------
+    def _acquire(self, task):
+        with self._cond:
+            while (self._in_use and task.path not in self._started
+                   and self._in_use + task.memory > self.budget):
+                self.budget_waits += 1
+                self._cond.wait()
+            self._started.add(task.path)
+            self._in_use += task.memory
+            self._reserved[task.path] = self._reserved.get(task.path, 0) + task.memory
+            self.peak = max(self.peak, self._in_use)
+
+    def release(self, path):
+        """Libera a memória reservada para o arquivo (frames já validados)."""
+        with self._cond:
+            self._in_use -= self._reserved.pop(path, 0)
+            self._started.discard(path)
+            self._cond.notify_all()
+
+    # ---------------------------------------------------------
+    # Distribuição e roubo de trabalho
+    # ---------------------------------------------------------
+    def _assign(self, books):
+        """books: [(caminho, {aba: custo}, custo de abertura)], maiores primeiro."""
+        self._open_cost = {}
+        for path, sheets, open_cost in sorted(books, key=lambda b: -sum(b[1].values())):
+            self._open_cost[path] = open_cost
+            slot = min(self.slots, key=lambda s: s.remaining())
+            for sheet, cost in sorted(sheets.items(), key=lambda kv: -kv[1]):
+                slot.tasks.append(SheetTask(path, sheet, cost))
+
+    def _next_task(self, slot):
+        with self._cond:
+            if slot.tasks:
+                return slot.tasks.popleft()
+            victims = sorted((s for s in self.slots if s is not slot and s.tasks),
+                             key=lambda s: -s.remaining())
+            for victim in victims:
+                task = victim.tasks[-1]
+                # reabrir o workbook só compensa se a vítima ainda tem mais trabalho que isso
+                if task.path in slot.opened or victim.remaining() > self._open_cost.get(task.path, 0):
+                    slot.steals += 1
+                    return victim.tasks.pop()
+            return None
+
+    def _work(self, slot, results):
+        while True:
+            task = self._next_task(slot)
+            if task is None:
+                return
+            self._acquire(task)
+            start = time.time()
+            try:
+                df = slot.executor.submit(read_sheet_task, task.path, task.sheet, self.header).result()
+                error = None
+            except Exception as e:
+                df, error = None, e
+            slot.busy += time.time() - start
+            slot.done += 1
+            slot.opened.add(task.path)
+            results.put((task, df, error))
+
+    # ---------------------------------------------------------
+    # Execução
+    # ---------------------------------------------------------
+    def load(self, paths, sheet_filter=None):
+        """
+        Gera (caminho, {aba: DataFrame}, {aba: erro}) à medida que cada arquivo
+        fica completo — na ordem de conclusão, não na ordem de entrada.
+        sheet_filter: função nome da aba → bool (ex.: ignorar abas ">").
+        """
+        books = []
+        for path in paths:
+            sheets, open_cost = xlsx_costs(path)
+            if sheet_filter:
+                sheets = {s: c for s, c in sheets.items() if sheet_filter(s)}
+            books.append((path, sheets, open_cost))
+        self._assign(books)
+
+        pending = {path: len(sheets) for path, sheets, _ in books}
+        order = {path: list(sheets) for path, sheets, _ in books}
+        frames = {path: {} for path in pending}
+        errors = {path: {} for path in pending}
+        for path in [p for p, n in pending.items() if n == 0]:
+            del pending[path]
+            yield path, {}, {}
+
+        results = queue.Queue()
+        start = time.time()
+        threads = [threading.Thread(target=self._work, args=(slot, results), daemon=True)
+                   for slot in self.slots]
+        for t in threads:
+            t.start()
+
+        while pending:
+            task, df, error = results.get()
+            self.sheets += 1
+            if error is None:
+                frames[task.path][task.sheet] = df
+            else:
+                errors[task.path][task.sheet] = error
+            pending[task.path] -= 1
+            if not pending[task.path]:
+                del pending[task.path]
+                # abas na ordem do workbook (o dashboard segue essa ordem)
+                loaded = {s: frames[task.path][s] for s in order[task.path] if s in frames[task.path]}
+                yield task.path, loaded, errors.pop(task.path)
+                frames.pop(task.path)
+
+        for t in threads:
+            t.join()
+        self.wall += time.time() - start
+
+    def report(self):
+        """Utilização dos processos de leitura e uso do orçamento de memória."""
+        capacity = self.wall * len(self.slots)
+        return {
+            "workers": len(self.slots),
+            "sheets": self.sheets,
+            "wall_s": round(self.wall, 2),
+            "utilization_pct": round(sum(s.busy for s in self.slots) / capacity * 100, 1) if capacity else 0.0,
+            "steals": sum(s.steals for s in self.slots),
+            "peak_mb": round(self.peak / 1024 / 1024, 1),
+            "budget_mb": round(self.budget / 1024 / 1024, 1),
+            "budget_waits": self.budget_waits,
+            "per_worker": [
+                {"worker": s.index, "sheets": s.done, "busy_s": round(s.busy, 2), "steals": s.steals}
+                for s in self.slots
+            ],
+        }
+
+    def close(self):
+        for slot in self.slots:
+            slot.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,82 @@
+import numpy as np
+
+from reference_sets import ReferenceSet, as_keys
+from rule_expressions import find_column
+from rule_index import normalize_header
+
+# abas de contratação do HireStack → coluna com o ID do trabalhador
+HIRE_TABS = {
+    "Hire Employee": "Employee ID",
+    "Contract Contingent Worker": "Contingent Worker ID",
+}
+
+# coluna das abas do PersonalContactInfo que referencia o trabalhador
+CONTACT_COLUMN = "Worker ID"
+
+NOT_HIRED = "Worker ID not found in HireStack hire tabs"
+
+
+# =============================================================================
+# Índice de trabalhadores da execução
+# =============================================================================
+class WorkerIndex:
+    """
+    IDs de todos os trabalhadores contratados nos HireStack da execução
+    (Employee ID + Contingent Worker ID). É alimentado enquanto os HireStack são
+    validados e consultado depois pelas abas do PersonalContactInfo, com o mesmo
+    lookup hash vetorizado das listas de referência (ReferenceSet).
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._ref = None
+        self.sources = []     # "arquivo › aba" que alimentaram o índice
+        self.incomplete = []  # abas de contratação que ficaram de fora (aborto, erro de leitura)
+        self.results = []     # uma linha por aba de contato verificada
+
+    def __len__(self):
+        return len(self.reference()) if self._parts else 0
+
+    @staticmethod
+    def hire_tab(sheet_name):
+        """Coluna de ID esperada se a aba for uma aba de contratação, senão None."""
+        key = normalize_header(sheet_name)
+        return next((column for tab, column in HIRE_TABS.items() if normalize_header(tab) == key), None)
+
+    @staticmethod
+    def hire_column(df, sheet_name):
+        """Coluna de ID se a aba for uma aba de contratação, senão None."""
+        column = WorkerIndex.hire_tab(sheet_name)
+        return find_column(df, column) if column else None
+
+    def add(self, file_name, sheet_name, series):
+        self._parts.append(as_keys(series.dropna()))
+        self.sources.append(f"{file_name} › {sheet_name}")
+        self._ref = None
+
+    def mark_incomplete(self, source):
+        """Aba (ou arquivo) de contratação que não entrou no índice: a conferência fica suspensa."""
+        self.incomplete.append(source)
+
+    def merge(self, other):
+        """Junta o índice (e as conferências) de outro processo — modo distribuído."""
+        self._parts.extend(other._parts)
+        self.sources.extend(other.sources)
+        self.incomplete.extend(other.incomplete)
+        self.results.extend(other.results)
+        self._ref = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ref"] = None  # refeito sob demanda; não precisa ir para o disco
+        return state
+
+    def reference(self):
+        if self._ref is None:
+            values = np.concatenate(self._parts) if self._parts else np.array([], dtype=object)
+            self._ref = ReferenceSet("run", "Worker ID", values[values != ""])
+        return self._ref
+
+    def missing_mask(self, series):
+        """Máscara dos Worker IDs preenchidos que não existem no índice."""
+        return self.reference().missing_mask(series)
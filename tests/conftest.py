@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# os módulos de scripts/ importam uns aos outros pelo nome (como quando rodados direto)
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+def write_dgw(path, sheets):
+    """Workbook no layout DGW: cabeçalho na linha 6, dados a partir da linha 7."""
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, startrow=5, index=False)
+
+
+@pytest.fixture
+def validation_env(tmp_path, monkeypatch):
+    """
+    validate_all apontando para pastas temporárias (dados, saídas, histórico e
+    métricas), sem template DGW e sem PDF. Devolve a pasta data/curated vazia.
+    """
+    import template_rules
+    import validate_all as va
+
+    data = tmp_path / "curated"
+    out = tmp_path / "outputs"
+    for folder in (data, out / "previews", out / "failures"):
+        folder.mkdir(parents=True)
+    paths = {
+        "DATA_DIR": data,
+        "OUTPUT_DIR": out,
+        "PREVIEW_DIR": out / "previews",
+        "FAILS_DIR": out / "failures",
+        "PROFILE_FILE": out / "column_profile.json",
+        "HISTORY_DIR": out / "history",
+        "PDF_REPORT_FILE": out / "validation_report.pdf",
+        "METRICS_FILE": out / "metrics" / "dgw_validation.prom",
+        "METRICS_JSON": out / "metrics" / "dgw_validation.json",
+    }
+    for name, value in paths.items():
+        monkeypatch.setattr(va, name, str(value))
+    monkeypatch.setattr(va, "DEBUG_MODE", False)
+    monkeypatch.setattr(va, "PDF_REPORT", False)
+    monkeypatch.setattr(template_rules, "TEMPLATES_DIR", str(tmp_path / "no_templates"))
+    return data
@@ -0,0 +1,60 @@
+import alias_suggest
+from alias_suggest import AliasMatcher, _tokens, get_alias_matcher
+
+TARGETS = {
+    "Employee ID": ["Emp ID", "Worker Number"],
+    "Hire Date": ["Start Date", "Data de Admissão"],
+    "Address Line 1": ["Endereço"],
+    "Job Function": "Função",
+    "Unnamed: 7": [],
+}
+
+
+def test_tokens_keep_accented_letters():
+    assert _tokens("Endereço  Residencial") == ["endereco", "residencial"]
+    assert _tokens("FUNÇÃO") == ["funcao"]
+    assert _tokens("Data de Admissão (BR)") == ["data", "de", "admissao", "br"]
+
+
+def test_accented_and_plain_headers_match_the_same_alias():
+    matcher = AliasMatcher(TARGETS)
+    assert matcher.suggest("Endereco")[0] == ("Address Line 1", "Endereço", 1.0)
+    assert matcher.suggest("funcao")[0] == ("Job Function", "Função", 1.0)
+    assert matcher.suggest("Data Admissao")[0][:2] == ("Hire Date", "Data de Admissão")
+
+
+def test_ranking_one_entry_per_target_best_alias_first():
+    matcher = AliasMatcher(TARGETS)
+    ranked = matcher.suggest("Employee Number", top_k=3, min_score=0.3)
+    targets = [target for target, _, _ in ranked]
+    assert targets[0] == "Employee ID" and len(targets) == len(set(targets))
+    scores = [score for _, _, score in ranked]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_candidates_top_k_and_min_score():
+    matcher = AliasMatcher(TARGETS)
+    assert matcher.suggest("Start Dt", candidates={"Employee ID"}) == []
+    assert [t for t, _, _ in matcher.suggest("Start Dt", candidates={"Hire Date"})] == ["Hire Date"]
+    assert len(matcher.suggest("Date", top_k=1, min_score=0.0)) == 1
+    assert matcher.suggest("Zzz Qqq") == []
+    assert AliasMatcher({}).suggest("Employee ID") == []
+
+
+def test_blank_template_headers_are_not_suggested():
+    matcher = AliasMatcher(TARGETS)
+    assert all(target != "Unnamed: 7" for target, _, _ in matcher.suggest("Unnamed: 7", min_score=0.0))
+
+
+def test_matcher_cache_builds_once_per_key(monkeypatch):
+    monkeypatch.setattr(alias_suggest, "_CACHE", {})
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return TARGETS
+
+    first = get_alias_matcher(("tmpl.xlsx", 1), factory)
+    assert get_alias_matcher(("tmpl.xlsx", 1), factory) is first
+    assert get_alias_matcher(("tmpl.xlsx", 2), factory) is not first
+    assert len(calls) == 2
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from column_profile import HLL_PRECISION, hll_distinct
+
+# erro padrão do HyperLogLog: 1,04 / √m
+STD_ERROR = 1.04 / np.sqrt(1 << HLL_PRECISION)
+
+
+def test_hll_distinct_empty():
+    assert hll_distinct([]) == 0
+
+
+@pytest.mark.parametrize("distinct", [1, 50, 1_000, 20_000, 200_000])
+def test_hll_distinct_within_error_bounds(distinct):
+    # cada valor repetido: a estimativa não pode depender das repetições
+    values = np.repeat(np.array([f"W{i:07d}" for i in range(distinct)], dtype=object), 2)
+    estimate = hll_distinct(values)
+    assert abs(estimate - distinct) <= max(1, 4 * STD_ERROR * distinct)
+
+
+def test_hll_distinct_mixed_types_hash_as_text():
+    assert hll_distinct([1, "1", 1.5, "1.5", None]) == hll_distinct(["1", "1.5", "None"])
@@ -0,0 +1,30 @@
+import os
+
+import dgw_client
+import dgw_server
+import validate_all
+
+
+def test_missing_file_is_rejected_before_validation(validation_env, monkeypatch):
+    def fail(**kwargs):
+        raise AssertionError("validate_all.main must not run for a missing file")
+
+    monkeypatch.setattr(validate_all, "main", fail)
+    reply = dgw_server.run_validate({"files": ["data/curated/nope.xlsx"]})
+    assert "data/curated/nope.xlsx" in reply["error"]
+
+
+def test_relative_names_resolve_against_data_dir(validation_env, monkeypatch):
+    (validation_env / "HireStack.xlsx").write_bytes(b"")
+    seen = {}
+    monkeypatch.setattr(validate_all, "main", lambda **kw: seen.update(kw) or [])
+    reply = dgw_server.run_validate({"files": ["HireStack.xlsx"]})
+    assert "error" not in reply
+    assert seen["only"] == ["HireStack.xlsx"]
+
+
+def test_client_sends_absolute_paths_for_local_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "local.xlsx").write_bytes(b"")
+    assert dgw_client.local_path("local.xlsx") == os.path.join(str(tmp_path), "local.xlsx")
+    assert dgw_client.local_path("HireStack.xlsx") == "HireStack.xlsx"
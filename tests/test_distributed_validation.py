@@ -0,0 +1,60 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import distributed_validation as dv
+import validate_all as va
+from conftest import write_dgw
+
+
+def _hire_stack(ids, missing_location):
+    hires = pd.DataFrame({
+        "Employee ID": ids,
+        "Hire Date": pd.to_datetime(["2024-01-10"] * len(ids)),
+        "Location Reference ID": [None if i in missing_location else "LOC-1" for i in ids],
+    })
+    changes = pd.DataFrame({
+        "Employee ID": ids[:2] + ["E999"],
+        "Effective Date": pd.to_datetime(["2024-03-01", "2023-12-01", "2024-03-01"]),
+    })
+    return {"Hire Employee": hires, "Job Changes": changes}
+
+
+def _summary(results):
+    return sorted((r["File"], r["Sheet"], r["Total Checks"], r["Failed"]) for r in results)
+
+
+def _history(directory):
+    with open(os.path.join(directory, "failure_keys.json"), encoding="utf-8") as f:
+        scopes = json.load(f)["scopes"]
+    return scopes, np.load(os.path.join(directory, "failure_keys.npy"))
+
+
+def _rule_counts(directory):
+    with open(os.path.join(directory, "rule_stats.json"), encoding="utf-8") as f:
+        rules = json.load(f)["rules"]
+    return {r: (s["sheets"], s["executions"], s["failures"]) for r, s in rules.items()}
+
+
+def test_local_workers_match_local_run(validation_env, tmp_path, monkeypatch):
+    write_dgw(validation_env / "BR_HCM_03_HireStack_DGW_ready.xlsx", _hire_stack(["B1", "B2", "B3"], {"B2"}))
+    write_dgw(validation_env / "US_HCM_03_HireStack_DGW_ready.xlsx", _hire_stack(["U1", "U2"], {"U1", "U2"}))
+    write_dgw(validation_env / "A_HCM_02_PersonalContactInfo_DGW_ready.xlsx",
+              {"Email Address": pd.DataFrame({"Worker ID": ["B1", "U2", "X9"]})})
+
+    local = va.main()
+    local_dir = va.HISTORY_DIR
+
+    monkeypatch.setattr(va, "HISTORY_DIR", str(tmp_path / "history_distributed"))
+    distributed = dv.coordinate(str(tmp_path / "queue"), local_workers=2)
+
+    assert _summary(local) and _summary(distributed) == _summary(local)
+    assert any(r["Failed"] for r in local)
+
+    local_scopes, local_keys = _history(local_dir)
+    dist_scopes, dist_keys = _history(va.HISTORY_DIR)
+    assert dist_scopes == local_scopes
+    np.testing.assert_array_equal(dist_keys, local_keys)
+    assert _rule_counts(va.HISTORY_DIR) == _rule_counts(local_dir)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from event_sequence import DUPLICATE, OUT_OF_ORDER, SEQUENCE_GAP, check_sequence, check_stage_order, event_frame
+
+JOB_CHANGES = {"key": "Employee ID", "date": "Effective Date", "sequence": "Effective Sequence"}
+
+
+def _rows(masks):
+    return {rule: np.flatnonzero(mask).tolist() for rule, mask in masks.items()}
+
+
+def test_check_sequence_flags_duplicates_gaps_and_order():
+    df = pd.DataFrame({
+        "Employee ID": ["E1", "E1", "E1", "E2", "E2", "E3", None, " E1"],
+        "Effective Date": ["2024-01-01", "2024-01-01", "2024-01-01", "2024-05-01", "2024-02-01",
+                           None, "2024-01-01", "2024-03-01"],
+        "Effective Sequence": [1, 1, 3, 1, 1, 1, 1, None],
+    })
+    events = event_frame(df, JOB_CHANGES)
+    assert events["pos"].tolist() == [0, 1, 2, 3, 4, 7]  # sem trabalhador ou data ficam de fora
+
+    assert _rows(check_sequence(events, len(df))) == {
+        DUPLICATE: [1],
+        SEQUENCE_GAP: [2],
+        OUT_OF_ORDER: [3],  # maio listado antes de fevereiro para E2
+    }
+
+
+def test_check_sequence_without_sequence_column():
+    df = pd.DataFrame({"Employee ID": ["E1", "E1", "E2"], "Hire Date": ["2024-01-01"] * 3})
+    events = event_frame(df, {"key": "Employee ID", "date": "Hire Date"})
+    assert _rows(check_sequence(events, len(df))) == {DUPLICATE: [1], SEQUENCE_GAP: [], OUT_OF_ORDER: []}
+
+
+def test_check_sequence_small_inputs():
+    empty = event_frame(pd.DataFrame({"Employee ID": [], "Hire Date": []}), {"key": "Employee ID", "date": "Hire Date"})
+    assert _rows(check_sequence(empty, 0)) == {DUPLICATE: [], SEQUENCE_GAP: [], OUT_OF_ORDER: []}
+    assert event_frame(pd.DataFrame({"Worker": ["E1"]}), JOB_CHANGES) is None
+
+
+def test_check_stage_order_against_earlier_sheets():
+    hires = event_frame(pd.DataFrame({"Employee ID": ["E1", "E2"], "Hire Date": ["2024-02-01", "2024-01-01"]}),
+                        {"key": "Employee ID", "date": "Hire Date"})
+    changes = pd.DataFrame({
+        "Employee ID": ["E1", "E1", "E2", "E9"],
+        "Effective Date": ["2024-01-15", "2024-02-01", "2023-12-31", "2020-01-01"],
+    })
+    events = event_frame(changes, {"key": "Employee ID", "date": "Effective Date"})
+    mask = check_stage_order(events, [hires, None], len(changes))
+    assert np.flatnonzero(mask).tolist() == [0, 2]
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+
+from failure_annotation import FAIL_FILL, annotate_workbook
+from failure_store import FailureStore
+
+HEADER_FILL = PatternFill("solid", fgColor="DDEBF7")
+
+
+def _workbook(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Hire Employee"
+    ws["A1"] = "Hire Employee"
+    ws["A1"].font = Font(bold=True, size=14)
+    ws["A5"], ws["B5"], ws["C5"] = "Required", "Required", "Optional"
+    for col, header in enumerate(["Employee ID", "Hire Date", "Email"], start=1):
+        cell = ws.cell(row=6, column=col, value=header)
+        cell.font, cell.fill = Font(bold=True), HEADER_FILL
+    rows = [
+        ("E1", datetime(2024, 1, 10), "e1@x.com"),
+        ("E2", "10/01/2024", "e2@x.com"),
+        (None, datetime(2024, 2, 1), "e3@x.com"),
+        ("E4", datetime(2024, 3, 1)),  # Email vazio, depois da última célula da linha
+    ]
+    for r, values in enumerate(rows, start=7):
+        for c, value in enumerate(values, start=1):
+            cell = ws.cell(row=r, column=c, value=value)
+            if isinstance(value, datetime):
+                cell.number_format = "yyyy-mm-dd"
+    ws["A7"].font = Font(italic=True, color="FF0000")
+    other = wb.create_sheet("Job Changes")
+    other["A6"], other["A7"] = "Employee ID", "E1"
+    wb.save(path)
+
+
+def _style(cell):
+    # StyleProxy não compara com outro proxy; a representação cobre todos os atributos
+    return tuple(repr(getattr(cell, attr)) for attr in ("font", "fill", "border", "alignment", "protection")) + (
+        cell.number_format,)
+
+
+def _failures():
+    store = FailureStore()
+    store.add("Employee ID", "Not null", [9], [None])
+    store.add("Employee ID", "Unique", [9], [None])
+    store.add("Hire Date", "Date format", [8], ["10/01/2024"])
+    store.add("Email", "Not null", [10], [None])
+    store.add("Ghost Column", "Not null", [7], [None])
+    return store.cells()
+
+
+def test_only_failing_cells_are_marked(tmp_path):
+    src_path, out_path = tmp_path / "dgw.xlsx", tmp_path / "annotated" / "dgw_annotated.xlsx"
+    _workbook(src_path)
+
+    report = annotate_workbook(str(src_path), str(out_path), {"Hire Employee": _failures()})
+    assert report == {"Hire Employee": (3, 1)}
+
+    expected = {
+        "A9": "Failed: Not null\nUnique",
+        "B8": "Failed: Date format",
+        "C10": "Failed: Not null",
+    }
+    src, out = load_workbook(src_path), load_workbook(out_path)
+    assert out.sheetnames == src.sheetnames
+    for name in src.sheetnames:
+        src_ws, out_ws = src[name], out[name]
+        assert out_ws.max_row == src_ws.max_row
+        for row in out_ws.iter_rows(min_row=1, max_row=src_ws.max_row, max_col=max(3, src_ws.max_column)):
+            for cell in row:
+                original = src_ws[cell.coordinate]
+                assert cell.value == original.value, cell.coordinate
+                text = expected.get(cell.coordinate) if name == "Hire Employee" else None
+                if text is not None:
+                    assert cell.fill.fgColor.rgb.endswith(FAIL_FILL.fgColor.rgb[-6:])
+                    assert cell.comment.text == text
+                    continue
+                assert cell.comment is None, cell.coordinate
+                assert _style(cell) == _style(original), cell.coordinate
+    assert out["Hire Employee"].freeze_panes == "A7"
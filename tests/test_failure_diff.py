@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from failure_diff import FailureHistory, row_key_hashes, scope_name
+
+BR = scope_name("HireStack", "Hire Employee ", "BR_HCM_03_HireStack_DGW_ready.xlsx")
+US = scope_name("HireStack", "Hire Employee", "US_HCM_03_HireStack_DGW_ready.xlsx")
+
+
+def _keys(*values):
+    return np.array(values, dtype=np.uint64)
+
+
+def _diff(history):
+    return history.diff().set_index(["File", "Sheet"])[["New", "Resolved", "Persisting", "First Run"]]
+
+
+def test_scope_separates_files_of_the_same_type():
+    assert BR != US
+    assert BR.split("|") == ["HireStack", "BR_HCM_03_HireStack_DGW_ready", "Hire Employee"]
+
+
+def test_first_run_then_diff_after_save(tmp_path):
+    first = FailureHistory(str(tmp_path))
+    first.add(BR, _keys(3, 1, 2, 2))
+    assert _diff(first).loc[("BR_HCM_03_HireStack_DGW_ready", "Hire Employee")].tolist() == [3, 0, 0, True]
+    first.save("2026-01-01 10:00:00")
+
+    second = FailureHistory(str(tmp_path))
+    assert second.previous_run == "2026-01-01 10:00:00"
+    second.add(BR, _keys(2, 3, 9))
+    assert _diff(second).loc[("BR_HCM_03_HireStack_DGW_ready", "Hire Employee")].tolist() == [1, 1, 2, False]
+
+
+def test_partial_run_keeps_other_files(tmp_path):
+    full = FailureHistory(str(tmp_path))
+    full.add(BR, _keys(1, 2))
+    full.add(US, _keys(5))
+    full.save("run 1")
+
+    partial = FailureHistory(str(tmp_path))
+    partial.add(US, _keys(5, 6))
+    partial.save("run 2")
+
+    again = FailureHistory(str(tmp_path))
+    again.add(BR, _keys(1, 2))
+    again.add(US, _keys(5, 6))
+    diff = _diff(again)
+    assert diff["New"].sum() == 0 and diff["Resolved"].sum() == 0 and diff["Persisting"].sum() == 4
+
+
+def test_merge_collects_worker_keys(tmp_path):
+    worker = FailureHistory()
+    worker.add(BR, _keys(4, 1))
+    coordinator = FailureHistory(str(tmp_path))
+    coordinator.add(BR, _keys(1))
+    coordinator.merge(worker)
+    assert _diff(coordinator)["New"].tolist() == [2]
+
+
+def test_history_from_older_format_is_ignored(tmp_path):
+    np.save(tmp_path / "failure_keys.npy", _keys(1))
+    (tmp_path / "failure_keys.json").write_text(
+        json.dumps({"generated_at": "old", "scopes": {"HireStack|Hire Employee": [0, 1]}}), encoding="utf-8")
+    history = FailureHistory(str(tmp_path))
+    assert history.previous_run is None
+    history.add(BR, _keys(1))
+    assert bool(_diff(history)["First Run"].iloc[0])
+
+
+def test_row_keys_use_business_key_then_file_row():
+    df = pd.DataFrame({"Employee ID": ["E1", None, " E1 "], "Name": ["a", "b", "c"]})
+    lookup = row_key_hashes(df, np.array([7, 8, 9]))
+    e1, row8, e1_spaced = lookup([7, 8, 9])
+    assert e1 == e1_spaced and e1 != row8
+
+    moved = row_key_hashes(df.iloc[[1]].reset_index(drop=True), np.array([20]))
+    assert moved([20])[0] != row8  # sem chave: identifica pela linha do arquivo
+
+    no_key = row_key_hashes(pd.DataFrame({"Name": ["a", "b"]}), np.array([7, 8]))
+    assert no_key([8])[0] == row8
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from failure_store import FailureStore
+
+
+def _store():
+    store = FailureStore()
+    store.add("Country", "expect_column_values_to_be_in_set", [7, 8, 9, 12], ["XX", "YY", "XX", "XX"])
+    store.add("Hire Date", "expect_column_values_to_not_be_null", [10, 11], [None, np.nan])
+    store.add("Country", "expect_column_values_to_be_in_set", [20, 21], ["YY", 1])
+    store.add("Country", "expect_column_values_to_match_regex", [30], ["br"])
+    store.add("Ignored", "rule", [], [])
+    return store
+
+
+def test_summary_aggregates_by_column_and_rule():
+    summary = _store().summary().set_index(["Column", "Rule"])
+    assert len(summary) == 3
+
+    in_set = summary.loc[("Country", "expect_column_values_to_be_in_set")]
+    assert in_set["Failures"] == 6
+    assert in_set["Distinct Values"] == 3
+    assert in_set["Top Values"] == "'XX' (3), 'YY' (2), 1 (1)"
+
+    nulls = summary.loc[("Hire Date", "expect_column_values_to_not_be_null")]
+    assert (nulls["Failures"], nulls["Distinct Values"], nulls["Top Values"]) == (2, 1, "<empty> (2)")
+
+
+def test_summary_top_n_and_empty_store():
+    summary = _store().summary(top_n=1).set_index(["Column", "Rule"])
+    assert summary.loc[("Country", "expect_column_values_to_be_in_set"), "Top Values"] == "'XX' (3)"
+
+    empty = FailureStore().summary()
+    assert empty.empty and list(empty.columns) == ["Column", "Rule", "Failures", "Distinct Values", "Top Values"]
+
+
+def test_csv_and_cells_keep_every_failure(tmp_path):
+    store = _store()
+    assert len(store) == 9
+    path = tmp_path / "failures.csv"
+    store.write_csv(path)
+    written = pd.read_csv(path, encoding="utf-8-sig")
+    assert written["Row"].tolist() == [7, 8, 9, 12, 10, 11, 20, 21, 30]
+    assert store.cells()[["Column", "Row"]].values.tolist()[-1] == ["Country", 30]
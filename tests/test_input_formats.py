@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from input_formats import BundleSource
+from row_sampling import stratified_offsets
+
+
+def _sheet(n):
+    return pd.DataFrame({
+        "Employee ID": [f"E{i:05d}" for i in range(n)],
+        # campos com quebra de linha: mais linhas físicas que registros
+        "Comment": [f"line one\nline two {i}" if i % 3 == 0 else f"c{i}" for i in range(n)],
+        "Amount": np.arange(n, dtype=np.float64),
+    })
+
+
+def test_csv_sample_counts_records_not_lines(tmp_path):
+    df = _sheet(500)
+    df.to_csv(tmp_path / "Hire Employee.csv", index=False)
+    source = BundleSource(str(tmp_path))
+
+    sample, rows, total = source.sample_sheet("Hire Employee", 0, size=40, strata=4, seed=1)
+
+    offsets = stratified_offsets(500, 40, 4, 1)
+    assert total == 500
+    np.testing.assert_array_equal(rows, offsets + 2)
+    pd.testing.assert_frame_equal(sample, df.iloc[offsets].reset_index(drop=True))
+
+
+@pytest.mark.parametrize("row_group_size", [64, 1000])
+def test_parquet_sample_matches_full_read(tmp_path, row_group_size):
+    pytest.importorskip("pyarrow")
+    df = _sheet(700)
+    df.to_parquet(tmp_path / "Hire Employee.parquet", index=False, row_group_size=row_group_size)
+    source = BundleSource(str(tmp_path))
+
+    sample, rows, total = source.sample_sheet("Hire Employee", 0, size=30, strata=5, seed=7)
+
+    offsets = stratified_offsets(700, 30, 5, 7)
+    assert total == 700
+    np.testing.assert_array_equal(rows, offsets + 1)
+    pd.testing.assert_frame_equal(sample, df.iloc[offsets].reset_index(drop=True))
+
+
+def test_parquet_sample_of_empty_sheet(tmp_path):
+    pytest.importorskip("pyarrow")
+    _sheet(0).to_parquet(tmp_path / "Empty.parquet", index=False)
+    sample, rows, total = BundleSource(str(tmp_path)).sample_sheet("Empty", 0, size=10)
+    assert total == 0 and len(sample) == 0 and len(rows) == 0
+    assert list(sample.columns) == ["Employee ID", "Comment", "Amount"]
+
+
+def test_first_row_depends_on_each_member_format(tmp_path):
+    pytest.importorskip("pyarrow")
+    _sheet(3).to_csv(tmp_path / "Hire Employee.csv", index=False)
+    _sheet(3).to_parquet(tmp_path / "Job Changes.parquet", index=False)
+    source = BundleSource(str(tmp_path))
+    assert source.first_row("Hire Employee", 0) == 2
+    assert source.first_row("Job Changes", 0) == 1
+
+
+def test_mixed_bundle_failure_rows(validation_env):
+    pytest.importorskip("pyarrow")
+    import validate_all as va
+
+    bundle = validation_env / "BR_HCM_02_PersonalContactInfo_DGW_ready"
+    bundle.mkdir()
+    ids = pd.DataFrame({"Worker ID": ["W1", None, "W3"]})
+    ids.to_csv(bundle / "Email Address.csv", index=False)
+    ids.to_parquet(bundle / "Phone.parquet", index=False)
+
+    results = va.validate_dgw(str(bundle))
+
+    rows = {r["Sheet"]: pd.read_csv(r["Failures CSV"])["Row"].tolist() for r in results}
+    assert rows == {"Email Address": [3], "Phone": [2]}
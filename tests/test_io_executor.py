@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+import pytest
+
+import validate_all as va
+from conftest import write_dgw
+from failure_store import FailureStore
+from io_executor import IOExecutor
+
+
+def _fail(path):
+    raise OSError(f"disk full: {path}")
+
+
+def test_flush_reports_failed_writes_without_raising(tmp_path):
+    ok = tmp_path / "ok.txt"
+    io_exec = IOExecutor()
+    io_exec.submit(ok.write_text, "x")
+    io_exec.submit(_fail, "a.csv", label="a.csv")
+    failed = io_exec.flush()
+    assert [label for label, _ in failed] == ["a.csv"]
+    assert isinstance(failed[0][1], OSError)
+    assert ok.read_text() == "x"
+
+    # já reportada: close() não relança a mesma falha
+    io_exec.close()
+    assert io_exec.failed == failed
+
+
+def test_close_reraises_unreported_failure():
+    io_exec = IOExecutor()
+    io_exec.submit(_fail, "b.csv", label="b.csv")
+    with pytest.raises(OSError, match="b.csv"):
+        io_exec.close()
+
+
+def test_failed_failure_csv_marks_sheet_and_run_finishes(validation_env, monkeypatch):
+    write_dgw(validation_env / "A_HCM_02_PersonalContactInfo_DGW_ready.xlsx",
+              {"Email Address": pd.DataFrame({"Worker ID": ["W1", None, "W2"]}),
+               "Phone": pd.DataFrame({"Worker ID": ["W1"]})})
+    monkeypatch.setattr(FailureStore, "write_csv", lambda self, path: _fail(path))
+
+    results = va.main(annotate=False)
+
+    by_sheet = {r["Sheet"]: r for r in results}
+    assert by_sheet["Email Address"]["Failed"]
+    assert "not written" in by_sheet["Email Address"]["Error"]
+    assert not by_sheet["Phone"]["Error"]
+    with open(os.path.join(va.OUTPUT_DIR, "validation_dashboard.html"), encoding="utf-8") as f:
+        assert "_failures.csv not written" in f.read()
+    assert os.path.exists(va.METRICS_FILE) and os.path.exists(va.METRICS_JSON)
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("reportlab")
+
+import pdf_report
+from reportlab.platypus import Paragraph, Table
+
+
+def _results(sheets=8, rules=6):
+    results = []
+    for s in range(sheets):
+        results.append({
+            "File": f"BR_HCM_03_HireStack_{s % 2}.xlsx",
+            "Sheet": f"Sheet <{s}> & co",
+            "Type": "HireStack",
+            "Total Checks": 20,
+            "Failed": s + 1,
+            "Success %": 50.0,
+            "Error": "x" * 500 if s == 0 else "",
+            "Status": "",
+            "Rule Summary": [
+                {"Column": f"Col {r}", "Rule": f"rule_{r}", "Failures": 10 * (r + 1) + s,
+                 "Distinct Values": 3, "Top Values": "v" * 400}
+                for r in range(rules)
+            ],
+            "Failures CSV": f"/tmp/failures/sheet_{s}_failures.csv",
+        })
+    results.append({"File": "Clean.xlsx", "Sheet": "Ok", "Type": "Other", "Total Checks": 5, "Failed": 0,
+                    "Success %": 100.0, "Error": "", "Rule Summary": []})
+    return results
+
+
+@pytest.fixture
+def small_caps(monkeypatch):
+    monkeypatch.setattr(pdf_report, "PDF_RULES_PER_SHEET", 3)
+    monkeypatch.setattr(pdf_report, "PDF_TOP_RULES", 4)
+    monkeypatch.setattr(pdf_report, "PDF_MAX_SHEET_SECTIONS", 5)
+    monkeypatch.setattr(pdf_report, "PDF_TEXT_CHARS", 40)
+
+
+def _texts(story):
+    return [f.getPlainText() for f in story if isinstance(f, Paragraph)]
+
+
+def _tables(story):
+    return [f for f in story if isinstance(f, Table)]
+
+
+def test_pdf_is_built_from_synthetic_results(tmp_path, small_caps):
+    diff = pd.DataFrame([{"Type": "HireStack", "File": f"f{i}.xlsx", "Sheet": "S", "New": i, "Resolved": 1,
+                          "Persisting": 2} for i in range(8)])
+    path = pdf_report.build_pdf_report(str(tmp_path / "report.pdf"), _results(), diff, "2026-10-18 10:00:00",
+                                       ["Sampling mode: estimates"], generated_at="2026-10-19 09:00:00")
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.startswith(b"%PDF") and data.rstrip().endswith(b"%%EOF")
+
+
+def test_sheet_sections_apply_the_caps(small_caps):
+    story = pdf_report._sheet_sections(_results())
+    texts = _texts(story)
+
+    headings = [t for t in texts if " › " in t]
+    # as 5 abas com mais falhas, maiores primeiro; as demais só contadas
+    assert headings == [f"BR_HCM_03_HireStack_{s % 2}.xlsx › Sheet <{s}> & co" for s in (7, 6, 5, 4, 3)]
+    assert any(t.startswith("+3 more sheet(s) with failures") for t in texts)
+
+    rule_tables = _tables(story)
+    assert len(rule_tables) == 5 and all(t._nrows == 1 + 3 for t in rule_tables)
+    assert texts.count("+3 more rule(s) in the CSV.") == 5
+    # textos longos cortados em PDF_TEXT_CHARS
+    top_values = rule_tables[0]._cellvalues[1][3].getPlainText()
+    assert len(top_values) == 40 and top_values.endswith("…")
+
+
+def test_top_rules_and_diff_are_capped(small_caps):
+    story = pdf_report._top_rules(_results())
+    (table,) = _tables(story)
+    assert table._nrows == 1 + 4
+    assert _texts(story)[-1] == "+2 more rule/column pairs — see the dashboard."
+
+    diff = pd.DataFrame([{"Type": "T", "File": f"f{i}", "Sheet": "S", "New": i, "Resolved": 0, "Persisting": 0}
+                         for i in range(1, 9)])
+    story = pdf_report._run_diff(diff, None)
+    (table,) = _tables(story)
+    assert table._nrows == 1 + 5
+    assert _texts(story)[-1] == "+3 more sheet(s) — see the Run Diff tab."
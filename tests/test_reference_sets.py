@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+import pytest
+
+import reference_sets
+from reference_sets import load_reference_set
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(reference_sets, "_CACHE", {})
+
+
+def _write(path, ids):
+    pd.DataFrame({"Job Profile ID": ids, "Name": [f"n{i}" for i in range(len(ids))]}).to_csv(path, index=False)
+
+
+def _touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_reference_set_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "job_profiles.csv"
+    _write(path, ["JP1", "JP2", " JP3 ", ""])
+    ref = load_reference_set(str(path), "Job Profile ID")
+    assert sorted(ref.index) == ["JP1", "JP2", "JP3"]
+    assert load_reference_set(str(path), "Job Profile ID") is ref
+
+    # mesmo tamanho, mtime novo → relido
+    _write(path, ["JP1", "JP2", " JP4 ", ""])
+    _touch_later(path)
+    reloaded = load_reference_set(str(path), "Job Profile ID")
+    assert reloaded is not ref and sorted(reloaded.index) == ["JP1", "JP2", "JP4"]
+    assert load_reference_set(str(path), "Job Profile ID") is reloaded
+
+
+def test_cache_is_per_column_and_default_column_is_the_first(tmp_path):
+    path = tmp_path / "job_profiles.csv"
+    _write(path, ["JP1", "JP2"])
+    by_default = load_reference_set(str(path))
+    by_name = load_reference_set(str(path), "Name")
+    assert by_default.column == "Job Profile ID" and sorted(by_default.index) == ["JP1", "JP2"]
+    assert sorted(by_name.index) == ["n0", "n1"]
+    assert load_reference_set(str(path)) is by_default
+
+
+def test_missing_mask_uses_text_keys(tmp_path):
+    path = tmp_path / "ids.csv"
+    pd.DataFrame({"ID": ["1001", "1002"]}).to_csv(path, index=False)
+    ref = load_reference_set(str(path))
+    mask = ref.missing_mask(pd.Series([1001.0, None, 1003.0]))
+    assert mask.tolist() == [False, False, True]
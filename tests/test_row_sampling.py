@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from row_sampling import stratified_offsets, wilson_interval
+
+
+def test_stratified_offsets_small_sheet_takes_every_row():
+    np.testing.assert_array_equal(stratified_offsets(7, 20), np.arange(7))
+
+
+def test_stratified_offsets_spread_over_strata():
+    offsets = stratified_offsets(100_000, 1000, strata=10, seed=3)
+    assert len(offsets) == 1000
+    assert len(np.unique(offsets)) == 1000
+    assert np.all(np.diff(offsets) > 0)
+    assert offsets.min() >= 0 and offsets.max() < 100_000
+    per_stratum = np.bincount(offsets // 10_000, minlength=10)
+    assert per_stratum.tolist() == [100] * 10
+
+
+def test_stratified_offsets_are_reproducible():
+    np.testing.assert_array_equal(stratified_offsets(5000, 50, 5, 42), stratified_offsets(5000, 50, 5, 42))
+    assert not np.array_equal(stratified_offsets(5000, 50, 5, 42), stratified_offsets(5000, 50, 5, 43))
+
+
+def test_wilson_interval_known_value():
+    # 10 falhas em 100 linhas: IC 95% de Wilson ≈ 5,52% – 17,44%
+    low, high = wilson_interval(10, 100)
+    assert low == pytest.approx(0.0552, abs=1e-4)
+    assert high == pytest.approx(0.1744, abs=1e-4)
+
+
+def test_wilson_interval_edges_and_arrays():
+    low, high = wilson_interval([0, 50, 50], 50)
+    assert low[0] == 0 and 0 < high[0] < 0.1
+    assert high[1] == pytest.approx(1) and 0.9 < low[1] < 1
+    assert np.all(low <= high)
+
+    low, high = wilson_interval([3], 0)
+    assert low.tolist() == [0.0] and high.tolist() == [1.0]
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rule_expressions import compile_rules, rules_for_sheet
+
+CONFIG = {
+    "Contract Contingent Worker": [
+        {"name": "End date required for fixed term",
+         "when": {"column": "Contingent Worker Type", "in": ["Fixed Term"]},
+         "require": ["Contract End Date"]},
+        {"name": "End on or after begin",
+         "compare": {"left": "Contract End Date", "op": ">=", "right": "Contract Begin Date", "type": "date"}},
+        {"name": "Rate only when paid",
+         "when": "`Contract Pay Rate` > 0",
+         "require": ["Currency"]},
+    ],
+    "Terminate Employee": [
+        {"name": "Termination after hire",
+         "compare": {"left": "Termination Date", "op": ">=", "type": "date",
+                     "right": {"sheet": "Hire Employee", "column": "Hire Date", "key": "Employee ID"}}},
+    ],
+    "Payment Election Enrollment": [
+        {"name": "Percentages total 100",
+         "group_sum": {"column": "Distribution Percentage", "by": "Employee ID", "equals": 100}},
+    ],
+}
+
+RULES = compile_rules(CONFIG)
+
+
+def _rule(sheet, name):
+    return next(r for r in rules_for_sheet(RULES, sheet) if r.name == name)
+
+
+def _failed(rule, df, load_sheet=None):
+    column, mask = rule.evaluate(df, load_sheet)
+    return column, np.flatnonzero(mask).tolist()
+
+
+CONTRACTS = pd.DataFrame({
+    "contingent worker type": ["Fixed Term", " fixed term ", "Ongoing", None],
+    "Contract Begin Date": ["2024-01-01", "2024-05-01", "2024-01-01", "2024-01-01"],
+    "Contract End Date": [None, "2024-04-30", None, "2025-01-01"],
+    "Contract Pay Rate": [10, 0, None, 5],
+    "Currency": ["USD", None, None, None],
+})
+
+
+def test_sheet_lookup_ignores_case_and_spaces():
+    assert [r.name for r in rules_for_sheet(RULES, " contract contingent WORKER ")][0] == "End date required for fixed term"
+    assert rules_for_sheet(RULES, "Unknown") == []
+
+
+def test_require_with_when_filter():
+    # o filtro "in" ignora caixa e espaços; linha 2 não é Fixed Term
+    assert _failed(_rule("Contract Contingent Worker", "End date required for fixed term"), CONTRACTS) == \
+        ("Contract End Date", [0])
+
+
+def test_require_with_eval_expression():
+    assert _failed(_rule("Contract Contingent Worker", "Rate only when paid"), CONTRACTS) == ("Currency", [3])
+
+
+def test_compare_between_columns_skips_empty_sides():
+    assert _failed(_rule("Contract Contingent Worker", "End on or after begin"), CONTRACTS) == \
+        ("Contract End Date", [1])
+
+
+def test_compare_with_other_sheet_by_key():
+    hires = pd.DataFrame({"Employee ID": ["E1", "E2", "E2"], "Hire Date": ["2024-03-01", "2024-06-01", "2020-01-01"]})
+    terms = pd.DataFrame({"Employee ID": ["E1", " E2", "E3", None], "Termination Date": ["2024-02-01"] * 4})
+    rule = _rule("Terminate Employee", "Termination after hire")
+
+    # primeira linha de cada chave na outra aba; chaves ausentes não falham
+    assert _failed(rule, terms, {"Hire Employee": hires}.get) == ("Termination Date", [0, 1])
+    assert rule.evaluate(terms) is None
+
+
+def test_group_sum_per_key():
+    df = pd.DataFrame({
+        "Employee ID": ["E1", "E1", "E2", "E3", "E3"],
+        "Distribution Percentage": [60, 40, 90, None, None],
+    })
+    rule = _rule("Payment Election Enrollment", "Percentages total 100")
+    assert not rule.row_wise
+    assert _failed(rule, df) == ("Distribution Percentage", [2])
+
+
+def test_missing_column_skips_the_rule():
+    df = CONTRACTS.drop(columns=["Contract Begin Date"])
+    assert _rule("Contract Contingent Worker", "End on or after begin").evaluate(df) is None
+
+
+@pytest.mark.parametrize("spec", [
+    {"name": "two kinds", "require": ["A"], "compare": {"left": "A", "op": ">", "right": "B"}},
+    {"name": "bad op", "compare": {"left": "A", "op": "=>", "right": "B"}},
+    {"name": "bad filter", "when": {"column": "A", "like": "x"}, "require": ["B"]},
+])
+def test_invalid_rules_fail_at_compile_time(spec):
+    with pytest.raises(ValueError):
+        compile_rules({"Sheet": [spec]})
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from rule_index import RuleIndex
+
+RULES = {
+    "Employee ID": {"expectations": ["expect_column_values_to_not_be_null"]},
+    "Hire Date": {"expectations": ["expect_column_values_to_not_be_null"]},
+    "Country ISO Code": {"expectations": ["expect_column_values_to_be_in_set"]},
+}
+ALIASES = {
+    "Employee ID": ["Worker ID", "Emp ID"],
+    "Country ISO Code": "Country",
+}
+
+
+def test_match_is_case_and_space_insensitive_in_yaml_order():
+    matches, unmapped = RuleIndex(RULES, ALIASES).match(["  hire   DATE ", "employee id", "Notes"])
+    assert matches == [("Employee ID", "employee id"), ("Hire Date", "  hire   DATE ")]
+    assert unmapped == ["Notes"]
+
+
+def test_exact_name_beats_aliases_and_aliases_keep_their_order():
+    index = RuleIndex(RULES, ALIASES)
+    assert index.match(["Emp ID", "Worker ID", "Employee ID"])[0] == [("Employee ID", "Employee ID")]
+    assert index.match(["Emp ID", "Worker ID"])[0] == [("Employee ID", "Worker ID")]
+
+
+def test_alias_given_as_a_single_string():
+    matches, unmapped = RuleIndex(RULES, ALIASES).match(["Country", "Worker ID"])
+    assert matches == [("Employee ID", "Worker ID"), ("Country ISO Code", "Country")]
+    assert unmapped == []
+
+
+def test_unmapped_skips_blank_headers_and_keeps_duplicates():
+    matches, unmapped = RuleIndex(RULES).match(["Unnamed: 3", "Extra", "Extra", "Hire Date"])
+    assert matches == [("Hire Date", "Hire Date")]
+    assert unmapped == ["Extra", "Extra"]
+
+
+def test_no_rules():
+    assert RuleIndex({}).match(["A"]) == ([], ["A"])
+
+
+def test_headers_differing_in_case_or_spacing_resolve_alike():
+    index = RuleIndex(RULES, ALIASES)
+    for variants in (["Employee ID", "employee id", " EMPLOYEE   ID "], ["Emp ID", "emp  id"]):
+        resolved = {column: index.match([column])[0] for column in variants}
+        assert {rule for m in resolved.values() for rule, _ in m} == {"Employee ID"}
+        assert all(m == [("Employee ID", column)] for column, m in resolved.items())
+
+
+def test_sheets_with_header_variants_get_the_same_checks(validation_env):
+    import validate_all as va
+    from conftest import write_dgw
+
+    ids = ["W1", None, "W3"]
+    write_dgw(validation_env / "BR_HCM_02_PersonalContactInfo_DGW_ready.xlsx", {
+        "Exact": pd.DataFrame({"Worker ID": ids}),
+        "Variant": pd.DataFrame({" worker   ID ": ids}),
+    })
+    results = va.validate_dgw(str(validation_env / "BR_HCM_02_PersonalContactInfo_DGW_ready.xlsx"))
+
+    exact, variant = results
+    for key in ("Total Checks", "Failed", "Matched Columns", "Unmapped Columns"):
+        assert exact[key] == variant[key]
+    assert exact["Failed"] == 1 and exact["Matched Columns"] == 1
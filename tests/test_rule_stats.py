@@ -0,0 +1,44 @@
+import json
+
+from rule_index import RuleIndex
+from rule_stats import RuleStats, load_stats, rule_report
+
+
+def test_merge_and_save_accumulate_counters(tmp_path):
+    run = RuleStats(str(tmp_path))
+    run.add("Employee ID", "global", executions=2, failures=3, seconds=0.5)
+    worker = RuleStats()
+    worker.add("Employee ID", "global", executions=1, failures=0, seconds=0.25)
+    worker.add("Hire before termination", "expression", 0, 0, 0.1, errors=1)
+    run.merge(worker)
+    run.save("2026-01-01 10:00:00")
+    run.save("2026-01-02 10:00:00")
+
+    data = load_stats(str(tmp_path))
+    assert data["runs"] == 2
+    assert {k: data["rules"]["Employee ID"][k] for k in ("runs", "sheets", "executions", "failures", "errors")} == \
+        {"runs": 2, "sheets": 4, "executions": 6, "failures": 6, "errors": 0}
+    assert data["rules"]["Hire before termination"]["errors"] == 2
+
+
+def test_save_upgrades_totals_without_error_counter(tmp_path):
+    old = {"runs": 1, "unmapped": {}, "rules": {"Employee ID": {
+        "source": "global", "runs": 1, "sheets": 1, "executions": 1, "failures": 0, "seconds": 0.1}}}
+    (tmp_path / "rule_stats.json").write_text(json.dumps(old), encoding="utf-8")
+    run = RuleStats(str(tmp_path))
+    run.add("Employee ID", "global", 1, 1, 0.1)
+    run.save("2026-01-01 10:00:00")
+    assert load_stats(str(tmp_path))["rules"]["Employee ID"]["errors"] == 0
+
+
+def test_report_lists_erroring_rules_apart_from_idle_ones(tmp_path):
+    run = RuleStats()
+    run.add("Broken rule", "expression", 0, 0, 0.0, errors=1)
+    run.add("Optional column", "template", 0, 0, 0.0)
+    data = {"runs": 1, "first_run": "a", "last_run": "b", "rules": run.rules, "unmapped": {}}
+    report = rule_report(data, [], {}, RuleIndex({}, {}), expression_rules=["Broken rule"])
+
+    errors, idle = report.split("💤")
+    assert "Broken rule (expression, 1 of 1 sheet(s))" in errors
+    assert "never evaluated (" not in errors.split("⚠️")[0]
+    assert "Broken rule" not in idle and "Optional column" in idle
@@ -0,0 +1,79 @@
+import json
+import os
+import re
+
+import pytest
+
+import run_metrics
+from run_metrics import METRIC_PREFIX, RunMetrics, count_cache
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]\w*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+
+def _results():
+    rule = {"Column": "Worker ID", "Rule": "not null", "Failures": 3}
+    return [
+        {"File": "A.xlsx", "Sheet": "Email", "Type": "PersonalContactInfo", "Rows": 10, "Total Checks": 4,
+         "Failed": 1, "Rule Summary": [rule, dict(rule, Failures=2)]},
+        {"File": "A.xlsx", "Sheet": 'Phone "main"\nlist', "Type": "PersonalContactInfo", "Rows": 5,
+         "Total Checks": 2, "Failed": 0, "Rule Summary": []},
+        {"File": "B.xlsx", "Sheet": "", "Type": "Error", "Total Checks": 0, "Failed": 0, "Error": "boom"},
+    ]
+
+
+def _parse(text):
+    """{(métrica, rótulos): valor}, conferindo HELP/TYPE antes das amostras de cada métrica."""
+    samples, declared = {}, set()
+    for line in text.splitlines():
+        if line.startswith("# HELP ") or line.startswith("# TYPE "):
+            declared.add(line.split()[2])
+            continue
+        m = SAMPLE.match(line)
+        assert m, f"invalid sample line: {line!r}"
+        name, labels, value = m.group(1), m.group(2) or "", m.group(3)
+        assert name in declared
+        samples[(name, labels)] = float(value)
+    return samples
+
+
+def test_flush_writes_matching_prometheus_and_json(tmp_path):
+    metrics = RunMetrics(mode="fast")
+    metrics.add("validate", 2.0)
+    metrics.add("dashboard", 0.5)
+    count_cache("test_metrics_cache", True)
+    count_cache("test_metrics_cache", False)
+    prom, js = tmp_path / "metrics" / "dgw.prom", tmp_path / "metrics" / "dgw.json"
+
+    data = metrics.flush(_results(), str(prom), str(js))
+
+    assert json.loads(js.read_text(encoding="utf-8")) == data
+    assert data["rows"] == 15 and data["rows_per_second"] == 7.5
+    assert data["files"]["A.xlsx"] == {"type": "PersonalContactInfo", "sheets": 2, "rows": 15,
+                                       "checks": 6, "failed_checks": 1, "failures": 5}
+    assert data["caches"]["test_metrics_cache"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    samples = _parse(prom.read_text(encoding="utf-8"))
+    p = METRIC_PREFIX
+    assert samples[(f"{p}_rows", "")] == 15
+    assert samples[(f"{p}_duration_seconds", "")] == data["duration_seconds"]
+    assert samples[(f"{p}_last_run_timestamp_seconds", '{mode="fast"}')] == data["timestamp"]
+    assert samples[(f"{p}_stage_seconds", '{stage="validate"}')] == 2.0
+    assert samples[(f"{p}_file_failures", '{file="A.xlsx",type="PersonalContactInfo"}')] == 5
+    assert samples[(f"{p}_sheet_failed_checks", '{file="A.xlsx",sheet="Phone \\"main\\"\\nlist"}')] == 0
+    assert samples[(f"{p}_cache_hit_ratio", '{cache="test_metrics_cache"}')] == 0.5
+    assert sorted(os.listdir(prom.parent)) == ["dgw.json", "dgw.prom"]  # nenhum .tmp sobrando
+
+
+def test_failed_flush_keeps_the_previous_files(tmp_path, monkeypatch):
+    prom, js = tmp_path / "dgw.prom", tmp_path / "dgw.json"
+    RunMetrics().flush(_results(), str(prom), str(js))
+    before = prom.read_text(encoding="utf-8"), js.read_text(encoding="utf-8")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(run_metrics.os, "replace", fail)
+    with pytest.raises(OSError):
+        RunMetrics(mode="sample").flush(_results()[:1], str(prom), str(js))
+    # o coletor continua lendo a última versão completa
+    assert (prom.read_text(encoding="utf-8"), js.read_text(encoding="utf-8")) == before
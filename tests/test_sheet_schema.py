@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+from great_expectations.dataset import PandasDataset
+
+from sheet_schema import in_set_mask, regex_mask
+
+
+def _ge_mask(series, expectation, *args):
+    res = getattr(PandasDataset({"c": series}), expectation)("c", *args, result_format="COMPLETE")
+    mask = np.zeros(len(series), dtype=bool)
+    mask[res.result["unexpected_index_list"]] = True
+    return mask
+
+
+VALUES = ["BR-01", "br-02", None, "US-10", "", "XX", 7, np.nan, "BR-01"]
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_regex_mask_matches_ge(categorical):
+    series = pd.Series(VALUES, dtype=object)
+    ge = _ge_mask(series, "expect_column_values_to_match_regex", r"^[A-Z]{2}-\d+$")
+    typed = series.astype("category") if categorical else series
+    np.testing.assert_array_equal(regex_mask(typed, r"^[A-Z]{2}-\d+$"), ge)
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_in_set_mask_matches_ge(categorical):
+    series = pd.Series(VALUES, dtype=object)
+    allowed = ["BR-01", "US-10", 7]
+    ge = _ge_mask(series, "expect_column_values_to_be_in_set", allowed)
+    typed = series.astype("category") if categorical else series
+    np.testing.assert_array_equal(in_set_mask(typed, allowed), ge)
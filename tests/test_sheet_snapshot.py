@@ -0,0 +1,95 @@
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import sheet_snapshot
+from sheet_snapshot import SnapshotReader
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(sheet_snapshot, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "legacy.xlsx"
+    hires = pd.DataFrame({
+        "Employee ID": ["E1", "E2", None, "0042", "E5"],
+        "Hire Date": [datetime.datetime(2024, 1, 10), None, datetime.datetime(2024, 3, 1),
+                      "not a date", datetime.datetime(2024, 5, 1)],
+        "Salary": [1000, 2500.5, None, 3000, 7],
+        "Active": [True, False, None, True, True],
+        "Notes": ["", "x", None, 12, "multi\nline"],
+    })
+    with pd.ExcelWriter(path) as writer:
+        hires.to_excel(writer, sheet_name="Hire Employee", startrow=5, index=False)
+        pd.DataFrame({"Only": [1, 2]}).to_excel(writer, sheet_name=" Spaced ", index=False)
+        pd.DataFrame().to_excel(writer, sheet_name="Empty", index=False)
+    return str(path)
+
+
+READS = [
+    {"header": 5},
+    {"header": 5, "dtype": {"Employee ID": str}},
+    {"header": 5, "keep_default_na": False, "na_values": []},
+    {"header": None},
+    {"header": 0},
+    {"header": 5, "nrows": 2},
+    {"header": None, "nrows": 3},
+]
+
+
+def _expected(path, sheet, options):
+    try:
+        return pd.read_excel(path, sheet_name=sheet, **options)
+    except ValueError as e:
+        return type(e)
+
+
+def _actual(reader, sheet, options):
+    try:
+        return reader.read_sheet(sheet, **options)
+    except ValueError as e:
+        return type(e)
+
+
+def _check(expected, actual):
+    if isinstance(expected, type):
+        assert actual is expected
+    else:
+        pd.testing.assert_frame_equal(actual, expected)
+        for i in range(expected.shape[1]):
+            assert list(map(type, actual.iloc[:, i])) == list(map(type, expected.iloc[:, i]))
+
+
+@pytest.mark.parametrize("options", READS)
+@pytest.mark.parametrize("sheet", ["Hire Employee", " Spaced ", "Empty"])
+def test_read_sheet_matches_read_excel_on_miss_and_hits(workbook, sheet, options):
+    expected = _expected(workbook, sheet, options)
+    for _ in range(3):  # parse do xlsx, snapshot da grade, snapshot do DataFrame
+        reader = SnapshotReader(workbook)
+        _check(expected, _actual(reader, sheet, dict(options)))
+        reader.close()
+
+
+def test_repeat_reads_skip_the_workbook_and_the_grid(workbook, monkeypatch):
+    reader = SnapshotReader(workbook)
+    first = reader.read_sheet("Hire Employee", header=5, keep_default_na=False, na_values=[])
+    reader.close()
+    frames = [f for _, _, files in os.walk(sheet_snapshot.CACHE_DIR) for f in files if f.count(".") == 2]
+    assert len(frames) == 1
+
+    def no_grid(*args, **kwargs):
+        raise AssertionError("grid should not be rebuilt")
+
+    monkeypatch.setattr(sheet_snapshot, "_read_table_grid", no_grid)
+    monkeypatch.setattr(sheet_snapshot, "load_workbook", no_grid)
+    again = SnapshotReader(workbook).read_sheet("Hire Employee", header=5, keep_default_na=False, na_values=[])
+    pd.testing.assert_frame_equal(again, first)
+
+
+def test_sheet_names_come_from_the_manifest(workbook, monkeypatch):
+    names = SnapshotReader(workbook).sheet_names
+    monkeypatch.setattr(sheet_snapshot, "load_workbook", lambda *a, **k: pytest.fail("workbook reopened"))
+    assert SnapshotReader(workbook).sheet_names == names == ["Hire Employee", " Spaced ", "Empty"]
@@ -0,0 +1,86 @@
+import pickle
+
+from task_queue import TaskQueue, DONE, PENDING, RUNNING
+import distributed_validation as dv
+
+
+def _queue(tmp_path, n=2):
+    tasks = [{"file": "A.xlsx", "path": "/data/A.xlsx", "sheet": f"S{i}", "position": i, "phase": 0, "cost": 10}
+             for i in range(n)]
+    return TaskQueue.create(str(tmp_path), tasks)
+
+
+def _claims(tasks):
+    return {t["id"]: t["attempts"] for t in tasks}
+
+
+def _expire_leases(queue):
+    queue.conn.execute("UPDATE tasks SET claimed_at = claimed_at - 3600")
+
+
+def test_claim_returns_the_reservation(tmp_path):
+    queue = _queue(tmp_path)
+    tasks = queue.claim("a", batch=2)
+    assert [(t["status"], t["worker"], t["attempts"]) for t in tasks] == [(RUNNING, "a", 1)] * 2
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    queue = _queue(tmp_path)
+    claims = _claims(queue.claim("a", batch=2))
+    _expire_leases(queue)
+    assert queue.heartbeat("a", claims) == 2
+    assert queue.requeue_stale(lease_s=600, max_attempts=5) == 0
+    assert queue.counts()[RUNNING] == 2
+
+
+def test_complete_after_losing_the_lease_is_rejected(tmp_path):
+    queue = _queue(tmp_path)
+    slow = _claims(queue.claim("slow", batch=2))
+    _expire_leases(queue)
+    assert queue.requeue_stale(lease_s=600, max_attempts=5) == 2
+    fast = _claims(queue.claim("fast", batch=2))
+
+    assert queue.heartbeat("slow", slow) == 0
+    assert queue.complete("fast", fast)
+    assert not queue.complete("slow", slow)
+    assert {(t["status"], t["worker"]) for t in queue.tasks()} == {(DONE, "fast")}
+
+
+def test_partial_loss_returns_owned_tasks_to_the_queue(tmp_path):
+    queue = _queue(tmp_path)
+    claims = _claims(queue.claim("a", batch=2))
+    lost = min(claims)
+    queue.conn.execute("UPDATE tasks SET worker = 'b', attempts = attempts + 1 WHERE id = ?", (lost,))
+
+    assert not queue.complete("a", claims)
+    status = {t["id"]: (t["status"], t["worker"]) for t in queue.tasks()}
+    assert status[lost] == (RUNNING, "b")
+    assert status[max(claims)] == (PENDING, None)
+
+
+def test_fail_ignores_tasks_owned_by_another_worker(tmp_path):
+    queue = _queue(tmp_path, n=1)
+    slow = _claims(queue.claim("slow"))
+    _expire_leases(queue)
+    queue.requeue_stale(lease_s=600, max_attempts=5)
+    queue.claim("fast")
+
+    queue.fail("slow", slow, RuntimeError("boom"), max_attempts=5)
+    assert [(t["status"], t["worker"]) for t in queue.tasks()] == [(RUNNING, "fast")]
+
+
+def test_merge_keeps_only_the_completing_reservation(tmp_path):
+    queue = _queue(tmp_path)
+    (tmp_path / dv.RESULTS_DIR).mkdir()
+    slow = _claims(queue.claim("slow", batch=2))
+    _expire_leases(queue)
+    queue.requeue_stale(lease_s=600, max_attempts=5)
+    fast = _claims(queue.claim("fast", batch=2))
+    assert queue.complete("fast", fast)
+
+    # o worker lento gravou o parcial antes de descobrir que perdeu o lease
+    for worker, claims in (("slow", slow), ("fast", fast)):
+        with open(tmp_path / dv.RESULTS_DIR / f"{worker}.pkl", "wb") as f:
+            pickle.dump({"worker": worker, "claims": claims}, f)
+
+    assert [p["worker"] for p in dv._partials(str(tmp_path), queue)] == ["fast"]
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.datavalidation import DataValidation
+
+import template_rules as tr
+from template_rules import IN_SET, NOT_NULL
+
+
+def _template(path, country_flag="Required"):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Hire Employee"
+    wb.create_sheet(">Instructions")["A5"] = "Required"
+    lists = wb.create_sheet(">Lists")
+    for row, value in enumerate(["Regular", "Temporary", "Regular"], start=1):
+        lists.cell(row=row, column=1, value=value)
+    wb.defined_names["Pay_Types"] = DefinedName("Pay_Types", attr_text="'>Lists'!$A$1:$A$3")
+
+    flags = ["Required", "Optional", country_flag, None, "Optional", "optional"]
+    headers = ["Employee ID", "Employee Type", "Country", None, "Pay Type", "Employee ID"]
+    for col, (flag, header) in enumerate(zip(flags, headers), start=1):
+        ws.cell(row=5, column=col, value=flag)
+        ws.cell(row=6, column=col, value=header)
+
+    for formula, ref in (('"BRA,USA, ,MEX"', "C7:C500"),
+                         ("'>Lists'!$A$1:$A$3", "B7:B500"),
+                         ("Pay_Types", "E7:E500"),
+                         ('"X,Y"', "A5:A6")):  # só nas linhas de metadados: ignorado
+        dv = DataValidation(type="list", formula1=formula)
+        dv.add(ref)
+        ws.add_data_validation(dv)
+    wb.save(path)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tr, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(tr, "_MEMORY", {})
+    return tmp_path / "cache"
+
+
+def test_metadata_reads_required_row_and_dropdowns(tmp_path, cache_dir):
+    path = tmp_path / "DGW_HCM_03_HireStack.xlsx"
+    _template(path)
+    meta = tr.load_template_metadata(str(path))
+
+    assert list(meta) == ["Hire Employee"]
+    assert meta["Hire Employee"] == {
+        "Employee ID": {"required": True, "allowed_values": None},
+        "Employee Type": {"required": False, "allowed_values": ["Regular", "Temporary"]},
+        "Country": {"required": True, "allowed_values": ["BRA", "USA", "MEX"]},
+        "Pay Type": {"required": False, "allowed_values": ["Regular", "Temporary"]},
+        "Employee ID.1": {"required": False, "allowed_values": None},
+    }
+
+
+def test_cache_follows_template_changes(tmp_path, cache_dir, monkeypatch):
+    path = tmp_path / "DGW_HCM_03_HireStack.xlsx"
+    _template(path)
+    first = tr.load_template_metadata(str(path))
+    assert len(os.listdir(cache_dir)) == 1
+    assert tr.load_template_metadata(str(path)) is first  # mesma versão: memória
+
+    # sem memória, a versão já vista sai do JSON em disco, sem abrir o template
+    monkeypatch.setattr(tr, "_MEMORY", {})
+    real_extract = tr.extract_template_metadata
+    monkeypatch.setattr(tr, "extract_template_metadata", lambda p: pytest.fail("template re-read"))
+    assert tr.load_template_metadata(str(path)) == first
+
+    # nova versão do template: novo fingerprint, metadados extraídos de novo
+    monkeypatch.setattr(tr, "extract_template_metadata", real_extract)
+    _template(path, country_flag="Optional")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    changed = tr.load_template_metadata(str(path))
+    assert changed["Hire Employee"]["Country"]["required"] is False
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_yaml_and_template_overlap():
+    rules = {
+        "Employee ID": {"expectations": [NOT_NULL]},
+        "Employee Type": {"expectations": [NOT_NULL, IN_SET], "allowed_values": ["Regular"]},
+        "Country": {"expectations": [{"expect_column_values_to_match_regex": {"regex": "^[A-Z]{3}$"}}]},
+    }
+    sheet_meta = {
+        "Employee ID": {"required": True, "allowed_values": None},
+        "Employee Type": {"required": False, "allowed_values": ["Regular", "Temporary"]},
+        "Country": {"required": True, "allowed_values": ["BRA", "USA"]},
+        "Pay Type": {"required": None, "allowed_values": ["Hourly"]},
+        "Manager": {"required": True, "allowed_values": None},
+        "Notes": {"required": None, "allowed_values": None},
+    }
+    matches = [("Employee ID", "Employee ID"), ("Employee Type", "Employee Type"), ("Country", "Country")]
+    plan = tr.merge_sheet_rules(matches, rules, sheet_meta,
+                                ["Employee ID", "Employee Type", "Country", "Pay Type", "Notes"])
+
+    assert plan == [
+        ("Employee ID", "Employee ID", {"expectations": [NOT_NULL]}),
+        # Optional no template derruba o not_null; a lista do YAML vence o dropdown
+        ("Employee Type", "Employee Type", {"expectations": [IN_SET], "allowed_values": ["Regular"]}),
+        # regras do YAML mantidas; Required e dropdown do template acrescentados
+        ("Country", "Country", {
+            "expectations": [{"expect_column_values_to_match_regex": {"regex": "^[A-Z]{3}$"}}, NOT_NULL, IN_SET],
+            "allowed_values": ["BRA", "USA"],
+        }),
+        # só no template (e presente na aba)
+        ("Pay Type", "Pay Type", {"expectations": [IN_SET], "allowed_values": ["Hourly"]}),
+    ]
+    # o rule_set do YAML não é alterado
+    assert rules["Employee Type"]["expectations"] == [NOT_NULL, IN_SET]
+    assert rules["Country"] == {"expectations": [{"expect_column_values_to_match_regex": {"regex": "^[A-Z]{3}$"}}]}
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import transform_to_dgw as t
+
+TEMPLATE_HEADERS = {
+    "Hire Employee": ["Employee ID", "Hire Date", "Effective Date", "Employee ID"],
+    "Job Changes": ["Employee ID", "Effective Date", "Job Code"],
+    "Terminate Employee": ["Employee ID", "Termination Date"],
+}
+
+
+def _template(path):
+    wb = Workbook()
+    wb.remove(wb.active)
+    wb.create_sheet(">Instructions")["A1"] = "read me"
+    for sheet, headers in TEMPLATE_HEADERS.items():
+        ws = wb.create_sheet(sheet)
+        for col, header in enumerate(headers, start=1):
+            ws.cell(row=6, column=col, value=header)
+    wb.save(path)
+
+
+def _legacy(path):
+    # cabeçalho na linha 2 do legado; "Hire Dt" e "Job Cde" não têm alias
+    sheets = {
+        "Hire Employee": pd.DataFrame({
+            "Employee ID": [f"E{i}" for i in range(25)],
+            "Hire Dt": ["2024-01-10"] * 25,
+            "Effective Date": ["2024-01-10"] * 25,
+        }),
+        "Job Changes": pd.DataFrame({
+            "Employee ID": ["E1", "E2", ""],
+            "Effective Date": ["2024-03-01", "2024-04-01", ""],
+            "Job Cde": ["J1", "J2", "J3"],
+        }),
+    }
+    with pd.ExcelWriter(path) as writer:
+        for sheet, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet, startrow=1, index=False)
+
+
+def _run(tmp_path, monkeypatch, workers):
+    out = tmp_path / f"curated_{workers}"
+    suggestions = tmp_path / f"suggestions_{workers}.csv"
+    monkeypatch.setattr(t, "INCOMING_DIR", str(tmp_path / "incoming"))
+    monkeypatch.setattr(t, "TEMPLATES_DIR", str(tmp_path / "templates"))
+    monkeypatch.setattr(t, "OUTPUT_DIR", str(out))
+    monkeypatch.setattr(t, "SUGGESTIONS_FILE", str(suggestions))
+    monkeypatch.setattr(t, "SNAPSHOT_SOURCES", False)
+    monkeypatch.setattr(t, "TRANSFORM_WORKERS", workers)
+    frames = t.transform_to_dgw(return_frames=True)
+    return out, suggestions, frames
+
+
+def _cells(path):
+    wb = load_workbook(path)
+    return {ws.title: [[c.value for c in row] for row in ws.iter_rows()] for ws in wb}
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_transform_matches_serial(tmp_path, monkeypatch, workers):
+    (tmp_path / "incoming").mkdir()
+    (tmp_path / "templates").mkdir()
+    _template(tmp_path / "templates" / "DGW_HCM_03_HireStack.xlsx")
+    _legacy(tmp_path / "incoming" / "US_HCM_03_HireStack.xlsx")
+
+    serial_dir, serial_csv, serial_frames = _run(tmp_path, monkeypatch, 1)
+    parallel_dir, parallel_csv, parallel_frames = _run(tmp_path, monkeypatch, workers)
+
+    name = "US_HCM_03_HireStack_DGW_ready.xlsx"
+    serial = _cells(serial_dir / name)
+    assert serial["Hire Employee"][6][:4] == ["E0", None, "2024-01-10", "E0"]
+    assert _cells(parallel_dir / name) == serial
+
+    assert serial_csv.read_bytes() == parallel_csv.read_bytes()
+    sources = set(pd.read_csv(serial_csv, encoding="utf-8-sig")["Source Column"])
+    assert sources == {"Hire Dt", "Job Cde"}
+
+    (serial_sheets,), (parallel_sheets,) = serial_frames.values(), parallel_frames.values()
+    assert list(parallel_sheets) == list(serial_sheets)
+    for sheet, df in serial_sheets.items():
+        pd.testing.assert_frame_equal(parallel_sheets[sheet], df)
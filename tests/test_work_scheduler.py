@@ -0,0 +1,110 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from conftest import write_dgw
+from work_scheduler import SheetScheduler, SheetTask, xlsx_costs
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def scheduler():
+    made = []
+
+    def make(workers=2, budget_mb=1):
+        made.append(SheetScheduler(workers, budget_mb))
+        return made[-1]
+
+    yield make
+    for s in made:
+        s.close()
+
+
+def _queued(slot):
+    return [(t.path, t.sheet) for t in slot.tasks]
+
+
+def test_assign_keeps_workbooks_together_biggest_first(scheduler):
+    s = scheduler(workers=2)
+    s._assign([
+        ("small.xlsx", {"A": 10}, 5),
+        ("big.xlsx", {"A": 100, "B": 300, "C": 200}, 50),
+        ("mid.xlsx", {"A": 250}, 5),
+    ])
+    first, second = s.slots
+    # o maior arquivo vai inteiro para um processo, abas maiores primeiro
+    assert _queued(first) == [("big.xlsx", "B"), ("big.xlsx", "C"), ("big.xlsx", "A")]
+    assert _queued(second) == [("mid.xlsx", "A"), ("small.xlsx", "A")]
+
+
+def test_single_file_larger_than_budget_still_loads(scheduler):
+    s = scheduler(budget_mb=1)
+    huge, other = SheetTask("huge.xlsx", "A", 10 * MB), SheetTask("huge.xlsx", "B", 10 * MB)
+    s._acquire(huge)
+    s._acquire(other)  # abas de um arquivo já iniciado nunca esperam
+    assert s.peak == 20 * MB and s.budget_waits == 0
+
+    # outro arquivo espera a memória do primeiro ser liberada
+    waiting = threading.Thread(target=s._acquire, args=(SheetTask("next.xlsx", "A", MB // 2),))
+    waiting.start()
+    waiting.join(0.2)
+    assert waiting.is_alive()
+    s.release("huge.xlsx")
+    waiting.join(5)
+    assert not waiting.is_alive() and s.budget_waits >= 1
+
+
+def test_steal_only_when_victim_has_more_than_the_open_cost(scheduler):
+    # pendente (90) não paga reabrir o workbook (100): o ocioso não rouba;
+    # com abertura 80, rouba
+    s = scheduler(workers=2)
+    s._assign([("book.xlsx", {"A": 40, "B": 30, "C": 20}, 100)])
+    owner, idle = s.slots
+    assert s._next_task(idle) is None and idle.steals == 0
+
+    s = scheduler(workers=2)
+    s._assign([("book.xlsx", {"A": 40, "B": 30, "C": 20}, 80)])
+    owner, idle = s.slots
+    task = s._next_task(idle)
+    assert (task.path, task.sheet) == ("book.xlsx", "C")  # do fim da fila da vítima
+    assert idle.steals == 1 and _queued(owner) == [("book.xlsx", "A"), ("book.xlsx", "B")]
+
+    # pendente (70) já não paga outra abertura (80)... a menos que o workbook já esteja aberto
+    assert s._next_task(idle) is None
+    idle.opened.add("book.xlsx")
+    assert s._next_task(idle).sheet == "B" and idle.steals == 2
+
+
+def test_load_yields_each_file_once_with_sheets_in_workbook_order(tmp_path, scheduler):
+    def rows(n):
+        return pd.DataFrame({"Employee ID": [f"E{i}" for i in range(n)], "Note": ["x" * 20] * n})
+
+    paths = []
+    for name, sizes in (("a.xlsx", [5, 400, 50]), ("b.xlsx", [300, 10]), ("c.xlsx", [20])):
+        path = tmp_path / name
+        write_dgw(path, {f"Sheet{i}": rows(n) for i, n in enumerate(sizes)} | {">Notes": rows(1)})
+        paths.append(str(path))
+    write_dgw(tmp_path / "only_notes.xlsx", {">Notes": rows(1)})
+    paths.append(str(tmp_path / "only_notes.xlsx"))
+
+    # custos fora da ordem do workbook: a entrega precisa reordenar
+    costs = xlsx_costs(paths[0])[0]
+    assert list(costs) == ["Sheet0", "Sheet1", "Sheet2", ">Notes"]
+    assert costs["Sheet1"] > costs["Sheet2"] > costs["Sheet0"]
+
+    s = scheduler(workers=2, budget_mb=0.01)
+    loaded = []
+    for path, frames, errors in s.load(paths, lambda sheet: not sheet.startswith(">")):
+        loaded.append((path, list(frames), errors))
+        s.release(path)  # como o validate_all: libera o orçamento depois de validar
+
+    assert sorted(p for p, _, _ in loaded) == sorted(paths)
+    by_path = {p: sheets for p, sheets, _ in loaded}
+    assert by_path[paths[0]] == ["Sheet0", "Sheet1", "Sheet2"]
+    assert by_path[paths[1]] == ["Sheet0", "Sheet1"]
+    assert by_path[paths[2]] == ["Sheet0"]
+    assert by_path[paths[3]] == []
+    assert not any(errors for _, _, errors in loaded)
+    assert s.sheets == 6
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+import validate_all as va
+from conftest import write_dgw
+from reference_sets import ReferenceSet
+from worker_index import WorkerIndex
+
+
+def _index():
+    index = WorkerIndex()
+    index.add("BR_HireStack.xlsx", "Hire Employee", pd.Series(["E1", " E2 ", None]))
+    index.add("BR_HireStack.xlsx", "Contract Contingent Worker", pd.Series([1001.0, np.nan]))
+    return index
+
+
+def test_hire_column_matches_hire_tabs_only():
+    df = pd.DataFrame({"employee id": ["E1"], "Contingent Worker ID": ["C1"]})
+    assert WorkerIndex.hire_column(df, " hire  employee ") == "employee id"
+    assert WorkerIndex.hire_column(df, "Contract Contingent Worker") == "Contingent Worker ID"
+    assert WorkerIndex.hire_column(df, "Job Changes") is None
+
+
+def test_index_freezes_into_reference_set():
+    index = _index()
+    ref = index.reference()
+    assert isinstance(ref, ReferenceSet)
+    assert len(index) == 3
+    assert index.reference() is ref  # reaproveitado até o próximo add
+    index.add("US_HireStack.xlsx", "Hire Employee", pd.Series(["U1"]))
+    assert index.reference() is not ref and len(index) == 4
+    assert index.sources[-1] == "US_HireStack.xlsx › Hire Employee"
+
+
+def test_missing_mask_flags_only_filled_unknown_ids():
+    index = _index()
+    ids = pd.Series(["E1", "E2", "1001", 1001, None, "X9", ""])
+    np.testing.assert_array_equal(index.missing_mask(ids),
+                                  [False, False, False, False, False, True, True])
+    cat = ids.astype(str).where(ids.notna()).astype("category")
+    np.testing.assert_array_equal(index.missing_mask(cat), index.missing_mask(ids))
+
+
+def test_merge_keeps_ids_sources_and_incomplete():
+    index, other = _index(), WorkerIndex()
+    other.add("US_HireStack.xlsx", "Hire Employee", pd.Series(["U1"]))
+    other.mark_incomplete("US_HireStack.xlsx › Contract Contingent Worker")
+    index.merge(other)
+    assert not index.missing_mask(pd.Series(["U1", "E1"])).any()
+    assert index.incomplete == ["US_HireStack.xlsx › Contract Contingent Worker"]
+
+
+def test_fast_abort_skips_worker_consistency(validation_env):
+    # toda a aba de contratação sem Location → o modo rápido aborta o HireStack na amostra
+    hires = pd.DataFrame({"Employee ID": ["E1", "E2", "E3"]})
+    for column in ("Location Reference ID", "Location Name", "Worker Type", "Hire Date", "Email Type"):
+        hires[column] = None
+    write_dgw(validation_env / "BR_HCM_03_HireStack_DGW_ready.xlsx", {"Hire Employee": hires})
+    write_dgw(validation_env / "BR_HCM_02_PersonalContactInfo_DGW_ready.xlsx",
+              {"Email Address": pd.DataFrame({"Worker ID": ["E1", "E2"]})})
+
+    results = va.main(fast=True, annotate=False)
+    assert any(r["Status"] == "Aborted early" for r in results if "HireStack" in r["File"])
+
+    index = WorkerIndex()
+    run = va.RunContext(worker_index=index, fast=True)
+    va.validate_dgw(str(validation_env / "BR_HCM_03_HireStack_DGW_ready.xlsx"), run)
+    assert index.incomplete == ["BR_HCM_03_HireStack_DGW_ready.xlsx › Hire Employee"]
+    va.validate_dgw(str(validation_env / "BR_HCM_02_PersonalContactInfo_DGW_ready.xlsx"), run)
+    (check,) = index.results
+    assert check["Not Found"] == 0 and check["Status"].startswith("⚠️ Skipped: worker index incomplete")
+
+
+def test_full_run_still_flags_unknown_workers(validation_env):
+    write_dgw(validation_env / "BR_HCM_03_HireStack_DGW_ready.xlsx",
+              {"Hire Employee": pd.DataFrame({"Employee ID": ["E1", "E2"]})})
+    write_dgw(validation_env / "BR_HCM_02_PersonalContactInfo_DGW_ready.xlsx",
+              {"Email Address": pd.DataFrame({"Worker ID": ["E1", "X9"]})})
+    index = WorkerIndex()
+    run = va.RunContext(worker_index=index)
+    for name in ("BR_HCM_03_HireStack_DGW_ready.xlsx", "BR_HCM_02_PersonalContactInfo_DGW_ready.xlsx"):
+        va.validate_dgw(str(validation_env / name), run)
+    assert not index.incomplete
+    (check,) = index.results
+    assert check["Not Found"] == 1 and check["Sample"] == "X9"